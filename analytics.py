@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Student Feedback System - Text Analytics Job
+Tokenizes new feedback in batches, folds term frequencies into per-teacher
+tables and scores each entry's sentiment with a small word lexicon.
+
+Only feedback newer than the job's watermark is processed, so it is cheap to
+run on a schedule (cron, a systemd timer) or continuously:
+
+Usage:
+    python analytics.py                   # process new feedback once
+    python analytics.py --interval 300    # keep running every 5 minutes
+"""
+
+import argparse
+import re
+import sys
+import time
+from collections import Counter
+
+from config import DATABASE_PATH, TEXT_ANALYTICS_BATCH_SIZE, TEXT_ANALYTICS_INTERVAL
+
+TOKEN_RE = re.compile(r"[a-z][a-z']+")
+
+STOPWORDS = frozenset("""
+    about above after again all also and any are because been before being below
+    but can could did does doing don't down during each even every few for from
+    further had has have having her here hers him his how i'm into its it's just
+    more most much not now off once only other our out over own same she should
+    some such than that the their them then there these they this those through
+    too under until very was were what when where which while who whom why will
+    with would you your yours class teacher sir madam mam miss feedback really
+""".split())
+
+NEGATIONS = frozenset("not no never don't doesn't didn't isn't wasn't can't cannot won't hardly".split())
+
+SENTIMENT_LEXICON = {
+    **dict.fromkeys("""
+        good great excellent amazing awesome helpful clear engaging interesting
+        patient kind friendly supportive enjoy enjoyed enjoyable love loved best
+        useful effective understandable organized fun inspiring knowledgeable
+        approachable fair thorough easy improved well nice wonderful fantastic
+    """.split(), 1.0),
+    **dict.fromkeys("""
+        bad poor boring confusing unclear difficult hard rude slow rushed
+        strict unfair disorganized useless worst hate hated late noisy stressful
+        tedious monotonous impatient unhelpful complicated overwhelming
+        lacking waste worse terrible awful annoying
+    """.split(), -1.0),
+}
+
+
+def tokenize(text):
+    """Lower-case word tokens of a feedback entry."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def sentiment_score(tokens):
+    """Mean polarity of the lexicon words in the entry, in [-1, 1] (0 when none
+    occur). A negation flips the polarity of the word right after it."""
+    total = 0.0
+    hits = 0
+    negate = False
+    for token in tokens:
+        polarity = SENTIMENT_LEXICON.get(token)
+        if polarity is not None:
+            total += -polarity if negate else polarity
+            hits += 1
+        negate = token in NEGATIONS
+    return total / hits if hits else 0.0
+
+
+def analyze_batch(rows):
+    """Analyze (id, teacher_id, day, feedback_text) rows.
+    Returns (term counts keyed by (teacher_id, term), sentiment rows)."""
+    terms = Counter()
+    sentiments = []
+    for feedback_id, teacher_id, day, text in rows:
+        tokens = tokenize(text)
+        terms.update((teacher_id, token) for token in tokens
+                     if len(token) > 2 and token not in STOPWORDS)
+        sentiments.append((feedback_id, teacher_id, day, sentiment_score(tokens)))
+    return terms, sentiments
+
+
+def store_analysis(conn, terms, sentiments):
+    """Add analyze_batch() results to teacher_terms and feedback_sentiment on conn;
+    the caller commits."""
+    conn.executemany(
+        """
+        INSERT INTO teacher_terms (teacher_id, term, occurrences)
+        VALUES (?, ?, ?)
+        ON CONFLICT (teacher_id, term) DO UPDATE SET
+            occurrences = occurrences + excluded.occurrences
+        """,
+        [key + (count,) for key, count in terms.items()],
+    )
+    conn.executemany(
+        "INSERT OR REPLACE INTO feedback_sentiment (feedback_id, teacher_id, day, score) VALUES (?, ?, ?, ?)",
+        sentiments,
+    )
+
+
+def refresh_text_analytics(db, batch_size=TEXT_ANALYTICS_BATCH_SIZE):
+    """Process feedback newer than the 'text_analytics' watermark. Text is analyzed
+    outside the write lock; each batch's results and watermark commit together.
+    Returns the number of feedback rows processed.
+    """
+    if getattr(db, "shards", None) is not None:
+        # ShardedDatabaseManager: every shard keeps its own analytics and watermark
+        return sum(refresh_text_analytics(shard, batch_size) for shard in db.shards)
+    processed = 0
+    with db.pool.connection() as conn:
+        while True:
+            last_id = conn.execute(
+                "SELECT last_id FROM rollup_watermarks WHERE name = 'text_analytics'"
+            ).fetchone()[0]
+            rows = conn.execute(
+                """
+                SELECT id, teacher_id,
+                       COALESCE(submission_day, DATE(submission_time, 'localtime')),
+                       feedback_text
+                FROM feedback
+                WHERE id > ?
+                ORDER BY id
+                LIMIT ?
+                """,
+                (last_id, batch_size),
+            ).fetchall()
+            if not rows:
+                return processed
+            terms, sentiments = analyze_batch(rows)
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = conn.execute(
+                    "SELECT last_id FROM rollup_watermarks WHERE name = 'text_analytics'"
+                ).fetchone()[0]
+                if current != last_id:
+                    # Another run processed this batch while we were analyzing it
+                    conn.rollback()
+                    continue
+                store_analysis(conn, terms, sentiments)
+                conn.execute(
+                    "UPDATE rollup_watermarks SET last_id = ? WHERE name = 'text_analytics'",
+                    (rows[-1][0],),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            processed += len(rows)
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Update feedback term frequencies and sentiment scores.")
+    parser.add_argument("--db", help="Single SQLite database file "
+                                      f"(default: the SHARD_PATHS shards if configured, else {DATABASE_PATH})")
+    parser.add_argument("--batch-size", type=int, default=TEXT_ANALYTICS_BATCH_SIZE)
+    parser.add_argument("--interval", type=float, nargs="?", const=TEXT_ANALYTICS_INTERVAL,
+                        help=f"Keep running, pausing this many seconds between runs (default {TEXT_ANALYTICS_INTERVAL})")
+    args = parser.parse_args(argv)
+
+    from database import DatabaseManager
+    from sharding import open_database
+
+    db = DatabaseManager(args.db) if args.db else open_database()
+    try:
+        while True:
+            started = time.perf_counter()
+            count = refresh_text_analytics(db, args.batch_size)
+            print(f"✅ Analyzed {count} feedback entries in {time.perf_counter() - started:.2f}s",
+                  file=sys.stderr)
+            if args.interval is None:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Student Feedback System - Feedback Archival Job
+Moves feedback older than a cutoff out of the hot feedback table into the
+archive database (``<database>_archive.db``, text zlib-compressed), a batch at
+a time so submissions never wait long for the write lock.
+
+Daily rollups, feedback counters and text analytics are brought up to date
+before anything is moved, so dashboards keep counting archived feedback.
+Archived entries are read back with
+``DatabaseManager.get_feedback_for_teacher(teacher_id, include_archived=True)``.
+
+Usage:
+    python archive.py                       # archive feedback older than ARCHIVE_AFTER_DAYS once
+    python archive.py --days 180 --interval # keep running, once a day by default
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from analytics import refresh_text_analytics
+from config import (
+    ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_PAUSE, ARCHIVE_BATCH_SIZE, ARCHIVE_INTERVAL, DATABASE_PATH,
+)
+from database import DatabaseManager, add_feedback_counts
+from sharding import open_database
+
+
+def archive_old_feedback(db, older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE,
+                         pause=ARCHIVE_BATCH_PAUSE):
+    """Move feedback submitted more than older_than_days ago into db.archive.
+    Each batch is copied to the archive first and then deleted from the hot table in
+    its own short transaction. A ShardedDatabaseManager is archived shard by shard.
+    Returns the number of entries moved.
+    """
+    if older_than_days < 1:
+        raise ValueError("older_than_days must be at least 1; today's entries enforce the daily limit")
+    if getattr(db, "shards", None) is not None:
+        return sum(archive_old_feedback(shard, older_than_days, batch_size, pause) for shard in db.shards)
+    # Rows are only archived once both incremental jobs have folded them in
+    db.refresh_feedback_rollups()
+    refresh_text_analytics(db)
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).strftime("%Y-%m-%d %H:%M:%S")
+
+    moved = 0
+    while True:
+        with db.pool.connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, teacher_id, student_id, student_name, feedback_text,
+                       submission_time, submission_day
+                FROM feedback
+                WHERE submission_time < ?
+                  AND id <= (SELECT MIN(last_id) FROM rollup_watermarks
+                             WHERE name IN ('feedback', 'text_analytics'))
+                ORDER BY submission_time
+                LIMIT ?
+                """,
+                (cutoff, batch_size),
+            ).fetchall()
+        if not rows:
+            return moved
+
+        db.archive.store(rows)
+        with db.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Archived feedback still counts towards each teacher's total and latest entry
+                archived = {}
+                for feedback_id, teacher_id, *_, submission_time, _ in rows:
+                    if conn.execute("DELETE FROM feedback WHERE id = ?", (feedback_id,)).rowcount:
+                        count, latest = archived.get(teacher_id, (0, ""))
+                        archived[teacher_id] = (count + 1, max(latest, submission_time))
+                add_feedback_counts(conn, archived)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        moved += len(rows)
+        if pause:
+            time.sleep(pause)
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Move old feedback into the compressed archive database.")
+    parser.add_argument("--db", help="Single SQLite database file "
+                                      f"(default: the SHARD_PATHS shards if configured, else {DATABASE_PATH})")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS,
+                        help="Archive feedback submitted more than this many days ago")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--interval", type=float, nargs="?", const=ARCHIVE_INTERVAL,
+                        help=f"Keep running, pausing this many seconds between runs (default {ARCHIVE_INTERVAL})")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db) if args.db else open_database()
+    try:
+        while True:
+            started = time.perf_counter()
+            count = archive_old_feedback(db, args.days, args.batch_size)
+            print(f"🗄️ Archived {count} feedback entries in {time.perf_counter() - started:.2f}s",
+                  file=sys.stderr)
+            for shard in getattr(db, "shards", [db]):
+                stats = shard.archive.stats()
+                print(f"   {stats['rows']} in {shard.archive.path}, {stats['compressed_bytes']} bytes of text",
+                      file=sys.stderr)
+            if args.interval is None:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
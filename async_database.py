@@ -0,0 +1,174 @@
+"""
+Student Feedback System - asyncio front end for DatabaseManager.
+
+AsyncDatabaseManager exposes DatabaseManager's public methods as coroutines.
+Calls run on a thread pool no larger than the connection pool. The pool is
+shared with the write-behind FeedbackWriter and the read snapshot's refresh
+(and any other threads using the same manager), so a worker may still wait
+for a connection while those hold one. At most ``max_pending`` calls may be
+queued or running at once; further callers wait (without blocking the event
+loop) until a slot frees up.
+
+Cancelling a call that has not started yet drops it. Cancelling one that is
+running interrupts its SQLite statements, on the primary connection and on
+any read snapshot connection it is reading from; this rolls back any open
+write.
+A ShardedDatabaseManager can be wrapped too; its running calls are not
+interrupted on cancellation, since they may touch any shard.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import ASYNC_DB_MAX_PENDING
+from database import DatabaseManager
+
+# DatabaseManager methods mirrored as coroutines on AsyncDatabaseManager
+ASYNC_METHODS = (
+    "verify_admin_login", "verify_teacher_login",
+    "add_student", "get_students_for_teacher", "get_students_page", "get_student_by_student_id",
+    "resolve_student_name", "delete_student", "generate_unique_student_id",
+    "add_student_auto", "add_students_bulk",
+    "add_teacher", "get_all_teachers", "get_teacher_by_id", "delete_teacher",
+    "submit_feedback", "submit_feedback_once", "submit_feedback_batch",
+    "has_student_submitted_today",
+    "get_feedback_for_teacher", "get_all_feedback", "get_feedback_page",
+    "get_all_feedback_page", "search_feedback", "get_feedback_counts",
+    "refresh_feedback_rollups", "get_daily_feedback_stats", "get_teacher_analytics",
+    "get_top_terms", "get_sentiment_trend", "get_query_stats",
+    "refresh_snapshot", "get_snapshot_status",
+)
+
+
+def _discard_outcome(future):
+    """Retrieve an abandoned call's outcome so asyncio doesn't log it as unhandled."""
+    if not future.cancelled():
+        future.exception()
+
+
+class _Call:
+    """Tracks the connections a running call uses so they can be interrupted."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.conns = []
+        self.cancelled = False
+
+    def attach(self, conn):
+        with self.lock:
+            if self.cancelled:
+                raise asyncio.CancelledError()
+            self.conns.append(conn)
+
+    def detach(self, conn):
+        with self.lock:
+            self.conns.remove(conn)
+
+    def interrupt(self):
+        with self.lock:
+            self.cancelled = True
+            for conn in self.conns:
+                conn.interrupt()
+
+
+class AsyncDatabaseManager:
+    def __init__(self, db_path="feedback_system.db", db=None, max_pending=ASYNC_DB_MAX_PENDING, **kwargs):
+        """Wrap an existing DatabaseManager, or open one on db_path (extra keyword
+        arguments are passed to DatabaseManager). Owned managers are closed by close()."""
+        self._owns_db = db is None
+        self.db = db if db is not None else DatabaseManager(db_path, **kwargs)
+        # ShardedDatabaseManager has no single pool; it reports its combined worker_count
+        self._pool = getattr(self.db, "pool", None)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._pool.size if self._pool is not None else self.db.worker_count,
+            thread_name_prefix="feedback-db",
+        )
+        self._slots = asyncio.Semaphore(max_pending)
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _run_sync(self, call, method, args, kwargs):
+        if self._pool is None:
+            if call.cancelled:
+                raise asyncio.CancelledError()
+            return method(*args, **kwargs)
+        # Hold the connection for the whole call: the method's own borrow reuses it,
+        # and the caller can interrupt it if the coroutine is cancelled. Reads served
+        # from the snapshot borrow from its pool instead; watch_reads reports those.
+        with self._pool.connection() as conn:
+            call.attach(conn)
+            try:
+                with self.db.watch_reads(call):
+                    return method(*args, **kwargs)
+            finally:
+                call.detach(conn)
+
+    async def run(self, method, *args, **kwargs):
+        """Run a blocking callable (normally a bound DatabaseManager method) on the
+        database threads and return its result."""
+        if self._closed:
+            raise RuntimeError("AsyncDatabaseManager is closed")
+        async with self._slots:
+            call = _Call()
+            future = self._executor.submit(self._run_sync, call, method, args, kwargs)
+            waiter = asyncio.wrap_future(future)
+            try:
+                return await asyncio.shield(waiter)
+            except asyncio.CancelledError:
+                # cancel() only succeeds while the call is still queued
+                if not future.cancel():
+                    call.interrupt()
+                waiter.add_done_callback(_discard_outcome)
+                raise
+
+    async def enqueue_feedback(self, teacher_id: int, student_id: str, feedback_text: str):
+        """Submit through the write-behind queue when enabled (see
+        DatabaseManager.enqueue_feedback); resolves to a SubmitResult."""
+        future = await self.run(self.db.enqueue_feedback, teacher_id, student_id, feedback_text)
+        return await asyncio.wrap_future(future)
+
+    async def iter_feedback_for_teacher(self, teacher_id, since=None, until=None, chunk_size=500):
+        """Async counterpart of DatabaseManager.iter_feedback_for_teacher."""
+        cursor = None
+        while True:
+            rows, has_more = await self.get_feedback_page(
+                teacher_id, chunk_size, cursor, since=since, until=until
+            )
+            for row in rows:
+                yield row
+            if not has_more:
+                return
+            cursor = (rows[-1][3], rows[-1][0])
+
+    async def close(self):
+        """Wait for running calls, then close the wrapped manager if we opened it."""
+        if self._closed:
+            return
+        self._closed = True
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self._executor.shutdown, wait=True)
+        )
+        if self._owns_db:
+            self.db.close()
+
+
+def _make_async(name):
+    async def method(self, *args, **kwargs):
+        return await self.run(getattr(self.db, name), *args, **kwargs)
+
+    method.__name__ = name
+    method.__qualname__ = f"AsyncDatabaseManager.{name}"
+    method.__doc__ = f"Coroutine version of DatabaseManager.{name}."
+    return method
+
+
+for _name in ASYNC_METHODS:
+    setattr(AsyncDatabaseManager, _name, _make_async(_name))
+del _name
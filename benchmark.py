@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Student Feedback System - Benchmark Suite
+Builds synthetic datasets and times the DatabaseManager calls the app makes,
+reporting p50/p95/p99 latencies as JSON so runs can be compared across commits.
+
+Usage:
+    python benchmark.py --sizes 1000,100000 --output results.json
+    python benchmark.py --sizes 1000,100000 --compare results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from config import MIN_WORD_COUNT
+
+WORDS = """
+    the lessons were clear and helpful examples homework practice questions pace
+    explained concepts patient slides notes tests revision group projects labs
+    interesting engaging boring confusing fast slow more less time feedback
+    algebra grammar chemistry history reading writing discussion support office
+    hours deadlines marking fair detailed encouraging teacher class students
+""".split()
+
+BENCH_PASSWORD = "benchmark-password"
+
+
+def synthetic_text(rng):
+    """Feedback text of realistic length: at least MIN_WORD_COUNT words, long-tailed."""
+    length = MIN_WORD_COUNT + int(rng.expovariate(1 / 40))
+    return " ".join(rng.choices(WORDS, k=length)).capitalize() + "."
+
+
+def generate_dataset(db, teachers, students_per_teacher, feedback_rows, seed=0):
+    """Fill an empty database with synthetic teachers, rosters and feedback.
+    Feedback is spread over past days so no student submits twice on one day.
+    Returns {teacher_id: [student_id, ...]}.
+    """
+    rng = random.Random(seed)
+    rosters = {}
+    for t in range(teachers):
+        username = f"bench_teacher_{t}"
+        db.add_teacher(username, BENCH_PASSWORD, f"Bench Teacher {t}", f"{username}@example.com", "Benchmarks")
+        teacher_id = db.verify_teacher_login(username, BENCH_PASSWORD)[0]
+        report = db.add_students_bulk(
+            teacher_id,
+            ((i + 1, "", f"Student {t}-{i}") for i in range(students_per_teacher)),
+        )
+        rosters[teacher_id] = [sid for _, sid, _ in report["added"]]
+
+    pairs = [(teacher_id, sid, f"Student {n}-{i}")
+             for n, (teacher_id, sids) in enumerate(rosters.items())
+             for i, sid in enumerate(sids)]
+    today = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+
+    def rows():
+        for n in range(feedback_rows):
+            teacher_id, sid, name = pairs[n % len(pairs)]
+            submitted = today - timedelta(days=1 + n // len(pairs), minutes=rng.randrange(600))
+            yield (teacher_id, sid, name, synthetic_text(rng),
+                   submitted.strftime("%Y-%m-%d %H:%M:%S"),
+                   (submitted.astimezone()).strftime("%Y-%m-%d"))
+
+    with db.pool.connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO feedback (teacher_id, student_id, student_name, feedback_text,
+                                  submission_time, submission_day)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            rows(),
+        )
+        conn.commit()
+    db.invalidate_read_cache()
+    return rosters
+
+
+def percentiles(samples):
+    """p50/p95/p99 and mean of a list of durations in seconds, in milliseconds."""
+    if len(samples) == 1:
+        cuts = samples * 99
+    else:
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49] * 1000, 4),
+        "p95_ms": round(cuts[94] * 1000, 4),
+        "p99_ms": round(cuts[98] * 1000, 4),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 4),
+    }
+
+
+def time_calls(fn, calls):
+    """Call fn(i) for i in range(calls) and return per-call durations."""
+    samples = []
+    for i in range(calls):
+        started = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def benchmark_cases(db, rosters, rng):
+    """(name, fn(i)) pairs covering the DatabaseManager calls behind each page."""
+    teacher_ids = list(rosters)
+    pairs = [(t, sid) for t, sids in rosters.items() for sid in sids]
+    submit_order = rng.sample(pairs, len(pairs))
+
+    def pick(i):
+        return pairs[rng.randrange(len(pairs))]
+
+    def submit(i):
+        teacher_id, sid = submit_order[i % len(submit_order)]
+        db.submit_feedback_once(teacher_id, sid, "Benchmark feedback " * MIN_WORD_COUNT)
+
+    return [
+        ("verify_admin_login", lambda i: db.verify_admin_login("admin", "admin123")),
+        ("verify_teacher_login", lambda i: db.verify_teacher_login(
+            f"bench_teacher_{i % len(teacher_ids)}", BENCH_PASSWORD)),
+        ("get_all_teachers", lambda i: db.get_all_teachers()),
+        ("get_students_for_teacher", lambda i: db.get_students_for_teacher(teacher_ids[i % len(teacher_ids)])),
+        ("resolve_student_name", lambda i: db.resolve_student_name(*pick(i))),
+        ("get_student_by_student_id", lambda i: db.get_student_by_student_id(*pick(i))),
+        ("has_student_submitted_today", lambda i: db.has_student_submitted_today(*pick(i))),
+        ("submit_feedback_once", submit),
+        ("generate_unique_student_id", lambda i: db.generate_unique_student_id(teacher_ids[i % len(teacher_ids)])),
+        ("add_student_auto", lambda i: db.add_student_auto(teacher_ids[i % len(teacher_ids)], f"Bench New {i}")),
+        ("get_feedback_page", lambda i: db.get_feedback_page(teacher_ids[i % len(teacher_ids)])),
+        ("get_all_feedback_page", lambda i: db.get_all_feedback_page()),
+        ("get_feedback_counts", lambda i: db.get_feedback_counts(with_latest=True)),
+        ("search_feedback", lambda i: db.search_feedback(rng.choice(WORDS), limit=20)),
+        ("get_feedback_for_teacher", lambda i: db.get_feedback_for_teacher(teacher_ids[i % len(teacher_ids)])),
+    ]
+
+
+def run_benchmarks(sizes, teachers=10, students_per_teacher=50, calls=200, seed=0, workdir=None):
+    """Build one dataset per feedback size and time every case on it.
+    Returns a list of result dicts (one per size and method)."""
+    from database import DatabaseManager
+
+    results = []
+    workdir = workdir or tempfile.mkdtemp(prefix="feedback_bench_")
+    try:
+        for size in sizes:
+            db_path = os.path.join(workdir, f"bench_{size}.db")
+            db = DatabaseManager(db_path)
+            try:
+                started = time.perf_counter()
+                rosters = generate_dataset(db, teachers, students_per_teacher, size, seed)
+                seed_seconds = time.perf_counter() - started
+                print(f"📦 {size} feedback rows seeded in {seed_seconds:.1f}s", file=sys.stderr)
+
+                rng = random.Random(seed)
+                for name, fn in benchmark_cases(db, rosters, rng):
+                    fn(calls)  # warm caches with an index the timed calls don't use
+                    samples = time_calls(fn, calls)
+                    result = {
+                        "size": size,
+                        "teachers": teachers,
+                        "students_per_teacher": students_per_teacher,
+                        "method": name,
+                        "calls": calls,
+                        **percentiles(samples),
+                    }
+                    results.append(result)
+                    print(f"  {name:<28} p50 {result['p50_ms']:>9.3f} ms  "
+                          f"p95 {result['p95_ms']:>9.3f} ms  p99 {result['p99_ms']:>9.3f} ms",
+                          file=sys.stderr)
+            finally:
+                db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def environment():
+    """Metadata recorded with every run so results can be matched to a commit."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def compare(baseline, results, threshold, min_delta_ms=0.05):
+    """Return (method, size, baseline p95, current p95) for every case whose p95 grew
+    by more than the threshold factor and by at least min_delta_ms (timer noise)."""
+    previous = {(r["method"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get((r["method"], r["size"]))
+        if (old and r["p95_ms"] > old["p95_ms"] * threshold
+                and r["p95_ms"] - old["p95_ms"] >= min_delta_ms):
+            regressions.append((r["method"], r["size"], old["p95_ms"], r["p95_ms"]))
+    return regressions
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark DatabaseManager on synthetic data.")
+    parser.add_argument("--sizes", default="1000,10000",
+                        help="Comma-separated feedback row counts, one dataset each")
+    parser.add_argument("--teachers", type=int, default=10)
+    parser.add_argument("--students", type=int, default=50, help="Students per teacher")
+    parser.add_argument("--calls", type=int, default=200, help="Timed calls per method")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON to check for p95 regressions")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Flag methods whose p95 exceeds baseline by this factor")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05,
+                        help="Ignore p95 increases smaller than this many milliseconds")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = {
+        "environment": environment(),
+        "results": run_benchmarks(sizes, args.teachers, args.students, args.calls, args.seed),
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(json.load(f), report["results"], args.threshold,
+                                  args.min_delta_ms)
+        for method, size, old, new in regressions:
+            print(f"❌ {method} @ {size} rows: p95 {old:.3f} ms -> {new:.3f} ms", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("✅ No p95 regressions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
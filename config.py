@@ -3,6 +3,8 @@ Configuration file for Student Feedback System
 Modify these settings to customize the application behavior
 """
 
+import os
+
 # Application Settings
 APP_TITLE = "Student Feedback System"
 APP_ICON = "📝"
@@ -11,6 +13,34 @@ SIDEBAR_STATE = "collapsed"
 
 # Database Settings
 DATABASE_PATH = "feedback_system.db"
+DB_POOL_SIZE = 5  # Maximum open SQLite connections per DatabaseManager
+DB_POOL_TIMEOUT = 10  # Seconds to wait for a free pooled connection
+DB_BUSY_TIMEOUT_MS = 5000  # How long SQLite waits on a locked database
+
+# Sharded storage (sharding.py)
+SHARD_PATHS = []  # Two or more SQLite files to spread teachers over; empty keeps everything in DATABASE_PATH
+SHARD_DIRECTORY_PATH = "feedback_shards.db"  # Maps each teacher to its shard and allocates teacher IDs
+SHARD_DIRECTORY_TTL = 30  # Seconds between reloads of the in-memory teacher -> shard map (picks up other processes' moves)
+
+# Read snapshot replica for dashboard reads
+READ_SNAPSHOT_ENABLED = False  # Serve dashboard reads from a periodically refreshed copy of the database
+READ_SNAPSHOT_DIR = None  # Where snapshot files are written; defaults to the database's directory
+READ_SNAPSHOT_REFRESH_INTERVAL = 60  # Seconds between background refreshes; 0 refreshes only on demand
+READ_SNAPSHOT_MAX_STALENESS = 300  # Snapshots older than this are bypassed and reads go to the database
+
+# Query instrumentation
+QUERY_STATS_ENABLED = True  # Per-method latency histograms and the slow-query log
+SLOW_QUERY_THRESHOLD_MS = 200  # Database calls at least this slow are logged with their SQL
+SLOW_QUERY_LOG_SIZE = 50  # Most recent slow calls kept for the admin dashboard
+
+# AsyncDatabaseManager
+ASYNC_DB_MAX_PENDING = 256  # Calls queued or running before new callers wait
+
+# HTTP ingest service (ingest.py)
+INGEST_HOST = "127.0.0.1"
+INGEST_PORT = 8600
+INGEST_MAX_BODY_BYTES = 64 * 1024  # Larger request bodies are rejected with 413
+INGEST_API_TOKEN = os.environ.get("FEEDBACK_INGEST_TOKEN")  # If set, clients must send "Authorization: Bearer <token>"
 
 # Default Admin Credentials
 DEFAULT_ADMIN_USERNAME = "admin"
@@ -19,6 +49,31 @@ DEFAULT_ADMIN_PASSWORD = "admin123"
 # Feedback Settings
 MIN_WORD_COUNT = 30
 MAX_WORD_COUNT = 1000
+FEEDBACK_PAGE_SIZE = 20  # Feedback entries shown per dashboard page
+ROSTER_PAGE_SIZE = 50  # Students shown per roster window on the teacher dashboard
+
+# Write-behind feedback queue (group commit)
+FEEDBACK_WRITE_BEHIND = False  # Queue submissions and commit them in batches
+FEEDBACK_FLUSH_INTERVAL = 0.05  # Max seconds a submission waits for its batch
+FEEDBACK_BATCH_SIZE = 100  # Max submissions per commit
+FEEDBACK_QUEUE_MAX = 10000  # Submitters block once this many are queued
+FEEDBACK_SUBMIT_TIMEOUT = 10  # Seconds the form waits for its submission to commit
+
+# Feedback archival (archive.py)
+ARCHIVE_AFTER_DAYS = 365  # Feedback older than this moves to the compressed archive database
+ARCHIVE_BATCH_SIZE = 500  # Rows moved per write transaction
+ARCHIVE_BATCH_PAUSE = 0.05  # Seconds between batches so submissions get the write lock
+ARCHIVE_INTERVAL = 86400  # Default seconds between runs of archive.py --interval
+
+# In-memory roster index used to resolve student IDs
+ROSTER_INDEX_MAX_TEACHERS = 256  # Rosters kept in memory before LRU eviction
+ROSTER_INDEX_TTL = 300  # Seconds before a cached roster is reloaded
+
+# Feedback analytics
+ROLLUP_CHUNK_SIZE = 5000  # Feedback rows folded into the daily rollups per transaction
+ANALYTICS_DAYS = 30  # Days of history charted on the dashboards
+TEXT_ANALYTICS_BATCH_SIZE = 2000  # Feedback entries tokenized per batch by analytics.py
+TEXT_ANALYTICS_INTERVAL = 300  # Default seconds between runs of analytics.py --interval
 
 # UI Colors and Styling
 PRIMARY_COLOR = "#667eea"
@@ -46,9 +101,12 @@ EMAIL_ENABLED = False
 # Security Settings
 PASSWORD_MIN_LENGTH = 6
 PASSWORD_REQUIRE_SPECIAL_CHARS = False
-LOGIN_ATTEMPT_LIMIT = 5
-LOGIN_LOCKOUT_DURATION = 300  # 5 minutes
+LOGIN_ATTEMPT_LIMIT = 5  # Failed logins allowed per username/client within the window
+LOGIN_TRUSTED_PROXIES = 0  # Reverse proxies in front of the app that append to X-Forwarded-For; 0 ignores the header
+LOGIN_LOCKOUT_DURATION = 300  # 5 minutes; sliding window for counting failures
+LOGIN_THROTTLE_MAX_KEYS = 10000  # Username/client pairs tracked in memory
 
-# Export Settings (for future use)
-EXPORT_FORMATS = ['csv', 'pdf', 'excel']
-EXPORT_MAX_RECORDS = 1000
+# Export Settings
+EXPORT_FORMATS = ['csv', 'jsonl']
+EXPORT_MAX_RECORDS = 1000  # Rows per dashboard download (built in memory); the CLI is unlimited
+EXPORT_CHUNK_SIZE = 1000  # Rows fetched per query while streaming an export
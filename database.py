@@ -1,389 +1,2259 @@
 import sqlite3
+import atexit
+import bisect
+import csv
 import hashlib
+import io
+import logging
 import secrets
+import queue
+import re
+import threading
+import time
+import functools
+import heapq
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime
+from enum import Enum
+from pathlib import Path
 import os
+import tempfile
 
-class DatabaseManager:
-    def __init__(self, db_path="feedback_system.db"):
+from config import (
+    DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_BUSY_TIMEOUT_MS, FEEDBACK_PAGE_SIZE, ROSTER_PAGE_SIZE,
+    FEEDBACK_WRITE_BEHIND, FEEDBACK_FLUSH_INTERVAL, FEEDBACK_BATCH_SIZE, FEEDBACK_QUEUE_MAX,
+    ROSTER_INDEX_MAX_TEACHERS, ROSTER_INDEX_TTL, ROLLUP_CHUNK_SIZE,
+    LOGIN_ATTEMPT_LIMIT, LOGIN_LOCKOUT_DURATION, LOGIN_THROTTLE_MAX_KEYS,
+    QUERY_STATS_ENABLED, SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_LOG_SIZE,
+    MIN_WORD_COUNT,
+    READ_SNAPSHOT_ENABLED, READ_SNAPSHOT_DIR, READ_SNAPSHOT_REFRESH_INTERVAL, READ_SNAPSHOT_MAX_STALENESS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _to_db_timestamp(value):
+    """Format a date/datetime the way submission_time is stored (UTC, 'YYYY-MM-DD HH:MM:SS').
+    Strings are passed through unchanged."""
+    if value is None or isinstance(value, str):
+        return value
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class ConnectionPool:
+    """Thread-safe pool of SQLite connections.
+
+    Connections are opened lazily up to ``size``, switched to WAL journal mode
+    and given a busy timeout so readers and writers don't block each other.
+    A thread that already holds a connection gets the same one back on nested
+    borrows, so DatabaseManager methods that call each other share it.
+    With read_only=True the file is opened immutable (no locking, no journal),
+    which is only safe for files nothing writes to, such as read snapshots.
+    """
+
+    def __init__(self, db_path, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 busy_timeout_ms=DB_BUSY_TIMEOUT_MS, stats=None, read_only=False):
         self.db_path = db_path
-        self.init_database()
-    
-    def init_database(self):
-        """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create admin table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS admins (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        self.size = size
+        self.timeout = timeout
+        self.busy_timeout_ms = busy_timeout_ms
+        self.stats = stats
+        self.read_only = read_only
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._local = threading.local()
+        self._closed = False
+
+    def _open(self):
+        if self.read_only:
+            conn = sqlite3.connect(
+                Path(self.db_path).absolute().as_uri() + "?mode=ro&immutable=1",
+                uri=True,
+                check_same_thread=False,
             )
-        ''')
-        
-        # Create teachers table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS teachers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                full_name TEXT NOT NULL,
-                email TEXT,
-                subject TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        else:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.busy_timeout_ms / 1000,
+                check_same_thread=False,
             )
-        ''')
-        
-        # Create students table (per-teacher student roster)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS students (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                teacher_id INTEGER NOT NULL,
-                student_id TEXT NOT NULL,
-                student_name TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(teacher_id, student_id),
-                FOREIGN KEY (teacher_id) REFERENCES teachers (id)
+            conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+            conn.execute("PRAGMA journal_mode = WAL")
+        if self.stats is not None:
+            conn.set_trace_callback(self.stats.trace)
+        return conn
+
+    def _is_healthy(self, conn) -> bool:
+        # The health check is pool overhead, not SQL of the instrumented call borrowing the connection
+        if self.stats is not None:
+            conn.set_trace_callback(None)
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+        finally:
+            if self.stats is not None:
+                conn.set_trace_callback(self.stats.trace)
+
+    def _acquire(self):
+        if self._closed:
+            raise sqlite3.OperationalError("connection pool is closed")
+        if not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError(
+                f"timed out after {self.timeout}s waiting for a database connection"
             )
-        ''')
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._open()
+                if self._is_healthy(conn):
+                    return conn
+                conn.close()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+        except sqlite3.Error:
+            conn.close()
+        finally:
+            self._slots.release()
+
+    def held(self):
+        """The connection the current thread has borrowed, or None."""
+        return getattr(self._local, "conn", None)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a ``with`` block."""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+
+        started = time.perf_counter()
+        conn = self._acquire()
+        if self.stats is not None:
+            self.stats.record("pool.acquire", time.perf_counter() - started)
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    def close(self):
+        """Close idle connections; connections in use are closed when returned."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class SnapshotReplica:
+    """Read-only copy of the database, refreshed with SQLite's online backup API.
+
+    Each refresh backs the primary up into a new file (``<path>.<n>``) in one
+    step (under WAL this holds a read transaction, so submissions keep
+    committing) and swaps in a fresh read-only pool over it. Readers still using
+    the previous pool keep their file until the next refresh retires it; files
+    are never replaced while open, which Windows does not allow. close() (also
+    registered with atexit) deletes every snapshot file.
+
+    ``generation`` is a callable whose value is recorded at the start of each
+    refresh; pool_for() can require the snapshot to be at least that current.
+    """
+
+    def __init__(self, source, path, generation=lambda: 0, size=DB_POOL_SIZE,
+                 max_staleness=READ_SNAPSHOT_MAX_STALENESS, stats=None):
+        self.source = source
+        self.path = path
+        self.generation = generation
+        self.size = size
+        self.max_staleness = max_staleness
+        self.stats = stats
+        self.refreshes = 0
+        self.last_refresh_ms = None
+        self.refreshed_at = None
+        self._refreshed_monotonic = None
+        self._snapshot_generation = None
+        self._pool = None
+        self._retired = None
+        self._serial = 0
+        self._stale_files = []
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        atexit.register(self.close)
+
+    def refresh(self):
+        """Copy the primary database into the snapshot now."""
+        with self._refresh_lock:
+            if self._stop.is_set():
+                raise sqlite3.OperationalError("read snapshot is closed")
+            started = time.perf_counter()
+            generation = self.generation()
+            self._serial += 1
+            path = f"{self.path}.{self._serial}"
+            dest = sqlite3.connect(path)
+            try:
+                with self.source.connection() as conn:
+                    conn.backup(dest)
+                # The copy inherits WAL mode; immutable readers need a self-contained file
+                dest.execute("PRAGMA journal_mode = DELETE")
+            except BaseException:
+                dest.close()
+                self._remove_files([path])
+                raise
+            dest.close()
+
+            pool = ConnectionPool(path, size=self.size, stats=self.stats, read_only=True)
+            with self._lock:
+                retired, self._retired = self._retired, self._pool
+                self._pool = pool
+                self._snapshot_generation = generation
+                self._refreshed_monotonic = time.monotonic()
+                self.refreshed_at = datetime.now()
+                self.refreshes += 1
+                self.last_refresh_ms = round((time.perf_counter() - started) * 1000, 1)
+            if retired is not None:
+                retired.close()
+                self._stale_files.append(retired.db_path)
+            self._stale_files = self._remove_files(self._stale_files)
+        logger.debug("Read snapshot %s refreshed in %.1f ms", path, self.last_refresh_ms)
+
+    @staticmethod
+    def _remove_files(paths):
+        """Delete snapshot files; returns the ones still in use (Windows) to retry later."""
+        kept = []
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                kept.append(path)
+        return kept
+
+    def age(self):
+        """Seconds since the last refresh, or None before the first one."""
+        with self._lock:
+            if self._refreshed_monotonic is None:
+                return None
+            return time.monotonic() - self._refreshed_monotonic
+
+    def pool_for(self, generation=None):
+        """The snapshot's pool if it is within max_staleness (and, when given, taken at
+        or after ``generation``); otherwise None and the caller should read the primary."""
+        with self._lock:
+            if self._pool is None or self._stop.is_set():
+                return None
+            if time.monotonic() - self._refreshed_monotonic > self.max_staleness:
+                return None
+            if generation is not None and self._snapshot_generation != generation:
+                return None
+            return self._pool
+
+    def start(self, interval):
+        """Refresh now and then every ``interval`` seconds on a daemon thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="feedback-snapshot", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, interval):
+        wait = 0
+        while not self._stop.wait(wait):
+            try:
+                self.refresh()
+            except Exception:
+                if self._stop.is_set():
+                    return
+                logger.exception("Read snapshot refresh failed")
+            wait = interval
+
+    def status(self) -> dict:
+        """Refresh count, timing and age for the dashboards."""
+        age = self.age()
+        with self._lock:
+            path = self._pool.db_path if self._pool is not None else None
+        return {
+            "path": path,
+            "refreshed_at": self.refreshed_at,
+            "age_seconds": None if age is None else round(age, 1),
+            "max_staleness": self.max_staleness,
+            "fresh": age is not None and age <= self.max_staleness,
+            "refreshes": self.refreshes,
+            "last_refresh_ms": self.last_refresh_ms,
+        }
+
+    def close(self):
+        """Stop refreshing, close the snapshot pools and delete the snapshot file."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._refresh_lock, self._lock:
+            for pool in (self._pool, self._retired):
+                if pool is not None:
+                    pool.close()
+                    self._stale_files.append(pool.db_path)
+            self._pool = self._retired = None
+            self._stale_files = self._remove_files(self._stale_files + [self.path])
+        atexit.unregister(self.close)
+
+
+class FeedbackArchive:
+    """Cold store for old feedback: a separate SQLite file with zlib-compressed text.
+
+    Archived rows keep their feedback IDs, so storing a batch again (after a crash
+    between copying and deleting it from the hot table) just replaces it. The file
+    is created on first write; reads before then find nothing.
+    """
+
+    def __init__(self, path, size=2):
+        self.path = path
+        self.pool = ConnectionPool(path, size=size)
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _ensure_schema(self, conn):
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS archived_feedback (
+                    id INTEGER PRIMARY KEY,
+                    teacher_id INTEGER NOT NULL,
+                    student_id TEXT,
+                    student_name TEXT NOT NULL,
+                    feedback_text BLOB NOT NULL,
+                    submission_time TIMESTAMP NOT NULL,
+                    submission_day TEXT,
+                    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_archived_feedback_teacher_time
+                ON archived_feedback (teacher_id, submission_time)
+            ''')
+            conn.commit()
+            self._schema_ready = True
+
+    def store(self, rows):
+        """Archive (id, teacher_id, student_id, student_name, feedback_text,
+        submission_time, submission_day) rows in one transaction."""
+        with self.pool.connection() as conn:
+            self._ensure_schema(conn)
+            try:
+                conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO archived_feedback
+                        (id, teacher_id, student_id, student_name, feedback_text,
+                         submission_time, submission_day)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [(row[0], row[1], row[2], row[3], zlib.compress(row[4].encode("utf-8")),
+                      row[5], row[6]) for row in rows],
+                )
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+
+    def _read(self, sql, params):
+        if not os.path.exists(self.path):
+            return []
+        with self.pool.connection() as conn:
+            self._ensure_schema(conn)
+            return conn.execute(sql, params).fetchall()
+
+    def feedback_for_teacher(self, teacher_id):
+        """A teacher's archived feedback as (id, student_name, feedback_text,
+        submission_time), newest first."""
+        rows = self._read(
+            """
+            SELECT id, student_name, feedback_text, submission_time
+            FROM archived_feedback
+            WHERE teacher_id = ?
+            ORDER BY submission_time DESC
+            """,
+            (teacher_id,),
+        )
+        return [(row[0], row[1], zlib.decompress(row[2]).decode("utf-8"), row[3]) for row in rows]
+
+    def teacher_rows(self, teacher_id):
+        """A teacher's archived rows in the format store() takes."""
+        rows = self._read(
+            """
+            SELECT id, teacher_id, student_id, student_name, feedback_text,
+                   submission_time, submission_day
+            FROM archived_feedback
+            WHERE teacher_id = ?
+            """,
+            (teacher_id,),
+        )
+        return [row[:4] + (zlib.decompress(row[4]).decode("utf-8"),) + row[5:] for row in rows]
+
+    def delete_teacher(self, teacher_id):
+        """Drop a teacher's archived feedback."""
+        if not os.path.exists(self.path):
+            return
+        with self.pool.connection() as conn:
+            self._ensure_schema(conn)
+            conn.execute("DELETE FROM archived_feedback WHERE teacher_id = ?", (teacher_id,))
+            conn.commit()
+
+    def stats(self) -> dict:
+        """Archived row count and compressed text size in bytes."""
+        result = self._read(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(feedback_text)), 0) FROM archived_feedback", ()
+        )
+        count, size = result[0] if result else (0, 0)
+        return {"rows": count, "compressed_bytes": size}
+
+    def close(self):
+        self.pool.close()
+
+
+class QueryStats:
+    """Low-overhead latency statistics for DatabaseManager calls.
+
+    Each instrumented method gets a call count, error count, rows returned and
+    a fixed-bucket latency histogram. While an outermost instrumented call is
+    running, the pool's trace callback collects the SQL it executes; calls
+    slower than ``slow_threshold_ms`` are logged with that SQL and kept in a
+    bounded slow-query log.
+    """
+
+    # String, blob and numeric literals; the trace callback sees statements with bound
+    # parameters expanded, which would put password hashes and feedback text in the log
+    _LITERAL_RE = re.compile(r"[xX]?'(?:[^']|'')*'|\b\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+
+    BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf"))
+
+    def __init__(self, slow_threshold_ms=SLOW_QUERY_THRESHOLD_MS, slow_log_size=SLOW_QUERY_LOG_SIZE):
+        self.slow_threshold_ms = slow_threshold_ms
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._methods = {}
+        self.slow_queries = deque(maxlen=slow_log_size)
+
+    def trace(self, statement):
+        """sqlite3 trace callback: remember statements run by the active call."""
+        statements = getattr(self._local, "statements", None)
+        if statements is not None:
+            statements.append(statement)
+
+    def begin(self):
+        """Start collecting SQL if no instrumented call is active on this thread.
+        Returns True for the outermost call, which must pass it back to end()."""
+        if getattr(self._local, "statements", None) is None:
+            self._local.statements = []
+            return True
+        return False
+
+    def end(self, name, seconds, rows=None, error=False, outermost=False):
+        """Record a finished call; the outermost one also checks the slow threshold."""
+        self.record(name, seconds, rows, error)
+        if not outermost:
+            return
+        statements = self._local.statements
+        self._local.statements = None
+        elapsed_ms = seconds * 1000
+        if elapsed_ms >= self.slow_threshold_ms:
+            entry = {
+                "method": name,
+                "ms": round(elapsed_ms, 2),
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "sql": self._summarize_sql(statements),
+            }
+            self.slow_queries.append(entry)
+            logger.warning("Slow database call %s took %.1f ms: %s",
+                           name, elapsed_ms, "; ".join(entry["sql"]) or "(no SQL)")
+
+    @staticmethod
+    def _summarize_sql(statements, max_chars=300):
+        """Statements as logged: trigger sub-statements ('-- ...') and immediate
+        repeats (busy retries) dropped, literals replaced by '?', whitespace
+        collapsed, long text cut."""
+        summary = []
+        for sql in statements:
+            if sql.startswith("--"):
+                continue
+            sql = " ".join(QueryStats._LITERAL_RE.sub("?", sql).split())
+            if len(sql) > max_chars:
+                sql = sql[:max_chars] + "…"
+            if not summary or summary[-1] != sql:
+                summary.append(sql)
+        return summary
+
+    def record(self, name, seconds, rows=None, error=False):
+        elapsed_ms = seconds * 1000
+        bucket = bisect.bisect_left(self.BUCKETS_MS, elapsed_ms)
+        with self._lock:
+            entry = self._methods.get(name)
+            if entry is None:
+                entry = self._methods[name] = {
+                    "calls": 0, "errors": 0, "rows": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "histogram": [0] * len(self.BUCKETS_MS),
+                }
+            entry["calls"] += 1
+            entry["errors"] += error
+            entry["rows"] += rows or 0
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["histogram"][bucket] += 1
+
+    def _percentile(self, entry, q):
+        """Upper bound of the histogram bucket holding the q-th quantile."""
+        target = q * entry["calls"]
+        seen = 0
+        for bound, count in zip(self.BUCKETS_MS, entry["histogram"]):
+            seen += count
+            if seen >= target:
+                return min(bound, entry["max_ms"])
+        return entry["max_ms"]
+
+    def snapshot(self) -> dict:
+        """Return {"methods": {name: figures}, "slow_queries": [...]}; latencies in ms.
+        p50/p95/p99 are histogram estimates (bucket upper bounds)."""
+        with self._lock:
+            methods = {name: dict(entry, histogram=list(entry["histogram"]))
+                       for name, entry in self._methods.items()}
+            slow = list(self.slow_queries)
+        for entry in methods.values():
+            entry["mean_ms"] = entry["total_ms"] / entry["calls"]
+            entry["p50_ms"] = self._percentile(entry, 0.50)
+            entry["p95_ms"] = self._percentile(entry, 0.95)
+            entry["p99_ms"] = self._percentile(entry, 0.99)
+            entry["histogram"] = {
+                (f"≤{bound:g}ms" if bound != float("inf") else f">{self.BUCKETS_MS[-2]:g}ms"): count
+                for bound, count in zip(self.BUCKETS_MS, entry["histogram"])
+            }
+        return {"methods": methods, "slow_queries": slow}
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+            self.slow_queries.clear()
+
+
+def _result_rows(result):
+    """Row count of a DatabaseManager result: lists, (rows, has_more) pages and dicts."""
+    if isinstance(result, (list, dict)):
+        return len(result)
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        return len(result[0])
+    return 0
+
+
+def _instrumented(method):
+    """Record a DatabaseManager method's latency and rows in self.query_stats."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        stats = self.query_stats
+        if stats is None:
+            return method(self, *args, **kwargs)
+        outermost = stats.begin()
+        started = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        except BaseException:
+            stats.end(name, time.perf_counter() - started, error=True, outermost=outermost)
+            raise
+        stats.end(name, time.perf_counter() - started, _result_rows(result), outermost=outermost)
+        return result
+
+    return wrapper
+
+
+class LoginThrottled(Exception):
+    """Raised instead of checking credentials while a login key is locked out."""
 
-        # Create feedback table
+    def __init__(self, retry_after: float):
+        super().__init__(f"Too many failed login attempts; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class LoginThrottle:
+    """Sliding-window limiter for failed logins.
+
+    A key (login kind, username, client) is locked once it has ``limit`` failures
+    within the last ``window`` seconds, until the oldest of them ages out. At
+    most ``max_keys`` keys are tracked; the least recently used are dropped.
+    """
+
+    def __init__(self, limit=LOGIN_ATTEMPT_LIMIT, window=LOGIN_LOCKOUT_DURATION,
+                 max_keys=LOGIN_THROTTLE_MAX_KEYS):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._failures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prune(self, key, now):
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        while failures and now - failures[0] >= self.window:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+    def check(self, key):
+        """Raise LoginThrottled if the key is currently locked out."""
+        now = time.monotonic()
+        with self._lock:
+            failures = self._prune(key, now)
+            if failures is not None and len(failures) >= self.limit:
+                raise LoginThrottled(failures[0] + self.window - now)
+
+    def record_failure(self, key):
+        now = time.monotonic()
+        with self._lock:
+            failures = self._prune(key, now)
+            if failures is None:
+                failures = self._failures[key] = deque(maxlen=self.limit)
+            failures.append(now)
+            self._failures.move_to_end(key)
+            while len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+
+    def reset(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+
+
+class RosterIndex:
+    """In-memory student_id -> student_name maps, one per teacher.
+
+    Rosters are loaded on first lookup and kept for ``ttl`` seconds; at most
+    ``max_teachers`` rosters are held, evicting the least recently used.
+    DatabaseManager invalidates a teacher's entry whenever its roster changes.
+    """
+
+    def __init__(self, loader, max_teachers=ROSTER_INDEX_MAX_TEACHERS, ttl=ROSTER_INDEX_TTL):
+        self._loader = loader
+        self.max_teachers = max_teachers
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _roster(self, teacher_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(teacher_id)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(teacher_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            epoch = self._epoch
+        roster = self._loader(teacher_id)
+        with self._lock:
+            # Don't cache a roster that was invalidated while we were loading it
+            if self._epoch == epoch:
+                self._entries[teacher_id] = (now, roster)
+                self._entries.move_to_end(teacher_id)
+                while len(self._entries) > self.max_teachers:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return roster
+
+    def lookup(self, teacher_id, student_id):
+        """Return the student's name, or None if the ID is not on the teacher's roster."""
+        return self._roster(teacher_id).get(student_id.strip())
+
+    def invalidate(self, teacher_id=None):
+        """Drop one teacher's roster, or all of them."""
+        with self._lock:
+            self._epoch += 1
+            if teacher_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(teacher_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "teachers": len(self._entries),
+                "students": sum(len(entry[1]) for entry in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+class SubmitResult(Enum):
+    """Outcome of a feedback submission. Only OK is truthy."""
+    OK = "ok"
+    UNKNOWN_STUDENT = "unknown_student"
+    ALREADY_SUBMITTED = "already_submitted"
+
+    def __bool__(self):
+        return self is SubmitResult.OK
+
+
+def validate_feedback_text(feedback_text, max_words=None):
+    """Return an error message if feedback text breaks the word-count rules, else None.
+    Shared by the Streamlit form and the HTTP ingest service; only the ingest service
+    passes max_words (MAX_WORD_COUNT) to cap the length."""
+    word_count = len(feedback_text.split()) if feedback_text else 0
+    if word_count == 0:
+        return "Please enter your feedback!"
+    if word_count < MIN_WORD_COUNT:
+        return f"Feedback must be at least {MIN_WORD_COUNT} words. Current: {word_count} words"
+    if max_words is not None and word_count > max_words:
+        return f"Feedback must be at most {max_words} words. Current: {word_count} words"
+    return None
+
+
+class FeedbackWriter:
+    """Background writer that group-commits feedback submissions.
+
+    submit() queues an entry and returns a Future that resolves to the
+    SubmitResult DatabaseManager.submit_feedback_once would return. A single
+    thread collects up to ``batch_size`` entries, waiting at most
+    ``flush_interval`` seconds after the first one, and writes them with
+    submit_feedback_batch in one transaction.
+    close() (also registered with atexit) drains everything already queued.
+    """
+
+    _STOP = object()
+
+    def __init__(self, db, flush_interval=FEEDBACK_FLUSH_INTERVAL,
+                 batch_size=FEEDBACK_BATCH_SIZE, max_queue=FEEDBACK_QUEUE_MAX):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._flushes = 0
+        self._written = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self._thread = threading.Thread(target=self._run, name="feedback-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, teacher_id: int, student_id: str, feedback_text: str) -> Future:
+        """Queue a submission; blocks while the queue is full."""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("feedback writer is closed")
+            self._queue.put((teacher_id, student_id, feedback_text, future))
+        return future
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch):
+        futures = [entry[3] for entry in batch]
+        started = time.perf_counter()
+        try:
+            results = self.db.submit_feedback_batch([entry[:3] for entry in batch])
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._flushes += 1
+        self._written += sum(1 for result in results if result is SubmitResult.OK)
+        self._last_flush_ms = elapsed_ms
+        self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+        for future, ok in zip(futures, results):
+            future.set_result(ok)
+
+    def stats(self) -> dict:
+        """Return queue depth and flush latency figures (milliseconds)."""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "flushes": self._flushes,
+            "written": self._written,
+            "last_flush_ms": self._last_flush_ms,
+            "max_flush_ms": self._max_flush_ms,
+            "avg_flush_ms": self._total_flush_ms / self._flushes if self._flushes else 0.0,
+        }
+
+    def close(self, timeout=None):
+        """Stop accepting submissions and wait for queued ones to be written."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(self._STOP)
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+
+
+def _teacher_alpha(n: int) -> str:
+    """Convert a 1-based teacher id to Excel-like column letters (1 -> A, 27 -> AA)."""
+    letters = []
+    while n > 0:
+        n, rem = divmod(n - 1, 26)
+        letters.append(chr(ord('A') + rem))
+    return ''.join(reversed(letters))
+
+
+def _student_id_seq(student_id, alpha: str):
+    """Return the sequence number in SID{alpha}{seq} or legacy SID{seq} IDs, else None."""
+    if not isinstance(student_id, str):
+        return None
+    # Prefer new format: SID{alpha}{digits}
+    if student_id.startswith("SID" + alpha):
+        tail = student_id[3 + len(alpha):]
+        if tail.isdigit():
+            return int(tail)
+    # Fallback: legacy format SID{digits}
+    if student_id.startswith("SID") and student_id[3:].isdigit():
+        return int(student_id[3:])
+    return None
+
+
+def _migrate_base_schema(cursor):
+    """Create the admins, teachers, students and feedback tables and the default admin."""
+    # Create admin table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS admins (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Create teachers table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS teachers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            full_name TEXT NOT NULL,
+            email TEXT,
+            subject TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Create students table (per-teacher student roster)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS students (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            teacher_id INTEGER NOT NULL,
+            student_id TEXT NOT NULL,
+            student_name TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(teacher_id, student_id),
+            FOREIGN KEY (teacher_id) REFERENCES teachers (id)
+        )
+    ''')
+
+    # Create feedback table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            teacher_id INTEGER NOT NULL,
+            student_name TEXT NOT NULL,
+            feedback_text TEXT NOT NULL,
+            submission_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (teacher_id) REFERENCES teachers (id)
+        )
+    ''')
+
+    # Insert default admin if not exists
+    cursor.execute("SELECT * FROM admins WHERE username = 'admin'")
+    if not cursor.fetchone():
+        admin_password = "admin123"
+        admin_hash = hashlib.sha256(admin_password.encode()).hexdigest()
+        cursor.execute("INSERT INTO admins (username, password_hash) VALUES (?, ?)",
+                     ('admin', admin_hash))
+
+
+def _feedback_columns(cursor):
+    cursor.execute("PRAGMA table_info(feedback)")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def _migrate_feedback_student_id(cursor):
+    """Add the student_id column to feedback."""
+    if 'student_id' not in _feedback_columns(cursor):
+        cursor.execute("ALTER TABLE feedback ADD COLUMN student_id TEXT")
+
+
+def _migrate_feedback_indexes(cursor):
+    """Index feedback for per-teacher listing, the daily duplicate check and admin paging."""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_teacher_time
+        ON feedback (teacher_id, submission_time)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_teacher_student_time
+        ON feedback (teacher_id, student_id, submission_time)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_time
+        ON feedback (submission_time)
+    ''')
+
+
+def _migrate_feedback_counts(cursor):
+    """Create per-teacher feedback counters kept in sync by triggers, and backfill them."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_counts (
+            teacher_id INTEGER PRIMARY KEY,
+            feedback_count INTEGER NOT NULL DEFAULT 0,
+            last_submission TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_counts_insert
+        AFTER INSERT ON feedback
+        BEGIN
+            INSERT INTO feedback_counts (teacher_id, feedback_count, last_submission)
+            VALUES (NEW.teacher_id, 1, NEW.submission_time)
+            ON CONFLICT (teacher_id) DO UPDATE SET
+                feedback_count = feedback_count + 1,
+                last_submission = MAX(COALESCE(last_submission, ''), excluded.last_submission);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_counts_delete
+        AFTER DELETE ON feedback
+        BEGIN
+            UPDATE feedback_counts SET
+                feedback_count = feedback_count - 1,
+                last_submission = (
+                    SELECT MAX(submission_time) FROM feedback
+                    WHERE teacher_id = OLD.teacher_id
+                )
+            WHERE teacher_id = OLD.teacher_id;
+        END
+    ''')
+    cursor.execute('''
+        INSERT OR REPLACE INTO feedback_counts (teacher_id, feedback_count, last_submission)
+        SELECT teacher_id, COUNT(*), MAX(submission_time)
+        FROM feedback
+        GROUP BY teacher_id
+    ''')
+
+
+def _migrate_student_id_sequences(cursor):
+    """Create per-teacher student ID sequences seeded from existing roster IDs."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS student_id_sequences (
+            teacher_id INTEGER PRIMARY KEY,
+            last_seq INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    last_seqs = {}
+    cursor.execute("SELECT teacher_id, student_id FROM students")
+    for teacher_id, student_id in cursor.fetchall():
+        seq = _student_id_seq(student_id, _teacher_alpha(int(teacher_id)))
+        if seq is not None:
+            last_seqs[teacher_id] = max(seq, last_seqs.get(teacher_id, 0))
+    cursor.executemany(
+        """
+        INSERT INTO student_id_sequences (teacher_id, last_seq) VALUES (?, ?)
+        ON CONFLICT (teacher_id) DO UPDATE SET last_seq = MAX(last_seq, excluded.last_seq)
+        """,
+        last_seqs.items(),
+    )
+
+
+def _migrate_feedback_submission_day(cursor):
+    """Add the local submission day backing the one-per-day unique index.
+    Only the first entry of any pre-existing same-day duplicates gets a day.
+    """
+    if 'submission_day' not in _feedback_columns(cursor):
+        cursor.execute("ALTER TABLE feedback ADD COLUMN submission_day TEXT")
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS feedback (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                teacher_id INTEGER NOT NULL,
-                student_name TEXT NOT NULL,
-                feedback_text TEXT NOT NULL,
-                submission_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (teacher_id) REFERENCES teachers (id)
+            UPDATE feedback
+            SET submission_day = DATE(submission_time, 'localtime')
+            WHERE id IN (
+                SELECT MIN(id) FROM feedback
+                GROUP BY teacher_id, student_id, DATE(submission_time, 'localtime')
             )
         ''')
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_feedback_one_per_day
+        ON feedback (teacher_id, student_id, submission_day)
+    ''')
+
+
+def _migrate_feedback_fts(cursor):
+    """Create the FTS5 index over feedback text and student names, kept in sync by
+    triggers, and build it from the existing rows."""
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS feedback_fts USING fts5(
+            feedback_text, student_name,
+            content='feedback', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_fts_insert
+        AFTER INSERT ON feedback
+        BEGIN
+            INSERT INTO feedback_fts (rowid, feedback_text, student_name)
+            VALUES (NEW.id, NEW.feedback_text, NEW.student_name);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_fts_delete
+        AFTER DELETE ON feedback
+        BEGIN
+            INSERT INTO feedback_fts (feedback_fts, rowid, feedback_text, student_name)
+            VALUES ('delete', OLD.id, OLD.feedback_text, OLD.student_name);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_fts_update
+        AFTER UPDATE OF feedback_text, student_name ON feedback
+        BEGIN
+            INSERT INTO feedback_fts (feedback_fts, rowid, feedback_text, student_name)
+            VALUES ('delete', OLD.id, OLD.feedback_text, OLD.student_name);
+            INSERT INTO feedback_fts (rowid, feedback_text, student_name)
+            VALUES (NEW.id, NEW.feedback_text, NEW.student_name);
+        END
+    ''')
+    cursor.execute("INSERT INTO feedback_fts (feedback_fts) VALUES ('rebuild')")
+
+
+def _migrate_feedback_rollups(cursor):
+    """Create the daily feedback rollups and their watermark. Rows are filled in
+    incrementally by DatabaseManager.refresh_feedback_rollups."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_daily (
+            teacher_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            submissions INTEGER NOT NULL DEFAULT 0,
+            students INTEGER NOT NULL DEFAULT 0,
+            words INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (teacher_id, day)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_daily_day
+        ON feedback_daily (day)
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_student_totals (
+            teacher_id INTEGER NOT NULL,
+            student_id TEXT NOT NULL,
+            submissions INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (teacher_id, student_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rollup_watermarks (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute("INSERT OR IGNORE INTO rollup_watermarks (name, last_id) VALUES ('feedback', 0)")
+
+
+def _migrate_text_analytics(cursor):
+    """Create the tables the text-analytics job (analytics.py) writes: per-teacher
+    term frequencies and a sentiment score per feedback entry."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS teacher_terms (
+            teacher_id INTEGER NOT NULL,
+            term TEXT NOT NULL,
+            occurrences INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (teacher_id, term)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_teacher_terms_top
+        ON teacher_terms (teacher_id, occurrences)
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_sentiment (
+            feedback_id INTEGER PRIMARY KEY,
+            teacher_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            score REAL NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_sentiment_teacher_day
+        ON feedback_sentiment (teacher_id, day)
+    ''')
+    cursor.execute("INSERT OR IGNORE INTO rollup_watermarks (name, last_id) VALUES ('text_analytics', 0)")
+
+
+def _migrate_student_roster_index(cursor):
+    """Index each teacher's roster by (created_at, id) for the windowed roster view."""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_students_teacher_created
+        ON students (teacher_id, created_at, id)
+    ''')
+
+
+def _fts_query(text):
+    """Turn free-form search input into an FTS5 query: every word must match, the
+    last one as a prefix. Words are quoted so FTS5 operators are taken literally."""
+    terms = ['"%s"' % term.replace('"', '""') for term in text.split()]
+    if not terms:
+        return None
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+# Ordered schema migrations; PRAGMA user_version records how many have been applied.
+# Append new migrations to the end and never reorder or remove existing ones.
+MIGRATIONS = [
+    _migrate_base_schema,
+    _migrate_feedback_student_id,
+    _migrate_feedback_indexes,
+    _migrate_feedback_counts,
+    _migrate_student_id_sequences,
+    _migrate_feedback_submission_day,
+    _migrate_feedback_fts,
+    _migrate_feedback_rollups,
+    _migrate_text_analytics,
+    _migrate_student_roster_index,
+]
+
+
+def fold_feedback_rollups(conn, rows):
+    """Add (teacher_id, student_id, feedback_text, submission_day, day) feedback rows
+    to the daily rollups and per-student totals on conn; the caller commits."""
+    daily = {}
+    student_totals = {}
+    for teacher_id, student_id, text, submission_day, day in rows:
+        totals = daily.setdefault((teacher_id, day), [0, 0, 0])
+        totals[0] += 1
+        # submission_day is only set on a student's first entry of the
+        # day (the one-per-day index), so it marks distinct students.
+        totals[1] += submission_day is not None
+        totals[2] += len(text.split())
+        if student_id is not None:
+            key = (teacher_id, student_id)
+            student_totals[key] = student_totals.get(key, 0) + 1
+
+    conn.executemany(
+        """
+        INSERT INTO feedback_daily (teacher_id, day, submissions, students, words)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (teacher_id, day) DO UPDATE SET
+            submissions = submissions + excluded.submissions,
+            students = students + excluded.students,
+            words = words + excluded.words
+        """,
+        [key + tuple(totals) for key, totals in daily.items()],
+    )
+    conn.executemany(
+        """
+        INSERT INTO feedback_student_totals (teacher_id, student_id, submissions)
+        VALUES (?, ?, ?)
+        ON CONFLICT (teacher_id, student_id) DO UPDATE SET
+            submissions = submissions + excluded.submissions
+        """,
+        [key + (count,) for key, count in student_totals.items()],
+    )
+
+
+def add_feedback_counts(conn, totals):
+    """Add {teacher_id: (entries, latest submission_time)} to feedback_counts on conn
+    for feedback kept outside the feedback table (the archive); the caller commits."""
+    conn.executemany(
+        """
+        INSERT INTO feedback_counts (teacher_id, feedback_count, last_submission)
+        VALUES (?, ?, ?)
+        ON CONFLICT (teacher_id) DO UPDATE SET
+            feedback_count = feedback_count + excluded.feedback_count,
+            last_submission = MAX(COALESCE(last_submission, ''), excluded.last_submission)
+        """,
+        [(teacher_id, count, latest) for teacher_id, (count, latest) in totals.items()],
+    )
+
+
+def iter_roster_csv(fileobj, encoding="utf-8-sig"):
+    """Yield (line_no, student_id, student_name) from a roster CSV without loading it whole.
+    The header must contain a student_name (or name) column; a student_id column is
+    optional and blank IDs are auto-generated on import. Accepts text or binary files.
+    """
+    if isinstance(fileobj, (io.RawIOBase, io.BufferedIOBase)) or hasattr(fileobj, "getbuffer"):
+        fileobj = io.TextIOWrapper(fileobj, encoding=encoding, newline="")
+    reader = csv.DictReader(fileobj)
+    fields = {(name or "").strip().lower(): name for name in (reader.fieldnames or [])}
+    name_field = fields.get("student_name") or fields.get("name")
+    id_field = fields.get("student_id")
+    if name_field is None:
+        raise ValueError("Roster CSV needs a 'student_name' column")
+    for row in reader:
+        yield (
+            reader.line_num,
+            (row.get(id_field) or "").strip() if id_field else "",
+            (row.get(name_field) or "").strip(),
+        )
+
+
+class DatabaseManager:
+    def __init__(self, db_path="feedback_system.db", write_behind=FEEDBACK_WRITE_BEHIND,
+                 instrument=QUERY_STATS_ENABLED, read_snapshot=READ_SNAPSHOT_ENABLED,
+                 snapshot_refresh_interval=READ_SNAPSHOT_REFRESH_INTERVAL,
+                 snapshot_max_staleness=READ_SNAPSHOT_MAX_STALENESS, archive_path=None):
+        self.db_path = db_path
+        if archive_path is None:
+            root, ext = os.path.splitext(db_path)
+            archive_path = f"{root}_archive{ext or '.db'}"
+        self.archive = FeedbackArchive(archive_path)
+        if isinstance(instrument, QueryStats):
+            self.query_stats = instrument  # shared with other managers, e.g. shards
+        else:
+            self.query_stats = QueryStats() if instrument else None
+        self.pool = ConnectionPool(db_path, stats=self.query_stats)
+        self._cache_lock = threading.Lock()
+        self._read_cache = {}
+        self.cache_generation = 0
+        self._read_watch = threading.local()
+        self.roster_index = RosterIndex(self._load_roster)
+        self.login_throttle = LoginThrottle()
+        self.init_database()
+        self.feedback_writer = FeedbackWriter(self) if write_behind else None
+        self.snapshot = None
+        if read_snapshot:
+            snapshot_dir = READ_SNAPSHOT_DIR or os.path.dirname(os.path.abspath(db_path))
+            fd, snapshot_path = tempfile.mkstemp(
+                prefix=os.path.basename(db_path) + ".", suffix=".snapshot", dir=snapshot_dir
+            )
+            os.close(fd)
+            self.snapshot = SnapshotReplica(
+                self.pool, snapshot_path, generation=lambda: self.cache_generation,
+                max_staleness=snapshot_max_staleness, stats=self.query_stats,
+            )
+            if snapshot_refresh_interval:
+                self.snapshot.start(snapshot_refresh_interval)
+
+    def close(self):
+        """Drain the feedback writer, if any, and release all pooled connections."""
+        if self.feedback_writer is not None:
+            self.feedback_writer.close()
+        if self.snapshot is not None:
+            self.snapshot.close()
+        self.archive.close()
+        self.pool.close()
+
+    @contextmanager
+    def read_connection(self, roster=False):
+        """Borrow a connection for a dashboard read. It comes from the read snapshot when
+        one is configured and fresh, and from the primary pool otherwise (including while
+        this thread has a write transaction open). roster=True also requires the snapshot
+        to include this manager's latest teacher and roster changes.
+        """
+        pool = self.pool
+        if self.snapshot is not None:
+            held = self.pool.held()
+            if held is None or not held.in_transaction:
+                pool = self.snapshot.pool_for(self.cache_generation if roster else None) or pool
+        with pool.connection() as conn:
+            watcher = getattr(self._read_watch, "watcher", None)
+            if watcher is None or pool is self.pool:
+                yield conn
+                return
+            watcher.attach(conn)
+            try:
+                yield conn
+            finally:
+                watcher.detach(conn)
+
+    @contextmanager
+    def watch_reads(self, watcher):
+        """Report snapshot connections that read_connection lends this thread inside the
+        block: watcher.attach(conn) when one is borrowed, watcher.detach(conn) when it is
+        returned. Primary-pool connections are not reported; hold one to track it."""
+        previous = getattr(self._read_watch, "watcher", None)
+        self._read_watch.watcher = watcher
+        try:
+            yield
+        finally:
+            self._read_watch.watcher = previous
+
+    @_instrumented
+    def refresh_snapshot(self):
+        """Refresh the read snapshot now; returns False if no snapshot is configured."""
+        if self.snapshot is None:
+            return False
+        self.snapshot.refresh()
+        return True
+
+    def get_snapshot_status(self):
+        """Age and refresh statistics of the read snapshot (see SnapshotReplica.status),
+        or None when dashboard reads go straight to the database."""
+        if self.snapshot is None:
+            return None
+        return self.snapshot.status()
+
+    def _cached(self, key, loader):
+        """Return loader()'s rows, reusing the last result until the roster or teacher
+        list changes. Only writes made through this DatabaseManager bump the generation.
+        """
+        with self._cache_lock:
+            generation = self.cache_generation
+            hit = self._read_cache.get(key)
+        if hit is not None and hit[0] == generation:
+            return list(hit[1])
+        rows = loader()
+        with self._cache_lock:
+            if self.cache_generation == generation:
+                self._read_cache[key] = (generation, rows)
+        return list(rows)
+
+    def get_query_stats(self) -> dict:
+        """Snapshot of per-method call statistics, pool acquire times and the slow-query
+        log (see QueryStats.snapshot); empty when instrumentation is off."""
+        if self.query_stats is None:
+            return {"methods": {}, "slow_queries": []}
+        return self.query_stats.snapshot()
+
+    def invalidate_read_cache(self):
+        """Bump the cache generation so cached teacher lists and rosters are reloaded."""
+        with self._cache_lock:
+            self.cache_generation += 1
+            self._read_cache.clear()
+
+    def _roster_changed(self, teacher_id):
+        """Invalidate every cached view of a teacher's roster."""
+        self.invalidate_read_cache()
+        self.roster_index.invalidate(teacher_id)
+
+    def init_database(self):
+        """Bring the schema up to date by applying pending MIGRATIONS.
+        A current database costs a single PRAGMA user_version read.
+        """
+        started = time.perf_counter()
+        applied = []
+        with self.pool.connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    # Another process may have migrated while we waited for the lock
+                    if conn.execute("PRAGMA user_version").fetchone()[0] >= target:
+                        conn.rollback()
+                        continue
+                    migration(conn.cursor())
+                    conn.execute(f"PRAGMA user_version = {target}")
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                applied.append(migration.__name__)
+        logger.info(
+            "Database %s at schema version %d (applied %s) in %.1f ms",
+            self.db_path, len(MIGRATIONS), ", ".join(applied) or "nothing",
+            (time.perf_counter() - started) * 1000,
+        )
 
-        # Schema migration: add student_id column to feedback if missing
-        cursor.execute("PRAGMA table_info(feedback)")
-        feedback_columns = [row[1] for row in cursor.fetchall()]
-        if 'student_id' not in feedback_columns:
-            cursor.execute("ALTER TABLE feedback ADD COLUMN student_id TEXT")
-        
-        # Insert default admin if not exists
-        cursor.execute("SELECT * FROM admins WHERE username = 'admin'")
-        if not cursor.fetchone():
-            admin_password = "admin123"
-            admin_hash = hashlib.sha256(admin_password.encode()).hexdigest()
-            cursor.execute("INSERT INTO admins (username, password_hash) VALUES (?, ?)", 
-                         ('admin', admin_hash))
-        
-        conn.commit()
-        conn.close()
-    
     def hash_password(self, password):
         """Hash a password using SHA-256"""
         return hashlib.sha256(password.encode()).hexdigest()
-    
-    def verify_admin_login(self, username, password):
-        """Verify admin login credentials"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        password_hash = self.hash_password(password)
-        cursor.execute("SELECT * FROM admins WHERE username = ? AND password_hash = ?", 
-                      (username, password_hash))
-        
-        admin = cursor.fetchone()
-        conn.close()
-        
-        return admin is not None
-    
-    def verify_teacher_login(self, username, password):
-        """Verify teacher login credentials"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        password_hash = self.hash_password(password)
-        cursor.execute("SELECT * FROM teachers WHERE username = ? AND password_hash = ?", 
-                      (username, password_hash))
-        
-        teacher = cursor.fetchone()
-        conn.close()
-        
+
+    @_instrumented
+    def verify_admin_login(self, username, password, client=None):
+        """Verify admin login credentials.
+        Raises LoginThrottled, without touching the database, after too many failures
+        for this username and client.
+        """
+        throttle_key = ("admin", username, client)
+        self.login_throttle.check(throttle_key)
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+
+            password_hash = self.hash_password(password)
+            cursor.execute("SELECT * FROM admins WHERE username = ? AND password_hash = ?",
+                          (username, password_hash))
+
+            admin = cursor.fetchone()
+
+        if admin is None:
+            self.login_throttle.record_failure(throttle_key)
+            return False
+        self.login_throttle.reset(throttle_key)
+        return True
+
+    @_instrumented
+    def verify_teacher_login(self, username, password, client=None):
+        """Verify teacher login credentials.
+        Raises LoginThrottled, without touching the database, after too many failures
+        for this username and client.
+        """
+        throttle_key = ("teacher", username, client)
+        self.login_throttle.check(throttle_key)
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+
+            password_hash = self.hash_password(password)
+            cursor.execute("SELECT * FROM teachers WHERE username = ? AND password_hash = ?",
+                          (username, password_hash))
+
+            teacher = cursor.fetchone()
+
+        if teacher is None:
+            self.login_throttle.record_failure(throttle_key)
+        else:
+            self.login_throttle.reset(throttle_key)
         return teacher
-    
+
     # -----------------------------
     # Student roster (per teacher)
     # -----------------------------
+    @_instrumented
     def add_student(self, teacher_id: int, student_id: str, student_name: str) -> bool:
         """Add a student to a teacher's roster. Returns True on success, False if duplicate."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                """
-                INSERT INTO students (teacher_id, student_id, student_name)
-                VALUES (?, ?, ?)
-                """,
-                (teacher_id, student_id.strip(), student_name.strip()),
-            )
-            conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            return False
-        finally:
-            conn.close()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(
+                    """
+                    INSERT INTO students (teacher_id, student_id, student_name)
+                    VALUES (?, ?, ?)
+                    """,
+                    (teacher_id, student_id.strip(), student_name.strip()),
+                )
+                conn.commit()
+            except sqlite3.IntegrityError:
+                conn.rollback()
+                return False
+        self._roster_changed(teacher_id)
+        return True
 
+    @_instrumented
     def get_students_for_teacher(self, teacher_id: int):
         """Return list of (id, teacher_id, student_id, student_name, created_at) for a teacher."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+        def load():
+            with self.read_connection(roster=True) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT id, teacher_id, student_id, student_name, created_at
+                    FROM students
+                    WHERE teacher_id = ?
+                    ORDER BY created_at DESC
+                    """,
+                    (teacher_id,),
+                )
+                return cursor.fetchall()
+        return self._cached(("students", teacher_id), load)
+
+    @_instrumented
+    def get_students_page(self, teacher_id: int, page_size=ROSTER_PAGE_SIZE, cursor=None,
+                          direction="next"):
+        """Return one window of a teacher's roster, newest first, and whether more
+        students exist in that direction. Rows match get_students_for_teacher; a row's
+        cursor is (created_at, id), i.e. (row[4], row[0]).
+        """
+        return self._keyset_page(
             """
-            SELECT id, teacher_id, student_id, student_name, created_at
-            FROM students
-            WHERE teacher_id = ?
-            ORDER BY created_at DESC
+            SELECT s.id, s.teacher_id, s.student_id, s.student_name, s.created_at
+            FROM students s
             """,
-            (teacher_id,),
+            ["s.teacher_id = ?"], [teacher_id], ("s.created_at", "s.id"),
+            page_size, cursor, direction, roster=True,
         )
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
 
+    @_instrumented
     def get_student_by_student_id(self, teacher_id: int, student_id: str):
         """Return a single student row for given teacher and student_id, or None."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT id, teacher_id, student_id, student_name, created_at
-            FROM students
-            WHERE teacher_id = ? AND student_id = ?
-            """,
-            (teacher_id, student_id.strip()),
-        )
-        row = cursor.fetchone()
-        conn.close()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT id, teacher_id, student_id, student_name, created_at
+                FROM students
+                WHERE teacher_id = ? AND student_id = ?
+                """,
+                (teacher_id, student_id.strip()),
+            )
+            row = cursor.fetchone()
         return row
 
+    def _load_roster(self, teacher_id: int) -> dict:
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT student_id, student_name FROM students WHERE teacher_id = ?",
+                (teacher_id,),
+            ).fetchall()
+        return dict(rows)
+
+    @_instrumented
+    def resolve_student_name(self, teacher_id: int, student_id: str):
+        """Return the name for a student ID on a teacher's roster, or None.
+        Served from the in-memory roster index, so repeated lookups skip SQLite."""
+        return self.roster_index.lookup(teacher_id, student_id)
+
+    @_instrumented
     def delete_student(self, teacher_id: int, student_id: str) -> bool:
         """Delete a student from a teacher's roster. Returns True if a row was deleted."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "DELETE FROM students WHERE teacher_id = ? AND student_id = ?",
-            (teacher_id, student_id.strip()),
-        )
-        deleted = cursor.rowcount > 0
-        conn.commit()
-        conn.close()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM students WHERE teacher_id = ? AND student_id = ?",
+                (teacher_id, student_id.strip()),
+            )
+            deleted = cursor.rowcount > 0
+            conn.commit()
+        if deleted:
+            self._roster_changed(teacher_id)
         return deleted
 
+    def _allocate_student_seq(self, conn, teacher_id: int, count: int = 1) -> int:
+        """Reserve count consecutive sequence numbers for a teacher and return the first.
+        Runs on the caller's connection so the reservation commits or rolls back
+        together with the inserts that use it.
+        """
+        conn.execute(
+            """
+            INSERT INTO student_id_sequences (teacher_id, last_seq) VALUES (?, 0)
+            ON CONFLICT (teacher_id) DO NOTHING
+            """,
+            (teacher_id,),
+        )
+        conn.execute(
+            "UPDATE student_id_sequences SET last_seq = last_seq + ? WHERE teacher_id = ?",
+            (count, teacher_id),
+        )
+        last_seq = conn.execute(
+            "SELECT last_seq FROM student_id_sequences WHERE teacher_id = ?",
+            (teacher_id,),
+        ).fetchone()[0]
+        return last_seq - count + 1
+
+    @_instrumented
     def generate_unique_student_id(self, teacher_id: int) -> str:
-        """Generate a unique student ID for a given teacher.
+        """Return the student ID add_student_auto would assign next for a teacher.
         New format: SID{alpha}{seq:03d} (e.g., SIDA001 for teacher 1, SIDB001 for teacher 2).
         The alphabetic component is derived from the teacher_id using an Excel-like column scheme
-        (1 -> A, 2 -> B, ..., 26 -> Z, 27 -> AA, etc.). Sequence number is per-teacher.
-        Backward compatible with legacy format SID{seq:03d} when computing the next sequence.
+        (1 -> A, 2 -> B, ..., 26 -> Z, 27 -> AA, etc.). Sequence number is per-teacher and read
+        from student_id_sequences; nothing is reserved, so use add_student_auto to allocate.
         """
-        def teacher_id_to_alpha(n: int) -> str:
-            # Convert 1-based integer to Excel-like column letters
-            letters = []
-            while n > 0:
-                n, rem = divmod(n - 1, 26)
-                letters.append(chr(ord('A') + rem))
-            return ''.join(reversed(letters))
-
-        alpha = teacher_id_to_alpha(int(teacher_id))
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        # Start sequence at max existing sequence + 1 for stability across deletions
-        cursor.execute(
-            "SELECT student_id FROM students WHERE teacher_id = ?",
-            (teacher_id,),
-        )
-        existing_ids = [row[0] for row in cursor.fetchall() if row and row[0]]
-        existing_nums = []
-        for sid in existing_ids:
-            if not isinstance(sid, str):
-                continue
-            # Prefer new format: SID{alpha}{digits}
-            if sid.startswith("SID" + alpha):
-                tail = sid[3 + len(alpha):]
-                if tail.isdigit():
-                    existing_nums.append(int(tail))
-                    continue
-            # Fallback: legacy format SID{digits}
-            if sid.startswith("SID") and sid[3:].isdigit():
-                existing_nums.append(int(sid[3:]))
-        seq = (max(existing_nums) + 1) if existing_nums else 1
-        # Loop until we find an unused id (handles rare collisions)
-        while True:
-            candidate = f"SID{alpha}{int(seq):03d}"
-            cursor.execute(
-                "SELECT 1 FROM students WHERE teacher_id = ? AND student_id = ?",
-                (teacher_id, candidate),
-            )
-            if cursor.fetchone() is None:
-                conn.close()
-                return candidate
-            seq += 1
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT last_seq FROM student_id_sequences WHERE teacher_id = ?",
+                (teacher_id,),
+            ).fetchone()
+        seq = (row[0] if row else 0) + 1
+        return f"SID{_teacher_alpha(int(teacher_id))}{seq:03d}"
 
+    @_instrumented
     def add_student_auto(self, teacher_id: int, student_name: str):
         """Add a student by auto-generating a unique student ID.
+        The ID's sequence number is taken from student_id_sequences in the same
+        transaction as the insert, so concurrent adds never pick the same ID.
         Returns (True, student_id) on success, else (False, None).
         """
-        generated_id = self.generate_unique_student_id(teacher_id)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                """
-                INSERT INTO students (teacher_id, student_id, student_name)
-                VALUES (?, ?, ?)
-                """,
-                (teacher_id, generated_id, student_name.strip()),
+        alpha = _teacher_alpha(int(teacher_id))
+        with self.pool.connection() as conn:
+            try:
+                while True:
+                    generated_id = f"SID{alpha}{self._allocate_student_seq(conn, teacher_id):03d}"
+                    try:
+                        conn.execute(
+                            """
+                            INSERT INTO students (teacher_id, student_id, student_name)
+                            VALUES (?, ?, ?)
+                            """,
+                            (teacher_id, generated_id, student_name.strip()),
+                        )
+                        break
+                    except sqlite3.IntegrityError:
+                        # Skip IDs already taken by a manually added student
+                        taken = conn.execute(
+                            "SELECT 1 FROM students WHERE teacher_id = ? AND student_id = ?",
+                            (teacher_id, generated_id),
+                        ).fetchone()
+                        if not taken:
+                            raise
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                return False, None
+        self._roster_changed(teacher_id)
+        return True, generated_id
+
+    @_instrumented
+    def add_students_bulk(self, teacher_id: int, rows, chunk_size: int = 500) -> dict:
+        """Import many students into a teacher's roster in a single transaction.
+        rows yields (line_no, student_id, student_name) as produced by iter_roster_csv;
+        a blank student_id gets the next auto-generated ID. Rows are checked and inserted
+        chunk_size at a time with executemany. Returns a report dict with lists
+        'added' [(line_no, student_id, name)], 'duplicates' [(line_no, student_id)]
+        and 'errors' [(line_no, message)].
+        """
+        report = {"added": [], "duplicates": [], "errors": []}
+        alpha = _teacher_alpha(int(teacher_id))
+        seen = set()
+
+        def flush(conn, chunk):
+            auto_rows = [row for row in chunk if not row[1]]
+            if auto_rows:
+                first_seq = self._allocate_student_seq(conn, teacher_id, len(auto_rows))
+                for offset, row in enumerate(auto_rows):
+                    row[1] = f"SID{alpha}{first_seq + offset:03d}"
+            placeholders = ",".join("?" * len(chunk))
+            existing = {r[0] for r in conn.execute(
+                f"SELECT student_id FROM students WHERE teacher_id = ? AND student_id IN ({placeholders})",
+                [teacher_id] + [row[1] for row in chunk],
+            )}
+            to_insert = []
+            for row in chunk:
+                line_no, student_id, name, auto = row
+                if auto:
+                    # Skip IDs already taken by a manually added student
+                    while student_id in existing or student_id in seen:
+                        student_id = f"SID{alpha}{self._allocate_student_seq(conn, teacher_id):03d}"
+                        if conn.execute(
+                            "SELECT 1 FROM students WHERE teacher_id = ? AND student_id = ?",
+                            (teacher_id, student_id),
+                        ).fetchone():
+                            existing.add(student_id)
+                elif student_id in existing:
+                    report["duplicates"].append((line_no, student_id))
+                    continue
+                seen.add(student_id)
+                to_insert.append((teacher_id, student_id, name))
+                report["added"].append((line_no, student_id, name))
+            conn.executemany(
+                "INSERT INTO students (teacher_id, student_id, student_name) VALUES (?, ?, ?)",
+                to_insert,
             )
-            conn.commit()
-            return True, generated_id
-        except sqlite3.IntegrityError:
-            return False, None
-        finally:
-            conn.close()
 
-    def add_teacher(self, username, password, full_name, email, subject):
-        """Add a new teacher"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            password_hash = self.hash_password(password)
-            cursor.execute("""
-                INSERT INTO teachers (username, password_hash, full_name, email, subject)
-                VALUES (?, ?, ?, ?, ?)
-            """, (username, password_hash, full_name, email, subject))
-            
-            conn.commit()
-            success = True
-        except sqlite3.IntegrityError:
-            success = False
-        finally:
-            conn.close()
-        
+        with self.pool.connection() as conn:
+            try:
+                chunk = []
+                for line_no, student_id, student_name in rows:
+                    student_id = (student_id or "").strip()
+                    student_name = (student_name or "").strip()
+                    if not student_name:
+                        report["errors"].append((line_no, "Missing student name"))
+                        continue
+                    if student_id and student_id in seen:
+                        report["duplicates"].append((line_no, student_id))
+                        continue
+                    if student_id:
+                        seen.add(student_id)
+                    chunk.append([line_no, student_id, student_name, not student_id])
+                    if len(chunk) >= chunk_size:
+                        flush(conn, chunk)
+                        chunk = []
+                if chunk:
+                    flush(conn, chunk)
+                conn.commit()
+            except (sqlite3.Error, ValueError, UnicodeDecodeError, csv.Error) as e:
+                conn.rollback()
+                report["errors"].append((None, f"Import aborted, nothing was added: {e}"))
+                report["added"] = []
+        if report["added"]:
+            self._roster_changed(teacher_id)
+        report["added"].sort()
+        report["duplicates"].sort()
+        return report
+
+    @_instrumented
+    def add_teacher(self, username, password, full_name, email, subject, teacher_id=None):
+        """Add a new teacher. teacher_id, if given, is used instead of the next free ID
+        (ShardedDatabaseManager allocates IDs centrally)."""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+
+            try:
+                password_hash = self.hash_password(password)
+                cursor.execute("""
+                    INSERT INTO teachers (id, username, password_hash, full_name, email, subject)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (teacher_id, username, password_hash, full_name, email, subject))
+
+                conn.commit()
+                success = True
+            except sqlite3.IntegrityError:
+                conn.rollback()
+                success = False
+
+        if success:
+            self.invalidate_read_cache()
         return success
-    
+
+    @_instrumented
     def get_all_teachers(self):
         """Get all teachers"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, username, full_name, email, subject, created_at FROM teachers")
-        teachers = cursor.fetchall()
-        
-        conn.close()
-        return teachers
-    
+        def load():
+            with self.read_connection(roster=True) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id, username, full_name, email, subject, created_at FROM teachers")
+                return cursor.fetchall()
+        return self._cached(("teachers",), load)
+
+    @_instrumented
     def get_teacher_by_id(self, teacher_id):
         """Get teacher details by ID"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, username, full_name, email, subject FROM teachers WHERE id = ?", 
-                      (teacher_id,))
-        teacher = cursor.fetchone()
-        
-        conn.close()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT id, username, full_name, email, subject FROM teachers WHERE id = ?",
+                          (teacher_id,))
+            teacher = cursor.fetchone()
+
         return teacher
-    
-    def submit_feedback(self, teacher_id: int, student_id: str, feedback_text: str) -> bool:
-        """Submit feedback for a teacher by a valid student_id. Returns True on success.
-        Ensures both student_id and student_name are stored.
-        """
-        # Validate student belongs to teacher
-        student = self.get_student_by_student_id(teacher_id, student_id)
-        if not student:
-            return False
 
-        student_name = student[3]
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
+    def _insert_feedback_once(self, conn, teacher_id: int, student_id: str, feedback_text: str):
+        """Insert one submission on the caller's connection and classify the outcome.
+        The roster lookup, the insert and the one-per-day rule (the unique index on
+        teacher_id, student_id, submission_day) are a single INSERT ... SELECT statement.
+        """
+        student_id = student_id.strip()
+        cursor = conn.execute(
             """
-            INSERT INTO feedback (teacher_id, student_name, feedback_text, student_id)
-            VALUES (?, ?, ?, ?)
+            INSERT INTO feedback (teacher_id, student_name, feedback_text, student_id, submission_day)
+            SELECT teacher_id, student_name, ?, student_id, DATE('now', 'localtime')
+            FROM students
+            WHERE teacher_id = ? AND student_id = ?
+            ON CONFLICT (teacher_id, student_id, submission_day) DO NOTHING
             """,
-            (teacher_id, student_name, feedback_text, student_id.strip()),
+            (feedback_text, teacher_id, student_id),
         )
-        conn.commit()
-        conn.close()
-        return True
-    
-    def get_feedback_for_teacher(self, teacher_id):
-        """Get all feedback for a specific teacher"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, student_name, feedback_text, submission_time
-            FROM feedback 
-            WHERE teacher_id = ?
-            ORDER BY submission_time DESC
-        """, (teacher_id,))
-        
-        feedback_list = cursor.fetchall()
-        conn.close()
+        if cursor.rowcount > 0:
+            return SubmitResult.OK
+        # Nothing inserted: either the student is unknown or already submitted today
+        if self.get_student_by_student_id(teacher_id, student_id) is None:
+            return SubmitResult.UNKNOWN_STUDENT
+        return SubmitResult.ALREADY_SUBMITTED
+
+    @_instrumented
+    def submit_feedback_once(self, teacher_id: int, student_id: str, feedback_text: str):
+        """Validate the roster entry, enforce one submission per student per teacher per
+        day, and store the feedback in one statement. Returns a SubmitResult.
+        """
+        with self.pool.connection() as conn:
+            try:
+                result = self._insert_feedback_once(conn, teacher_id, student_id, feedback_text)
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+        return result
+
+    @_instrumented
+    def submit_feedback(self, teacher_id: int, student_id: str, feedback_text: str) -> bool:
+        """Submit feedback for a teacher by a valid student_id. Returns True on success.
+        Ensures both student_id and student_name are stored. Returns False for unknown
+        students and for a second submission on the same day; use submit_feedback_once
+        to tell the two apart.
+        """
+        return self.submit_feedback_once(teacher_id, student_id, feedback_text) is SubmitResult.OK
+
+    @_instrumented
+    def submit_feedback_batch(self, entries) -> list:
+        """Submit many (teacher_id, student_id, feedback_text) entries in one transaction.
+        Returns one SubmitResult per entry.
+        """
+        with self.pool.connection() as conn:
+            try:
+                results = [
+                    self._insert_feedback_once(conn, teacher_id, student_id, feedback_text)
+                    for teacher_id, student_id, feedback_text in entries
+                ]
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+        return results
+
+    def enqueue_feedback(self, teacher_id: int, student_id: str, feedback_text: str) -> Future:
+        """Submit feedback through the write-behind queue when enabled.
+        Always returns a Future resolving to submit_feedback_once's SubmitResult, so
+        callers can confirm success either way.
+        """
+        if self.feedback_writer is not None:
+            return self.feedback_writer.submit(teacher_id, student_id, feedback_text)
+        future = Future()
+        try:
+            future.set_result(self.submit_feedback_once(teacher_id, student_id, feedback_text))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    @_instrumented
+    def get_feedback_for_teacher(self, teacher_id, include_archived=False):
+        """Get all feedback for a specific teacher, newest first. include_archived also
+        reads entries archive.py has moved to the archive database."""
+        with self.read_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT id, student_name, feedback_text, submission_time
+                FROM feedback
+                WHERE teacher_id = ?
+                ORDER BY submission_time DESC
+            """, (teacher_id,))
+
+            feedback_list = cursor.fetchall()
+        if include_archived:
+            # A row copied to the archive but not yet deleted here is listed once
+            hot_ids = {row[0] for row in feedback_list}
+            archived = [row for row in self.archive.feedback_for_teacher(teacher_id) if row[0] not in hot_ids]
+            feedback_list = list(heapq.merge(feedback_list, archived, key=lambda row: row[3], reverse=True))
         return feedback_list
-    
+
+    @_instrumented
     def get_all_feedback(self):
         """Get all feedback with teacher names"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
+        with self.read_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT f.id, t.full_name, f.student_name, f.feedback_text, f.submission_time
+                FROM feedback f
+                JOIN teachers t ON f.teacher_id = t.id
+                ORDER BY f.submission_time DESC
+            """)
+
+            feedback_list = cursor.fetchall()
+        return feedback_list
+
+    def _keyset_page(self, select_sql, clauses, params, order_by, page_size, cursor,
+                     direction, roster=False):
+        """Run a keyset-paginated query ordered by the two columns in order_by (a sort
+        key and a unique tiebreaker). direction="next" returns rows after the cursor in
+        descending order, "prev" rows before it; either way rows come back in descending
+        order. Returns (rows, has_more).
+        """
+        if direction not in ("next", "prev"):
+            raise ValueError(f"direction must be 'next' or 'prev', not {direction!r}")
+        clauses = list(clauses)
+        params = list(params)
+        if cursor is not None:
+            clauses.append("(%s, %s) %s (?, ?)" % (*order_by, "<" if direction == "next" else ">"))
+            params.extend(cursor)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        order = "DESC" if direction == "next" else "ASC"
+
+        with self.read_connection(roster=roster) as conn:
+            rows = conn.execute(
+                f"""
+                {select_sql}
+                {where}
+                ORDER BY {order_by[0]} {order}, {order_by[1]} {order}
+                LIMIT ?
+                """,
+                params + [page_size + 1],
+            ).fetchall()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if direction == "prev":
+            rows.reverse()
+        return rows, has_more
+
+    def _feedback_page(self, select_sql, scope_sql, scope_params, page_size,
+                       cursor, direction, since, until):
+        """Run a keyset-paginated feedback query ordered by (submission_time, id).
+        direction="next" returns rows older than the cursor, "prev" rows newer than it;
+        either way rows come back newest first. Returns (rows, has_more).
+        """
+        clauses = list(scope_sql)
+        params = list(scope_params)
+        if since is not None:
+            clauses.append("f.submission_time >= ?")
+            params.append(_to_db_timestamp(since))
+        if until is not None:
+            clauses.append("f.submission_time < ?")
+            params.append(_to_db_timestamp(until))
+        return self._keyset_page(select_sql, clauses, params, ("f.submission_time", "f.id"),
+                                 page_size, cursor, direction)
+
+    @_instrumented
+    def get_feedback_page(self, teacher_id, page_size=FEEDBACK_PAGE_SIZE, cursor=None,
+                          direction="next", since=None, until=None):
+        """Return one page of a teacher's feedback, newest first, and whether more rows
+        exist in the requested direction. Rows match get_feedback_for_teacher; the cursor
+        for a row is (submission_time, id), i.e. (row[3], row[0]). since/until bound
+        submission_time as a half-open UTC range.
+        """
+        return self._feedback_page(
+            """
+            SELECT f.id, f.student_name, f.feedback_text, f.submission_time
+            FROM feedback f
+            """,
+            ["f.teacher_id = ?"], [teacher_id],
+            page_size, cursor, direction, since, until,
+        )
+
+    @_instrumented
+    def get_all_feedback_page(self, page_size=FEEDBACK_PAGE_SIZE, cursor=None,
+                              direction="next", since=None, until=None):
+        """Paginated get_all_feedback. The cursor for a row is (row[4], row[0])."""
+        return self._feedback_page(
+            """
             SELECT f.id, t.full_name, f.student_name, f.feedback_text, f.submission_time
             FROM feedback f
             JOIN teachers t ON f.teacher_id = t.id
-            ORDER BY f.submission_time DESC
-        """)
-        
-        feedback_list = cursor.fetchall()
-        conn.close()
-        return feedback_list
-    
+            """,
+            [], [],
+            page_size, cursor, direction, since, until,
+        )
+
+    def iter_feedback_for_teacher(self, teacher_id, since=None, until=None, chunk_size=500):
+        """Yield a teacher's feedback newest first, fetching chunk_size rows per query.
+        Each chunk borrows a pooled connection only for its own query."""
+        cursor = None
+        while True:
+            rows, has_more = self.get_feedback_page(
+                teacher_id, chunk_size, cursor, since=since, until=until
+            )
+            yield from rows
+            if not has_more:
+                return
+            cursor = (rows[-1][3], rows[-1][0])
+
+    def iter_all_feedback(self, since=None, until=None, chunk_size=500):
+        """Yield all feedback with teacher names, newest first, in chunks."""
+        cursor = None
+        while True:
+            rows, has_more = self.get_all_feedback_page(
+                chunk_size, cursor, since=since, until=until
+            )
+            yield from rows
+            if not has_more:
+                return
+            cursor = (rows[-1][4], rows[-1][0])
+
+    def iter_feedback_export(self, teacher_id=None, since=None, until=None, chunk_size=500):
+        """Yield feedback rows for export, newest first, chunk_size rows per query:
+        (id, teacher_id, teacher_name, student_id, student_name, feedback_text,
+        submission_time). teacher_id=None exports every teacher's feedback.
+        """
+        scope_sql, scope_params = (["f.teacher_id = ?"], [teacher_id]) if teacher_id is not None else ([], [])
+        cursor = None
+        while True:
+            rows, has_more = self._feedback_page(
+                """
+                SELECT f.id, f.teacher_id, t.full_name, f.student_id, f.student_name,
+                       f.feedback_text, f.submission_time
+                FROM feedback f
+                JOIN teachers t ON f.teacher_id = t.id
+                """,
+                scope_sql, scope_params,
+                chunk_size, cursor, "next", since, until,
+            )
+            yield from rows
+            if not has_more:
+                return
+            cursor = (rows[-1][6], rows[-1][0])
+
+    @_instrumented
+    def search_feedback(self, query, teacher_id=None, limit=FEEDBACK_PAGE_SIZE,
+                        highlight=("<mark>", "</mark>"), snippet_tokens=16):
+        """Full-text search over feedback text and student names, best matches first.
+        Returns (id, teacher_name, student_name, snippet, submission_time) rows; the
+        snippet wraps matched words in the highlight pair. teacher_id limits the search
+        to one teacher's feedback.
+        """
+        match = _fts_query(query or "")
+        if match is None:
+            return []
+        scope = "AND f.teacher_id = ?" if teacher_id is not None else ""
+        params = [highlight[0], highlight[1], snippet_tokens, match]
+        if teacher_id is not None:
+            params.append(teacher_id)
+        params.append(limit)
+
+        with self.read_connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT f.id, t.full_name, f.student_name,
+                       snippet(feedback_fts, 0, ?, ?, '…', ?),
+                       f.submission_time
+                FROM feedback_fts
+                JOIN feedback f ON f.id = feedback_fts.rowid
+                JOIN teachers t ON t.id = f.teacher_id
+                WHERE feedback_fts MATCH ? {scope}
+                ORDER BY feedback_fts.rank
+                LIMIT ?
+                """,
+                params,
+            ).fetchall()
+        return rows
+
+    @_instrumented
+    def get_feedback_counts(self, with_latest: bool = False) -> dict:
+        """Return feedback totals per teacher from the trigger-maintained counter table.
+        Maps teacher_id -> count, or teacher_id -> (count, last_submission) when
+        with_latest is set. Teachers without feedback are absent from the result.
+        """
+        with self.read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT teacher_id, feedback_count, last_submission
+                FROM feedback_counts
+                WHERE feedback_count > 0
+                """
+            )
+            rows = cursor.fetchall()
+        if with_latest:
+            return {row[0]: (row[1], row[2]) for row in rows}
+        return {row[0]: row[1] for row in rows}
+
+    @_instrumented
+    def refresh_feedback_rollups(self, chunk_size=ROLLUP_CHUNK_SIZE):
+        """Fold feedback rows added since the watermark into the daily rollups.
+        Each chunk of rows and its watermark advance commit together, so a crash
+        never double-counts. Returns the number of feedback rows folded in.
+        """
+        processed = 0
+        with self.pool.connection() as conn:
+            while True:
+                last_id = conn.execute(
+                    "SELECT last_id FROM rollup_watermarks WHERE name = 'feedback'"
+                ).fetchone()[0]
+                newest = conn.execute("SELECT MAX(id) FROM feedback").fetchone()[0]
+                if newest is None or newest <= last_id:
+                    return processed
+
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    last_id = conn.execute(
+                        "SELECT last_id FROM rollup_watermarks WHERE name = 'feedback'"
+                    ).fetchone()[0]
+                    rows = conn.execute(
+                        """
+                        SELECT id, teacher_id, student_id, feedback_text, submission_day,
+                               COALESCE(submission_day, DATE(submission_time, 'localtime'))
+                        FROM feedback
+                        WHERE id > ?
+                        ORDER BY id
+                        LIMIT ?
+                        """,
+                        (last_id, chunk_size),
+                    ).fetchall()
+                    if not rows:
+                        conn.rollback()
+                        return processed
+
+                    fold_feedback_rollups(conn, [row[1:] for row in rows])
+                    conn.execute(
+                        "UPDATE rollup_watermarks SET last_id = ? WHERE name = 'feedback'",
+                        (rows[-1][0],),
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                processed += len(rows)
+
+    @_instrumented
+    def get_daily_feedback_stats(self, teacher_id=None, since=None, until=None):
+        """Return (day, teacher_id, submissions, students, words) rows from the daily
+        rollups, oldest day first. Read-only: rows cover feedback up to the last
+        refresh_feedback_rollups() call. Days are local calendar days as 'YYYY-MM-DD';
+        since/until bound them as a half-open range.
+        """
+        clauses, params = [], []
+        if teacher_id is not None:
+            clauses.append("teacher_id = ?")
+            params.append(teacher_id)
+        if since is not None:
+            clauses.append("day >= ?")
+            params.append(str(since))
+        if until is not None:
+            clauses.append("day < ?")
+            params.append(str(until))
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+
+        with self.read_connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT day, teacher_id, submissions, students, words
+                FROM feedback_daily
+                {where}
+                ORDER BY day, teacher_id
+                """,
+                params,
+            ).fetchall()
+        return rows
+
+    @_instrumented
+    def get_teacher_analytics(self) -> dict:
+        """Return per-teacher totals from the rollups: teacher_id -> dict with
+        submissions, avg_words, roster_size, participants (roster students who have
+        ever submitted) and participation (participants / roster_size, or None).
+        Teachers without feedback or students are absent from the result. Read-only,
+        like get_daily_feedback_stats.
+        """
+        with self.read_connection() as conn:
+            totals = conn.execute(
+                """
+                SELECT teacher_id, SUM(submissions), SUM(words)
+                FROM feedback_daily
+                GROUP BY teacher_id
+                """
+            ).fetchall()
+            rosters = conn.execute(
+                """
+                SELECT s.teacher_id, COUNT(*), COUNT(t.student_id)
+                FROM students s
+                LEFT JOIN feedback_student_totals t
+                  ON t.teacher_id = s.teacher_id AND t.student_id = s.student_id
+                GROUP BY s.teacher_id
+                """
+            ).fetchall()
+
+        analytics = {}
+        for teacher_id, submissions, words in totals:
+            analytics[teacher_id] = {
+                "submissions": submissions,
+                "avg_words": words / submissions if submissions else 0.0,
+                "roster_size": 0,
+                "participants": 0,
+                "participation": None,
+            }
+        for teacher_id, roster_size, participants in rosters:
+            entry = analytics.setdefault(teacher_id, {"submissions": 0, "avg_words": 0.0})
+            entry["roster_size"] = roster_size
+            entry["participants"] = participants
+            entry["participation"] = participants / roster_size
+        return analytics
+
+    @_instrumented
+    def get_top_terms(self, teacher_id, limit=10):
+        """Return a teacher's most frequent feedback terms as (term, occurrences),
+        as last computed by the text-analytics job (analytics.py)."""
+        with self.read_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT term, occurrences
+                FROM teacher_terms
+                WHERE teacher_id = ?
+                ORDER BY occurrences DESC, term
+                LIMIT ?
+                """,
+                (teacher_id, limit),
+            ).fetchall()
+        return rows
+
+    @_instrumented
+    def get_sentiment_trend(self, teacher_id, since=None):
+        """Return (day, average score, entries) per local day for a teacher's scored
+        feedback, oldest first. Scores range from -1 (negative) to 1 (positive)."""
+        params = [teacher_id]
+        day_clause = ""
+        if since is not None:
+            day_clause = "AND day >= ?"
+            params.append(str(since))
+        with self.read_connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT day, AVG(score), COUNT(*)
+                FROM feedback_sentiment
+                WHERE teacher_id = ? {day_clause}
+                GROUP BY day
+                ORDER BY day
+                """,
+                params,
+            ).fetchall()
+        return rows
+
+    @_instrumented
     def delete_teacher(self, teacher_id):
         """Delete a teacher and all their feedback"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            # Delete feedback first (due to foreign key constraint)
-            cursor.execute("DELETE FROM feedback WHERE teacher_id = ?", (teacher_id,))
-            # Delete teacher
-            cursor.execute("DELETE FROM teachers WHERE id = ?", (teacher_id,))
-            
-            conn.commit()
-            success = True
-        except Exception as e:
-            success = False
-        finally:
-            conn.close()
-        
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+
+            try:
+                # Delete feedback first (due to foreign key constraint)
+                cursor.execute("DELETE FROM feedback WHERE teacher_id = ?", (teacher_id,))
+                # Delete teacher
+                cursor.execute("DELETE FROM teachers WHERE id = ?", (teacher_id,))
+                cursor.execute("DELETE FROM feedback_counts WHERE teacher_id = ?", (teacher_id,))
+                cursor.execute("DELETE FROM feedback_daily WHERE teacher_id = ?", (teacher_id,))
+                cursor.execute("DELETE FROM feedback_student_totals WHERE teacher_id = ?", (teacher_id,))
+                cursor.execute("DELETE FROM teacher_terms WHERE teacher_id = ?", (teacher_id,))
+                cursor.execute("DELETE FROM feedback_sentiment WHERE teacher_id = ?", (teacher_id,))
+
+                conn.commit()
+                success = True
+            except Exception as e:
+                conn.rollback()
+                success = False
+
+        if success:
+            self.archive.delete_teacher(teacher_id)
+            self._roster_changed(teacher_id)
         return success
 
+    @_instrumented
     def has_student_submitted_today(self, teacher_id: int, student_id: str) -> bool:
-        """Check if a student has already submitted feedback today for this teacher."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT 1
-            FROM feedback
-            WHERE teacher_id = ? AND student_id = ?
-              AND DATE(submission_time) = DATE('now','localtime')
-            LIMIT 1
-            """,
-            (teacher_id, student_id.strip()),
-        )
-        exists = cursor.fetchone() is not None
-        conn.close()
+        """Check if a student has already submitted feedback today for this teacher.
+        "Today" is the local calendar day; its bounds are converted to UTC (the zone
+        submission_time is stored in) so the comparison can use an index.
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT 1
+                FROM feedback
+                WHERE teacher_id = ? AND student_id = ?
+                  AND submission_time >= DATETIME('now', 'localtime', 'start of day', 'utc')
+                  AND submission_time < DATETIME('now', 'localtime', 'start of day', '+1 day', 'utc')
+                LIMIT 1
+                """,
+                (teacher_id, student_id.strip()),
+            )
+            exists = cursor.fetchone() is not None
         return exists
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Student Feedback System - Feedback Export
+Streams feedback out of the database as CSV or JSON Lines in constant memory.
+
+Usage:
+    python export.py --format csv --output feedback.csv
+    python export.py --format jsonl --teacher jsmith --since 2024-01-01 --until 2024-02-01
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import date
+from itertools import islice
+
+from config import DATABASE_PATH, EXPORT_FORMATS, EXPORT_CHUNK_SIZE
+
+EXPORT_COLUMNS = (
+    "id", "teacher_id", "teacher_name", "student_id",
+    "student_name", "feedback_text", "submission_time",
+)
+
+MIME_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+def write_csv(rows, fileobj):
+    """Write rows as CSV with a header line. Returns the number of rows written."""
+    writer = csv.writer(fileobj)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows, fileobj):
+    """Write rows as one JSON object per line. Returns the number of rows written."""
+    count = 0
+    for row in rows:
+        fileobj.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False))
+        fileobj.write("\n")
+        count += 1
+    return count
+
+
+WRITERS = {
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+}
+
+
+def export_feedback(db, fileobj, fmt="csv", teacher_id=None, since=None, until=None,
+                    limit=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream feedback newest first into a text file object.
+    since/until bound submission_time as a half-open UTC range; limit caps the row
+    count. Returns the number of rows written.
+    """
+    if fmt not in EXPORT_FORMATS or fmt not in WRITERS:
+        raise ValueError(f"Unsupported export format {fmt!r}; choose from {EXPORT_FORMATS}")
+    rows = db.iter_feedback_export(teacher_id, since, until, chunk_size=chunk_size)
+    if limit is not None:
+        rows = islice(rows, limit)
+    return WRITERS[fmt](rows, fileobj)
+
+
+def export_feedback_bytes(db, fmt="csv", teacher_id=None, since=None, until=None, limit=None):
+    """Render an export to UTF-8 bytes, e.g. for a download button. Pass a limit:
+    unlike export_feedback this holds the whole file in memory."""
+    buffer = io.StringIO(newline="")
+    export_feedback(db, buffer, fmt, teacher_id, since, until, limit)
+    return buffer.getvalue().encode("utf-8")
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Export student feedback as CSV or JSON Lines.")
+    parser.add_argument("--db", help="Single SQLite database file "
+                                      f"(default: the SHARD_PATHS shards if configured, else {DATABASE_PATH})")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--teacher", help="Only export feedback for this teacher username")
+    parser.add_argument("--since", type=date.fromisoformat, help="First day to include (YYYY-MM-DD, UTC)")
+    parser.add_argument("--until", type=date.fromisoformat, help="Day to stop before (YYYY-MM-DD, UTC)")
+    parser.add_argument("--limit", type=int, help="Maximum number of rows")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    from database import DatabaseManager
+    from sharding import open_database
+
+    db = DatabaseManager(args.db) if args.db else open_database()
+    try:
+        teacher_id = None
+        if args.teacher:
+            teacher = next((t for t in db.get_all_teachers() if t[1] == args.teacher), None)
+            if teacher is None:
+                parser.error(f"unknown teacher {args.teacher!r}")
+            teacher_id = teacher[0]
+
+        if args.output:
+            with open(args.output, "w", encoding="utf-8", newline="") as fileobj:
+                count = export_feedback(db, fileobj, args.format, teacher_id,
+                                        args.since, args.until, args.limit)
+        else:
+            count = export_feedback(db, sys.stdout, args.format, teacher_id,
+                                    args.since, args.until, args.limit)
+    finally:
+        db.close()
+
+    print(f"✅ Exported {count} feedback rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Student Feedback System - HTTP Ingest Service
+A small JSON API for kiosks and LMS integrations that submits feedback
+without going through the Streamlit app. It uses the same DatabaseManager,
+minimum word count and one-submission-per-day check, and also caps feedback
+at MAX_WORD_COUNT words.
+
+Endpoints:
+    GET  /api/health
+    GET  /api/teachers
+    GET  /api/teachers/<teacher_id>/students/<student_id>   roster validation
+    POST /api/feedback   {"teacher_id": 1, "student_id": "SIDA001", "feedback_text": "..."}
+
+Usage:
+    python ingest.py --host 0.0.0.0 --port 8600
+"""
+
+import argparse
+import hmac
+import json
+import logging
+import re
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from config import (
+    DATABASE_PATH, FEEDBACK_SUBMIT_TIMEOUT, MAX_WORD_COUNT,
+    INGEST_HOST, INGEST_PORT, INGEST_MAX_BODY_BYTES, INGEST_API_TOKEN,
+)
+from database import DatabaseManager, SubmitResult, validate_feedback_text
+from sharding import open_database
+
+logger = logging.getLogger(__name__)
+
+STUDENT_PATH = re.compile(r"^/api/teachers/(\d+)/students/([^/]+)$")
+
+SUBMIT_STATUS = {
+    SubmitResult.OK: HTTPStatus.CREATED,
+    SubmitResult.UNKNOWN_STUDENT: HTTPStatus.NOT_FOUND,
+    SubmitResult.ALREADY_SUBMITTED: HTTPStatus.CONFLICT,
+}
+
+
+class IngestHandler(BaseHTTPRequestHandler):
+    """JSON request handler; HTTP/1.1 so clients can keep connections alive."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "FeedbackIngest/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        token = self.server.api_token
+        if not token:
+            return True
+        supplied = self.headers.get("Authorization", "")
+        if hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+            return True
+        self._send_json(HTTPStatus.UNAUTHORIZED, {"error": "unauthorized"})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        db = self.server.db
+        path = self.path.split("?", 1)[0]
+        if path == "/api/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        elif path == "/api/teachers":
+            teachers = [
+                {"id": t[0], "full_name": t[2], "subject": t[4]}
+                for t in db.get_all_teachers()
+            ]
+            self._send_json(HTTPStatus.OK, {"teachers": teachers})
+        else:
+            match = STUDENT_PATH.match(path)
+            if match is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+                return
+            teacher_id, student_id = int(match.group(1)), unquote(match.group(2))
+            name = db.resolve_student_name(teacher_id, student_id)
+            if name is None:
+                # The roster index can miss students another process added within
+                # ROSTER_INDEX_TTL; confirm a miss against the database
+                row = db.get_student_by_student_id(teacher_id, student_id)
+                name = row[3] if row is not None else None
+            if name is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {"valid": False})
+            else:
+                self._send_json(HTTPStatus.OK, {"valid": True, "student_name": name})
+
+    def _read_json(self):
+        """Parse the request body as a JSON object; send an error and return None if it isn't."""
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._send_json(HTTPStatus.LENGTH_REQUIRED, {"error": "Content-Length required"})
+            return None
+        if length < 0:
+            # rfile.read(-1) would read to EOF, bypassing the size limit and hanging keep-alive sockets
+            self.close_connection = True
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "invalid Content-Length"})
+            return None
+        if length > self.server.max_body_bytes:
+            self.close_connection = True
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "request body too large"})
+            return None
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            payload = None
+        if not isinstance(payload, dict):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "body must be a JSON object"})
+            return None
+        return payload
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self.path.split("?", 1)[0] != "/api/feedback":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+            return
+        payload = self._read_json()
+        if payload is None:
+            return
+
+        teacher_id = payload.get("teacher_id")
+        student_id = payload.get("student_id")
+        feedback_text = payload.get("feedback_text")
+        if (not isinstance(teacher_id, int) or isinstance(teacher_id, bool)
+                or not isinstance(student_id, str) or not student_id.strip()):
+            self._send_json(HTTPStatus.UNPROCESSABLE_ENTITY,
+                            {"error": "teacher_id (integer) and student_id (string) are required"})
+            return
+        if isinstance(feedback_text, str):
+            error = validate_feedback_text(feedback_text, max_words=MAX_WORD_COUNT)
+        else:
+            error = "feedback_text is required"
+        if error:
+            self._send_json(HTTPStatus.UNPROCESSABLE_ENTITY, {"error": error})
+            return
+
+        try:
+            result = self.server.db.enqueue_feedback(
+                teacher_id, student_id.strip(), feedback_text.strip()
+            ).result(timeout=self.server.submit_timeout)
+        except Exception:
+            logger.exception("Feedback submission failed")
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": "could not store feedback, retry later"})
+            return
+        self._send_json(SUBMIT_STATUS[result], {"result": result.value})
+
+
+class IngestServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the shared DatabaseManager."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, db, api_token=INGEST_API_TOKEN,
+                 max_body_bytes=INGEST_MAX_BODY_BYTES, submit_timeout=FEEDBACK_SUBMIT_TIMEOUT):
+        super().__init__(address, IngestHandler)
+        self.db = db
+        self.api_token = api_token
+        self.max_body_bytes = max_body_bytes
+        self.submit_timeout = submit_timeout
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Serve the feedback ingest JSON API.")
+    parser.add_argument("--host", default=INGEST_HOST)
+    parser.add_argument("--port", type=int, default=INGEST_PORT)
+    parser.add_argument("--db", help="Serve a single SQLite database file "
+                                      f"(default: the SHARD_PATHS shards if configured, else {DATABASE_PATH})")
+    parser.add_argument("--no-write-behind", action="store_true",
+                        help="Commit each submission on its own instead of group-committing")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    write_behind = not args.no_write_behind
+    # Same manager as the Streamlit app, so teachers on every shard can be reached
+    db = DatabaseManager(args.db, write_behind=write_behind) if args.db else open_database(write_behind=write_behind)
+    server = IngestServer((args.host, args.port), db)
+    print(f"📥 Feedback ingest API listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
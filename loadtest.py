@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Student Feedback System - Load Test
+Drives a real DatabaseManager from several processes and threads with a mixed
+submit/dashboard workload against a temporary database, and reports
+throughput, latency percentiles, lock errors and retries.
+
+Usage:
+    python loadtest.py --processes 4 --threads 8 --duration 30 --write-ratio 0.2
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmark import generate_dataset, percentiles
+from config import DB_BUSY_TIMEOUT_MS, DB_POOL_SIZE, MIN_WORD_COUNT, SLOW_QUERY_LOG_SIZE
+
+READ_OPS = ("get_feedback_page", "get_feedback_counts", "resolve_student_name",
+            "has_student_submitted_today", "get_all_feedback_page")
+
+
+def classify_error(exc):
+    """Bucket an exception as 'locked' (SQLite busy/locked), 'pool_timeout' or 'error'."""
+    if isinstance(exc, sqlite3.OperationalError):
+        message = str(exc).lower()
+        if "locked" in message or "busy" in message:
+            return "locked"
+        if "waiting for a database connection" in message:
+            return "pool_timeout"
+    return "error"
+
+
+def _new_op_stats():
+    return {"latencies": [], "ok": 0, "locked": 0, "pool_timeout": 0, "error": 0, "retries": 0}
+
+
+def _run_thread(db, rosters, deadline, write_ratio, retries, seed, results, lock):
+    rng = random.Random(seed)
+    pairs = [(t, sid) for t, sids in rosters.items() for sid in sids]
+    teacher_ids = list(rosters)
+    text = "Load test feedback " * MIN_WORD_COUNT
+    local = {}
+
+    while time.monotonic() < deadline:
+        teacher_id, sid = pairs[rng.randrange(len(pairs))]
+        if rng.random() < write_ratio:
+            op = "submit_feedback"
+            call = lambda: db.submit_feedback_once(teacher_id, sid, text)
+        else:
+            op = rng.choice(READ_OPS)
+            call = {
+                "get_feedback_page": lambda: db.get_feedback_page(rng.choice(teacher_ids)),
+                "get_feedback_counts": lambda: db.get_feedback_counts(with_latest=True),
+                "resolve_student_name": lambda: db.resolve_student_name(teacher_id, sid),
+                "has_student_submitted_today": lambda: db.has_student_submitted_today(teacher_id, sid),
+                "get_all_feedback_page": lambda: db.get_all_feedback_page(),
+            }[op]
+
+        stats = local.setdefault(op, _new_op_stats())
+        started = time.perf_counter()
+        for attempt in range(retries + 1):
+            try:
+                call()
+                stats["ok"] += 1
+                break
+            except Exception as e:
+                kind = classify_error(e)
+                if kind == "locked" and attempt < retries:
+                    stats["retries"] += 1
+                    time.sleep(0.01 * (2 ** attempt) * rng.random())
+                    continue
+                stats[kind] += 1
+                break
+        stats["latencies"].append(time.perf_counter() - started)
+
+    with lock:
+        for op, stats in local.items():
+            merged = results.setdefault(op, _new_op_stats())
+            merged["latencies"].extend(stats.pop("latencies"))
+            for key, value in stats.items():
+                merged[key] += value
+
+
+def run_worker(db_path, rosters, threads, duration, write_ratio, retries, seed):
+    """One process's share of the load: `threads` threads sharing one DatabaseManager.
+    Returns per-operation outcome counts and latencies (seconds)."""
+    from database import DatabaseManager
+
+    # Contention makes many calls slow; count them in the report instead of logging each one
+    db_logger = logging.getLogger("database")
+    previous_level = db_logger.level
+    db_logger.setLevel(logging.ERROR)
+    db = DatabaseManager(db_path)
+    results = {}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    workers = [
+        threading.Thread(target=_run_thread,
+                         args=(db, rosters, deadline, write_ratio, retries, seed * 1000 + n, results, lock))
+        for n in range(threads)
+    ]
+    try:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        results["slow_calls"] = len(db.get_query_stats()["slow_queries"])
+    finally:
+        db.close()
+        db_logger.setLevel(previous_level)
+    return results
+
+
+def summarize(per_process, duration):
+    """Merge worker results into per-operation and total throughput/latency figures."""
+    merged = {}
+    slow_calls = 0
+    for results in per_process:
+        results = dict(results)
+        slow_calls += results.pop("slow_calls", 0)
+        for op, stats in results.items():
+            target = merged.setdefault(op, _new_op_stats())
+            target["latencies"].extend(stats["latencies"])
+            for key in ("ok", "locked", "pool_timeout", "error", "retries"):
+                target[key] += stats[key]
+
+    def figures(stats):
+        latencies = stats["latencies"]
+        summary = {
+            "operations": len(latencies),
+            "throughput_per_s": round(len(latencies) / duration, 1),
+            **{key: stats[key] for key in ("ok", "locked", "pool_timeout", "error", "retries")},
+        }
+        if latencies:
+            summary.update(percentiles(latencies))
+        return summary
+
+    total = _new_op_stats()
+    for stats in merged.values():
+        total["latencies"].extend(stats["latencies"])
+        for key in ("ok", "locked", "pool_timeout", "error", "retries"):
+            total[key] += stats[key]
+    return {
+        "operations": {op: figures(stats) for op, stats in sorted(merged.items())},
+        "total": figures(total),
+        "slow_calls": slow_calls,
+    }
+
+
+def run_load_test(processes=2, threads=4, duration=10.0, write_ratio=0.2, retries=3,
+                  teachers=10, students_per_teacher=50, feedback_rows=10000, seed=0):
+    """Seed a temporary database, run the workload and return the summary dict.
+    processes=1 runs the threads in this process."""
+    from database import DatabaseManager
+
+    workdir = tempfile.mkdtemp(prefix="feedback_load_")
+    db_path = os.path.join(workdir, "load.db")
+    try:
+        db = DatabaseManager(db_path)
+        try:
+            rosters = generate_dataset(db, teachers, students_per_teacher, feedback_rows, seed)
+        finally:
+            db.close()
+
+        args = [(db_path, rosters, threads, duration, write_ratio, retries, seed + n)
+                for n in range(processes)]
+        started = time.perf_counter()
+        if processes <= 1:
+            per_process = [run_worker(*args[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                per_process = list(executor.map(run_worker, *zip(*args)))
+        elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = summarize(per_process, elapsed)
+    report["config"] = {
+        "processes": processes, "threads": threads, "duration": duration,
+        "write_ratio": write_ratio, "retries": retries, "teachers": teachers,
+        "students_per_teacher": students_per_teacher, "feedback_rows": feedback_rows,
+        "pool_size": DB_POOL_SIZE, "busy_timeout_ms": DB_BUSY_TIMEOUT_MS,
+    }
+    return report
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Load-test DatabaseManager on a temporary SQLite file.")
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4, help="Threads per process")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Share of operations that submit feedback")
+    parser.add_argument("--retries", type=int, default=3, help="Retries after a 'database is locked' error")
+    parser.add_argument("--teachers", type=int, default=10)
+    parser.add_argument("--students", type=int, default=50, help="Students per teacher")
+    parser.add_argument("--feedback", type=int, default=10000, help="Feedback rows seeded before the run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(args.processes, args.threads, args.duration, args.write_ratio,
+                           args.retries, args.teachers, args.students, args.feedback, args.seed)
+
+    print(f"🔥 {args.processes} processes × {args.threads} threads for {args.duration:g}s "
+          f"(write ratio {args.write_ratio:g})", file=sys.stderr)
+    for op, figures in list(report["operations"].items()) + [("TOTAL", report["total"])]:
+        print(f"  {op:<28} {figures['throughput_per_s']:>9.1f} ops/s  "
+              f"p50 {figures.get('p50_ms', 0):>8.2f} ms  p95 {figures.get('p95_ms', 0):>8.2f} ms  "
+              f"p99 {figures.get('p99_ms', 0):>8.2f} ms  locked {figures['locked']}  "
+              f"retries {figures['retries']}  pool timeouts {figures['pool_timeout']}  "
+              f"errors {figures['error']}",
+              file=sys.stderr)
+
+    print(f"  Slow calls logged (last {SLOW_QUERY_LOG_SIZE} per process at most): {report['slow_calls']}",
+          file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
 import streamlit as st
 import streamlit.components.v1 as components
-from database import DatabaseManager
-from datetime import datetime
+from database import DatabaseManager, LoginThrottled, SubmitResult, iter_roster_csv, validate_feedback_text
+from config import FEEDBACK_SUBMIT_TIMEOUT, EXPORT_FORMATS, EXPORT_MAX_RECORDS, ANALYTICS_DAYS, LOGIN_TRUSTED_PROXIES
+from export import MIME_TYPES, export_feedback_bytes
+from sharding import ShardedDatabaseManager, open_database
+from datetime import date, datetime, timedelta
+import html
+import math
 import re
 
 # Page configuration
@@ -17,8 +22,14 @@ st.set_page_config(
     }
 )
 
+@st.cache_resource
+def get_database() -> DatabaseManager | ShardedDatabaseManager:
+    """One DatabaseManager (and connection pool) per process, shared by every session and rerun.
+    With SHARD_PATHS configured, teachers are spread over several database files."""
+    return open_database()
+
 # Initialize database
-db = DatabaseManager()
+db = get_database()
 
 # Custom CSS for responsive design
 st.markdown("""
@@ -43,6 +54,8 @@ st.markdown("""
         border: 1px solid #374151;
     }
     .dashboard-card { border-left: 4px solid #6366f1; }
+    .feedback-window { max-height: 70vh; overflow-y: auto; }
+    .feedback-entry { background: #f8f9fa; color: #111827; padding: 1rem; border-radius: 8px; margin: 1rem 0; }
     .nav-buttons { display: flex; justify-content: center; gap: 1rem; margin: 2rem 0; flex-wrap: wrap; }
     .nav-button, .stButton>button {
         background: linear-gradient(45deg, #6366f1, #8b5cf6) !important;
@@ -103,6 +116,31 @@ def navigate_to(page: str):
         _set_query_params_safe(page=page)
     st.rerun()
 
+def _get_client_id() -> str | None:
+    """Best-effort client address for login throttling.
+    X-Forwarded-For is written by the client, so it is only read behind
+    LOGIN_TRUSTED_PROXIES proxies, taking the address the outermost one saw.
+    Otherwise this is the socket peer address."""
+    if LOGIN_TRUSTED_PROXIES:
+        try:
+            forwarded = st.context.headers.get("X-Forwarded-For")  # Streamlit 1.37+
+        except Exception:
+            forwarded = None
+        hops = [hop.strip() for hop in forwarded.split(",")] if forwarded else []
+        if len(hops) >= LOGIN_TRUSTED_PROXIES:
+            return hops[-LOGIN_TRUSTED_PROXIES]
+    try:
+        return st.context.ip_address  # Streamlit 1.45+
+    except Exception:
+        pass
+    try:
+        from streamlit.runtime import get_instance
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        session = get_instance()._session_mgr.get_session_info(get_script_run_ctx().session_id)
+        return session.client.request.remote_ip
+    except Exception:
+        return None
+
 def _get_page_param() -> str | None:
     """Return the 'page' query parameter as a single string when present."""
     qp = _get_query_params_safe()
@@ -195,11 +233,16 @@ def show_admin_login():
         submit = st.form_submit_button("Login")
         
         if submit:
-            if db.verify_admin_login(username, password):
+            try:
+                admin_ok = db.verify_admin_login(username, password, client=_get_client_id())
+            except LoginThrottled as e:
+                st.error(f"Too many failed attempts. Please try again in {math.ceil(e.retry_after)} seconds.")
+                admin_ok = None
+            if admin_ok:
                 st.session_state.admin_logged_in = True
                 st.success("Login successful! Redirecting to admin dashboard...")
                 navigate_to('admin_dashboard')
-            else:
+            elif admin_ok is not None:
                 st.error("Invalid username or password!")
     
     if st.button("← Back to Home"):
@@ -217,13 +260,18 @@ def show_teacher_login():
         submit = st.form_submit_button("Login")
         
         if submit:
-            teacher = db.verify_teacher_login(username, password)
+            try:
+                teacher = db.verify_teacher_login(username, password, client=_get_client_id())
+                throttled = False
+            except LoginThrottled as e:
+                st.error(f"Too many failed attempts. Please try again in {math.ceil(e.retry_after)} seconds.")
+                teacher, throttled = None, True
             if teacher:
                 st.session_state.teacher_logged_in = True
                 st.session_state.current_teacher = teacher
                 st.success("Login successful! Redirecting to teacher dashboard...")
                 navigate_to('teacher_dashboard')
-            else:
+            elif not throttled:
                 st.error("Invalid username or password!")
     
     if st.button("← Back to Home"):
@@ -263,9 +311,8 @@ def show_student_feedback():
         # Live-resolve student name for entered ID
         resolved_name = None
         if student_id.strip():
-            sr = db.get_student_by_student_id(teacher_id, student_id.strip())
-            if sr:
-                resolved_name = sr[3]
+            resolved_name = db.resolve_student_name(teacher_id, student_id.strip())
+            if resolved_name:
                 st.success(f"Student: {resolved_name}")
             else:
                 st.warning("No student found with this ID for the selected teacher")
@@ -277,43 +324,259 @@ def show_student_feedback():
         submit = st.form_submit_button("Submit Feedback")
         
         if submit:
+            feedback_error = validate_feedback_text(feedback_text)
             if not student_id.strip():
                 st.error("Please enter your Student ID!")
-            elif not feedback_text.strip():
-                st.error("Please enter your feedback!")
-            elif word_count < 30:
-                st.error(f"Feedback must be at least 30 words. Current: {word_count} words")
+            elif feedback_error:
+                st.error(feedback_error)
             else:
-                # Validate Student ID belongs to selected teacher
-                student_row = db.get_student_by_student_id(teacher_id, student_id.strip())
-                if not student_row:
+                # Roster check, one-per-day rule and insert happen in one database call
+                try:
+                    result = db.enqueue_feedback(
+                        teacher_id, student_id.strip(), feedback_text.strip()
+                    ).result(timeout=FEEDBACK_SUBMIT_TIMEOUT)
+                except Exception:
+                    result = None
+                if result is SubmitResult.UNKNOWN_STUDENT:
                     st.toast("🤪 Oops! That SID looks funky. Check with your teacher and try again!", icon="🙃")
+                elif result is SubmitResult.ALREADY_SUBMITTED:
+                    st.warning("You have already submitted feedback today. Please try again tomorrow.")
+                    return
+                elif result is SubmitResult.OK:
+                    name = resolved_name or 'Student'
+                    st.success(f"Thank you, {name}! Redirecting to a fun thank-you page...")
+                    st.session_state.thank_you_name = name
+                    navigate_to('thank_you')
                 else:
-                    # Check one submission per day
-                    if db.has_student_submitted_today(teacher_id, student_id.strip()):
-                        st.warning("You have already submitted feedback today. Please try again tomorrow.")
-                        return
-                    # Submit feedback
-                    ok = db.submit_feedback(teacher_id, student_id.strip(), feedback_text.strip())
-                    if ok:
-                        st.success(f"Thank you, {student_row[3]}! Redirecting to a fun thank-you page...")
-                        st.session_state.thank_you_name = student_row[3]
-                        navigate_to('thank_you')
-                    else:
-                        st.error("Could not submit feedback. Please try again.")
+                    st.error("Could not submit feedback. Please try again.")
     
     if st.button("← Back to Home"):
         navigate_to('home')
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+def show_analytics_section(teachers):
+    """Admin charts served from the daily feedback rollups."""
+    st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
+    st.markdown('<h3>📊 Feedback Analytics</h3>', unsafe_allow_html=True)
+
+    # One write transaction per render folds in new feedback; the reads below don't write
+    db.refresh_feedback_rollups()
+    teacher_names = {t[0]: t[2] for t in teachers}
+    days = [(date.today() - timedelta(days=n)).isoformat() for n in range(ANALYTICS_DAYS - 1, -1, -1)]
+    per_day = {name: [0] * len(days) for name in teacher_names.values()}
+    day_index = {day: i for i, day in enumerate(days)}
+    for day, teacher_id, submissions, students, words in db.get_daily_feedback_stats(since=days[0]):
+        if teacher_id in teacher_names and day in day_index:
+            per_day[teacher_names[teacher_id]][day_index[day]] += submissions
+
+    if any(any(counts) for counts in per_day.values()):
+        st.write(f"Submissions per day (last {ANALYTICS_DAYS} days)")
+        st.line_chart({"Day": days, **per_day}, x="Day")
+    else:
+        st.info(f"No feedback in the last {ANALYTICS_DAYS} days.")
+
+    analytics = db.get_teacher_analytics()
+    rows = []
+    for teacher_id, name in teacher_names.items():
+        stats = analytics.get(teacher_id, {})
+        participation = stats.get("participation")
+        rows.append({
+            "Teacher": name,
+            "Feedback": stats.get("submissions", 0),
+            "Avg. words": round(stats.get("avg_words", 0.0), 1),
+            "Students": stats.get("roster_size", 0),
+            "Participation": f"{participation:.0%}" if participation is not None else "–",
+        })
+    if rows:
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+def show_themes_section(teacher_id: int):
+    """Top feedback themes and sentiment trend, precomputed by analytics.py."""
+    st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
+    st.markdown('<h3>💡 Themes & Sentiment</h3>', unsafe_allow_html=True)
+    top_terms = db.get_top_terms(teacher_id, limit=10)
+    since = date.today() - timedelta(days=ANALYTICS_DAYS - 1)
+    trend = db.get_sentiment_trend(teacher_id, since=since)
+    if top_terms or trend:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("Most mentioned words")
+            st.bar_chart({"Word": [t[0] for t in top_terms], "Mentions": [t[1] for t in top_terms]}, x="Word")
+        with col2:
+            st.write(f"Average sentiment per day (last {ANALYTICS_DAYS} days, -1 to 1)")
+            if trend:
+                st.line_chart({"Day": [t[0] for t in trend], "Sentiment": [round(t[1], 2) for t in trend]}, x="Day")
+            else:
+                st.info("No recent feedback has been analyzed.")
+    else:
+        st.info("Themes appear here once feedback has been analyzed.")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+def show_query_stats_section():
+    """Per-method database latency and the slow-query log since the app started."""
+    stats = db.get_query_stats()
+    with st.expander("🩺 Database Performance"):
+        if not stats["methods"]:
+            st.info("Query instrumentation is off or nothing has run yet.")
+            return
+        rows = [
+            {
+                "Call": name,
+                "Calls": entry["calls"],
+                "Errors": entry["errors"],
+                "Rows": entry["rows"],
+                "Mean ms": round(entry["mean_ms"], 3),
+                "p50 ms": entry["p50_ms"],
+                "p95 ms": entry["p95_ms"],
+                "p99 ms": entry["p99_ms"],
+                "Max ms": round(entry["max_ms"], 3),
+            }
+            for name, entry in sorted(stats["methods"].items(), key=lambda item: -item[1]["total_ms"])
+        ]
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        if stats["slow_queries"]:
+            st.write(f"Slow calls (≥ {db.query_stats.slow_threshold_ms} ms), newest first")
+            for entry in reversed(stats["slow_queries"]):
+                st.write(f"**{entry['method']}** – {entry['ms']} ms at {entry['at']}")
+                st.code(";\n".join(entry["sql"]) or "(no SQL)", language="sql")
+        else:
+            st.caption("No slow calls recorded.")
+
+def show_snapshot_status(key: str):
+    """How current the dashboard is when its reads come from the read snapshot."""
+    status = db.get_snapshot_status()
+    if status is None:
+        return
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        if status["fresh"]:
+            st.caption(
+                f"📸 Dashboard data as of {status['refreshed_at']:%H:%M:%S} "
+                f"({status['age_seconds']:.0f}s ago); newer feedback appears after the next refresh."
+            )
+        else:
+            st.caption("📸 Snapshot is missing or too old, so this dashboard is reading live data.")
+    with col2:
+        if st.button("🔄 Refresh data", key=f"{key}_snapshot_refresh"):
+            db.refresh_snapshot()
+            st.rerun()
+
+def load_keyset_window(key: str, load):
+    """Load the current window of a keyset-paged list. The window's cursor and direction
+    live in session state as {key}_cursor / {key}_direction; load(cursor, direction)
+    returns (rows, has_more). Returns (rows, has_more, cursor, direction).
+    """
+    cursor = st.session_state.get(f"{key}_cursor")
+    direction = st.session_state.get(f"{key}_direction", "next")
+    rows, has_more = load(cursor, direction)
+    if cursor is not None and not rows:
+        # The window we were on emptied out (e.g. after deletions); restart from the newest rows
+        st.session_state[f"{key}_cursor"] = None
+        st.session_state[f"{key}_direction"] = "next"
+        cursor, direction = None, "next"
+        rows, has_more = load(cursor, direction)
+    return rows, has_more, cursor, direction
+
+def show_window_controls(key: str, rows, has_more, cursor, direction, cursor_of):
+    """Newer/Older buttons for a window from load_keyset_window; cursor_of(row) gives a row's cursor."""
+    has_newer = has_more if direction == "prev" else cursor is not None
+    has_older = has_more if direction == "next" else True
+    prev_col, next_col = st.columns(2)
+    with prev_col:
+        if st.button("← Newer", key=f"{key}_newer", disabled=not has_newer):
+            st.session_state[f"{key}_cursor"] = cursor_of(rows[0])
+            st.session_state[f"{key}_direction"] = "prev"
+            st.rerun()
+    with next_col:
+        if st.button("Older →", key=f"{key}_older", disabled=not has_older):
+            st.session_state[f"{key}_cursor"] = cursor_of(rows[-1])
+            st.session_state[f"{key}_direction"] = "next"
+            st.rerun()
+
+def render_feedback_window(feedback_list):
+    """Render a page of (id, student_name, feedback_text, submission_time) rows as one HTML block."""
+    entries = "".join(
+        f'<div class="feedback-entry"><strong>👤 {html.escape(name)}</strong><br>'
+        f'<small>📅 {html.escape(str(submitted))}</small><br><br>'
+        f'{html.escape(text).replace(chr(10), "<br>")}</div>'
+        for _, name, text, submitted in feedback_list
+    )
+    st.markdown(f'<div class="feedback-window">{entries}</div>', unsafe_allow_html=True)
+
+# Control characters survive html.escape, so matches are marked with them and turned
+# into <mark> tags only after the student-written snippet has been escaped
+SEARCH_MARKERS = ("\x02", "\x03")
+
+def show_search_section(key: str, teacher_id: int | None = None):
+    """Full-text feedback search; teacher_id=None searches every teacher's feedback."""
+    st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
+    st.markdown('<h3>🔎 Search Feedback</h3>', unsafe_allow_html=True)
+    query = st.text_input("Search", key=f"{key}_search", placeholder="Words in the feedback or a student name")
+    if query.strip():
+        results = db.search_feedback(query, teacher_id=teacher_id, highlight=SEARCH_MARKERS)
+        if results:
+            for _, teacher_name, student_name, snippet, submitted in results:
+                heading = f"👤 {student_name}" if teacher_id is not None else f"👤 {student_name} → {teacher_name}"
+                snippet = html.escape(snippet).replace(SEARCH_MARKERS[0], "<mark>").replace(SEARCH_MARKERS[1], "</mark>")
+                st.markdown(f"""
+                <div class="feedback-entry">
+                    <strong>{html.escape(heading)}</strong><br>
+                    <small>📅 {html.escape(str(submitted))}</small><br><br>
+                    {snippet.replace(chr(10), "<br>")}
+                </div>
+                """, unsafe_allow_html=True)
+        else:
+            st.info("No feedback matches your search.")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+def show_export_section(key: str, teacher_id: int | None = None):
+    """Feedback export controls; teacher_id=None exports every teacher's feedback."""
+    st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
+    st.markdown('<h3>📤 Export Feedback</h3>', unsafe_allow_html=True)
+    with st.form(f"{key}_export_form"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            export_format = st.selectbox("Format", EXPORT_FORMATS)
+        with col2:
+            since = st.date_input("From", value=None)
+        with col3:
+            until = st.date_input("To", value=None)
+        prepare = st.form_submit_button("Prepare Export")
+    if prepare:
+        st.session_state[f"{key}_export"] = (
+            export_format,
+            export_feedback_bytes(
+                db, export_format, teacher_id, since,
+                until + timedelta(days=1) if until else None,
+                limit=EXPORT_MAX_RECORDS,
+            ),
+        )
+    prepared = st.session_state.get(f"{key}_export")
+    if prepared:
+        export_format, data = prepared
+        st.download_button(
+            f"⬇️ Download {export_format.upper()}", data,
+            file_name=f"feedback_{datetime.now():%Y%m%d}.{export_format}",
+            mime=MIME_TYPES.get(export_format, "text/plain"),
+            key=f"{key}_export_download",
+            # Don't keep the prepared file in the session once it has been downloaded
+            on_click=st.session_state.pop, args=(f"{key}_export", None),
+        )
+        st.caption(f"Dashboard exports are capped at {EXPORT_MAX_RECORDS} rows; use export.py for larger ones.")
+    st.markdown('</div>', unsafe_allow_html=True)
+
 def show_admin_dashboard():
     st.markdown('<h2>👨‍💼 Admin Dashboard</h2>', unsafe_allow_html=True)
     
     # Logout button
     if st.button("🚪 Logout"):
         st.session_state.admin_logged_in = False
+        st.session_state.pop('admin_export', None)
         navigate_to('home')
+
+    show_snapshot_status("admin")
     
     # Add new teacher section
     st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
@@ -349,6 +612,7 @@ def show_admin_dashboard():
     st.markdown('<h3>👥 All Teachers</h3>', unsafe_allow_html=True)
     
     teachers = db.get_all_teachers()
+    feedback_counts = db.get_feedback_counts(with_latest=True)
     
     if teachers:
         for teacher in teachers:
@@ -360,8 +624,10 @@ def show_admin_dashboard():
                 st.write(f"Added: {teacher[5]}")
             
             with col2:
-                feedback_count = len(db.get_feedback_for_teacher(teacher[0]))
+                feedback_count, last_submission = feedback_counts.get(teacher[0], (0, None))
                 st.write(f"📝 {feedback_count} feedback")
+                if last_submission:
+                    st.caption(f"Latest: {last_submission}")
             
             with col3:
                 if st.button(f"🗑️ Delete", key=f"delete_{teacher[0]}"):
@@ -377,6 +643,11 @@ def show_admin_dashboard():
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+    show_analytics_section(teachers)
+    show_query_stats_section()
+    show_search_section("admin")
+    show_export_section("admin")
+
 def show_teacher_dashboard():
     if not st.session_state.current_teacher:
         navigate_to('home')
@@ -389,7 +660,14 @@ def show_teacher_dashboard():
     if st.button("🚪 Logout"):
         st.session_state.teacher_logged_in = False
         st.session_state.current_teacher = None
+        st.session_state.feedback_cursor = None
+        st.session_state.feedback_direction = 'next'
+        st.session_state.roster_cursor = None
+        st.session_state.roster_direction = 'next'
+        st.session_state.pop('teacher_export', None)
         navigate_to('home')
+
+    show_snapshot_status("teacher")
     
     # Teacher info
     st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
@@ -416,24 +694,56 @@ def show_teacher_dashboard():
             else:
                 st.error("Please provide the Student Name.")
 
-    # List existing students
-    students = db.get_students_for_teacher(teacher[0])
+    with st.form("import_students_form", clear_on_submit=True):
+        roster_file = st.file_uploader(
+            "Import roster (CSV)", type=["csv"],
+            help="Columns: student_name and optional student_id. Blank IDs are auto-generated."
+        )
+        import_btn = st.form_submit_button("Import Students")
+        if import_btn:
+            if roster_file is None:
+                st.error("Please choose a CSV file to import.")
+            else:
+                report = db.add_students_bulk(teacher[0], iter_roster_csv(roster_file))
+                if report["added"]:
+                    st.success(f"Imported {len(report['added'])} students.")
+                if report["duplicates"]:
+                    st.warning(f"Skipped {len(report['duplicates'])} duplicate student IDs.")
+                if report["errors"]:
+                    st.error(f"{len(report['errors'])} rows could not be imported.")
+                if report["duplicates"] or report["errors"]:
+                    with st.expander("Import details"):
+                        for line_no, sid in report["duplicates"]:
+                            st.write(f"Line {line_no}: duplicate ID {sid}")
+                        for line_no, message in report["errors"]:
+                            st.write(f"Line {line_no}: {message}" if line_no else message)
+
+    # One window of the roster at a time; removals are batched into a single form submit
+    students, has_more, cursor, direction = load_keyset_window(
+        "roster", lambda c, d: db.get_students_page(teacher[0], cursor=c, direction=d)
+    )
     if students:
-        for s in students:
-            sid = s[2]
-            sname = s[3]
-            c1, c2, c3 = st.columns([3, 2, 1])
-            with c1:
-                st.write(f"{sname}")
-            with c2:
-                st.write(f"ID: {sid}")
-            with c3:
-                if st.button("🗑️ Remove", key=f"del_student_{sid}"):
-                    if db.delete_student(teacher[0], sid):
-                        st.success("Student removed.")
-                        st.rerun()
-                    else:
-                        st.error("Could not remove student.")
+        with st.form("roster_form"):
+            edited = st.data_editor(
+                [{"Remove": False, "Name": s[3], "Student ID": s[2], "Added": s[4]} for s in students],
+                column_config={"Remove": st.column_config.CheckboxColumn("Remove", default=False)},
+                disabled=["Name", "Student ID", "Added"],
+                hide_index=True, use_container_width=True,
+                key=f"roster_editor_{cursor}_{direction}",
+            )
+            remove_btn = st.form_submit_button("🗑️ Remove selected")
+        if remove_btn:
+            selected = [row["Student ID"] for row in edited if row["Remove"]]
+            if not selected:
+                st.error("Tick the students to remove first.")
+            else:
+                removed = sum(1 for sid in selected if db.delete_student(teacher[0], sid))
+                if removed == len(selected):
+                    st.success(f"Removed {removed} students.")
+                    st.rerun()
+                else:
+                    st.error(f"Could not remove {len(selected) - removed} of {len(selected)} students.")
+        show_window_controls("roster", students, has_more, cursor, direction, lambda s: (s[4], s[0]))
     else:
         st.info("No students added yet.")
     st.markdown('</div>', unsafe_allow_html=True)
@@ -442,22 +752,22 @@ def show_teacher_dashboard():
     st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
     st.markdown('<h3>📝 Student Feedback</h3>', unsafe_allow_html=True)
     
-    feedback_list = db.get_feedback_for_teacher(teacher[0])
-    
+    # Keyset pagination: the cursor is the (submission_time, id) of the row we paged from
+    feedback_list, has_more, cursor, direction = load_keyset_window(
+        "feedback", lambda c, d: db.get_feedback_page(teacher[0], cursor=c, direction=d)
+    )
     if feedback_list:
-        for feedback in feedback_list:
-            st.markdown(f"""
-            <div style="background: #f8f9fa; padding: 1rem; border-radius: 8px; margin: 1rem 0;">
-                <strong>👤 {feedback[1]}</strong><br>
-                <small>📅 {feedback[3]}</small><br><br>
-                {feedback[2]}
-            </div>
-            """, unsafe_allow_html=True)
+        render_feedback_window(feedback_list)
+        show_window_controls("feedback", feedback_list, has_more, cursor, direction, lambda f: (f[3], f[0]))
     else:
         st.info("No feedback received yet. Encourage your students to provide feedback!")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+    show_themes_section(teacher[0])
+    show_search_section("teacher", teacher[0])
+    show_export_section("teacher", teacher[0])
+
 def show_thank_you_page():
     name = st.session_state.get('thank_you_name', 'Student')
     st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
@@ -0,0 +1,734 @@
+#!/usr/bin/env python3
+"""
+Student Feedback System - Sharded Storage
+ShardedDatabaseManager spreads teachers, together with their rosters and
+feedback, over several SQLite files so submissions for teachers on different
+shards commit in parallel. A small directory database records which shard
+each teacher lives on and hands out teacher IDs. Feedback and student row IDs
+stay unique too: every shard allocates them from its own range.
+
+Teacher-scoped calls run on that teacher's shard only. Admin-wide calls fan
+out to every shard and merge the results in the order one database would
+return them.
+
+Usage:
+    python sharding.py --shards feedback_system.db,feedback_shard1.db status
+    python sharding.py --shards feedback_system.db,feedback_shard1.db move 7 1
+    python sharding.py --shards feedback_system.db,feedback_shard1.db rebalance --dry-run
+"""
+
+import argparse
+import heapq
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import zip_longest
+
+from config import (
+    ANALYTICS_DAYS, FEEDBACK_PAGE_SIZE, QUERY_STATS_ENABLED, ROLLUP_CHUNK_SIZE,
+    SHARD_DIRECTORY_PATH, SHARD_DIRECTORY_TTL, SHARD_PATHS,
+)
+from analytics import analyze_batch, store_analysis
+from database import (
+    ConnectionPool, DatabaseManager, LoginThrottle, QueryStats, SubmitResult, add_feedback_counts,
+    fold_feedback_rollups,
+)
+
+logger = logging.getLogger(__name__)
+
+# Shard n allocates feedback and student row IDs from n * SHARD_ID_SPAN upwards
+SHARD_ID_SPAN = 1 << 40
+
+# DatabaseManager methods whose first argument is a teacher_id; they run on that teacher's shard
+TEACHER_METHODS = (
+    "add_student", "get_students_for_teacher", "get_students_page", "get_student_by_student_id",
+    "resolve_student_name", "delete_student", "generate_unique_student_id",
+    "add_student_auto", "add_students_bulk", "get_teacher_by_id",
+    "has_student_submitted_today", "get_feedback_for_teacher", "get_feedback_page",
+    "iter_feedback_for_teacher", "get_top_terms", "get_sentiment_trend",
+)
+
+# (table, teacher column, copied columns) for the rows move_teacher carries over.
+# Counters, rollups and text analytics for these rows are rebuilt on the new shard
+# by their triggers and watermarks; archived rows are folded in by move_teacher.
+COPIED_TABLES = (
+    ("teachers", "id", ("id", "username", "password_hash", "full_name", "email", "subject", "created_at")),
+    ("students", "teacher_id", ("teacher_id", "student_id", "student_name", "created_at")),
+    ("student_id_sequences", "teacher_id", ("teacher_id", "last_seq")),
+    ("feedback", "teacher_id", ("teacher_id", "student_id", "student_name", "feedback_text",
+                                "submission_time", "submission_day")),
+)
+
+# Every table holding a teacher's rows, and the column naming the teacher
+TEACHER_TABLES = (
+    ("feedback", "teacher_id"), ("students", "teacher_id"), ("student_id_sequences", "teacher_id"),
+    ("feedback_counts", "teacher_id"), ("feedback_daily", "teacher_id"),
+    ("feedback_student_totals", "teacher_id"), ("teacher_terms", "teacher_id"),
+    ("feedback_sentiment", "teacher_id"), ("teachers", "id"),
+)
+
+
+def _delete_teacher_rows(conn, teacher_id):
+    """Delete every row belonging to a teacher on one shard (caller commits)."""
+    for table, column in TEACHER_TABLES:
+        conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (teacher_id,))
+
+
+def _reserve_id_range(shard, n):
+    """Start shard n's feedback and student IDs at n * SHARD_ID_SPAN."""
+    base = n * SHARD_ID_SPAN
+    with shard.pool.connection() as conn:
+        for table in ("feedback", "students"):
+            conn.execute(
+                """
+                INSERT INTO sqlite_sequence (name, seq)
+                SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = ?)
+                """,
+                (table, base, table),
+            )
+            conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = ? AND seq < ?",
+                         (base, table, base))
+        conn.commit()
+
+
+def _fold_archived(conn, rows):
+    """Add archived feedback rows (FeedbackArchive.teacher_rows format) to the counters,
+    rollups and text analytics on conn; moved hot rows are folded in by the usual jobs."""
+    totals = {}
+    days = []
+    for feedback_id, teacher_id, student_id, _, text, submission_time, submission_day in rows:
+        count, latest = totals.get(teacher_id, (0, ""))
+        totals[teacher_id] = (count + 1, max(latest, submission_time))
+        day = submission_day or conn.execute(
+            "SELECT DATE(?, 'localtime')", (submission_time,)
+        ).fetchone()[0]
+        days.append((feedback_id, teacher_id, student_id, text, submission_day, day))
+    add_feedback_counts(conn, totals)
+    fold_feedback_rollups(conn, [row[1:] for row in days])
+    store_analysis(conn, *analyze_batch([(row[0], row[1], row[5], row[3]) for row in days]))
+
+
+def _merge_pages(pages, page_size, direction, key):
+    """Combine per-shard (rows, has_more) keyset pages into one page, newest first."""
+    rows = sorted((row for shard_rows, _ in pages for row in shard_rows), key=key, reverse=True)
+    has_more = len(rows) > page_size or any(more for _, more in pages)
+    if direction == "prev":
+        # The newer page is the one closest to the cursor, i.e. the oldest candidates
+        return rows[max(len(rows) - page_size, 0):], has_more
+    return rows[:page_size], has_more
+
+
+class ShardedDatabaseManager:
+    def __init__(self, shard_paths=SHARD_PATHS, directory_path=SHARD_DIRECTORY_PATH,
+                 instrument=QUERY_STATS_ENABLED, **kwargs):
+        """Open one DatabaseManager per shard path (extra keyword arguments are passed
+        to each) plus the directory database. Shard order is recorded in the directory
+        and must not change; new shards may be appended.
+
+        Teachers already present in a shard file are registered on first use, so an
+        existing feedback_system.db can become shard 0 as-is.
+        """
+        if not shard_paths:
+            raise ValueError("at least one shard path is required")
+        self.shard_paths = list(shard_paths)
+        # teacher_id -> shard, so routing doesn't query the directory on every call
+        self._placements = {}
+        self._placements_loaded = None
+        self._placement_version = 0  # bumped whenever a placement changes
+        self._placement_lock = threading.Lock()
+        # Teacher-scoped calls in progress, and teachers being moved (see _routed)
+        self._route_cond = threading.Condition()
+        self._in_flight = {}
+        self._moving = set()
+        self.query_stats = QueryStats() if instrument else None
+        self.login_throttle = LoginThrottle()
+        self.shards = []
+        for n, path in enumerate(self.shard_paths):
+            shard = DatabaseManager(path, instrument=self.query_stats or False, **kwargs)
+            shard.login_throttle = self.login_throttle
+            if n:
+                _reserve_id_range(shard, n)
+            self.shards.append(shard)
+        self.directory = ConnectionPool(directory_path)
+        try:
+            self._init_directory()
+        except Exception:
+            for shard in self.shards:
+                shard.close()
+            self.directory.close()
+            raise
+        self._fan_out_pool = ThreadPoolExecutor(
+            max_workers=len(self.shards), thread_name_prefix="feedback-shard"
+        )
+        # Calls that can run at once without waiting for a connection, for thread-pool front ends
+        self.worker_count = sum(shard.pool.size for shard in self.shards)
+
+    def _init_directory(self):
+        with self.directory.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS shards (
+                        shard INTEGER PRIMARY KEY,
+                        path TEXT NOT NULL
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS teacher_shards (
+                        teacher_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        username TEXT UNIQUE NOT NULL,
+                        shard INTEGER NOT NULL REFERENCES shards (shard)
+                    )
+                ''')
+                recorded = dict(conn.execute("SELECT shard, path FROM shards"))
+                if len(recorded) > len(self.shard_paths):
+                    raise ValueError(
+                        f"the shard directory lists {len(recorded)} shards but only "
+                        f"{len(self.shard_paths)} paths were given"
+                    )
+                for n, path in enumerate(self.shard_paths):
+                    if recorded.get(n, path) != path:
+                        raise ValueError(f"shard {n} is recorded as {recorded[n]!r}, not {path!r}")
+                    conn.execute("INSERT OR IGNORE INTO shards (shard, path) VALUES (?, ?)", (n, path))
+                    with self.shards[n].pool.connection() as shard_conn:
+                        teachers = shard_conn.execute("SELECT id, username FROM teachers").fetchall()
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO teacher_shards (teacher_id, username, shard) VALUES (?, ?, ?)",
+                        [(teacher_id, username, n) for teacher_id, username in teachers],
+                    )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        self._load_placements()
+
+    def _load_placements(self):
+        """Reload the whole teacher -> shard map from the directory."""
+        with self.directory.connection() as conn:
+            placements = dict(conn.execute("SELECT teacher_id, shard FROM teacher_shards"))
+        with self._placement_lock:
+            if placements != self._placements:
+                self._placement_version += 1
+            self._placements = placements
+            self._placements_loaded = time.monotonic()
+
+    def _set_placement(self, teacher_id, shard):
+        with self._placement_lock:
+            self._placement_version += 1
+            if shard is None:
+                self._placements.pop(teacher_id, None)
+            else:
+                self._placements[teacher_id] = shard
+
+    def close(self):
+        """Close every shard and the directory."""
+        self._fan_out_pool.shutdown(wait=True)
+        for shard in self.shards:
+            shard.close()
+        self.directory.close()
+
+    # -----------------------------
+    # Routing
+    # -----------------------------
+    def shard_index(self, teacher_id, refresh=False):
+        """Index of the shard holding a teacher. Unknown teachers map to shard 0, where
+        lookups for them find nothing, as they would in a single database.
+
+        Served from memory; the directory is read again for teachers not in the map
+        (added by another process), with refresh=True, and for the whole map every
+        SHARD_DIRECTORY_TTL seconds (moves made by another process).
+        """
+        if time.monotonic() - self._placements_loaded > SHARD_DIRECTORY_TTL:
+            self._load_placements()
+        shard = None if refresh else self._placements.get(teacher_id)
+        if shard is None:
+            with self.directory.connection() as conn:
+                row = conn.execute("SELECT shard FROM teacher_shards WHERE teacher_id = ?",
+                                   (teacher_id,)).fetchone()
+            shard = row[0] if row else None
+            if shard != self._placements.get(teacher_id):
+                self._set_placement(teacher_id, shard)
+        return 0 if shard is None else shard
+
+    @contextmanager
+    def _routed(self, teacher_id):
+        """Yield a teacher's shard index for the duration of one call. move_teacher
+        waits for these calls to finish and holds new ones back until the teacher's
+        rows are on the new shard."""
+        with self._route_cond:
+            while teacher_id in self._moving:
+                self._route_cond.wait()
+            self._in_flight[teacher_id] = self._in_flight.get(teacher_id, 0) + 1
+        try:
+            yield self.shard_index(teacher_id)
+        finally:
+            with self._route_cond:
+                self._in_flight[teacher_id] -= 1
+                if not self._in_flight[teacher_id]:
+                    del self._in_flight[teacher_id]
+                    self._route_cond.notify_all()
+
+    def _moved_from(self, teacher_id, shard, version):
+        """True if a write routed to `shard` at placement `version` may have lost a race
+        with a move: the directory now places the teacher elsewhere, or placements
+        changed meanwhile (e.g. moved away and back). Waits for a move of the teacher
+        in progress in this process, so must not be called inside _routed."""
+        with self._route_cond:
+            while teacher_id in self._moving:
+                self._route_cond.wait()
+        return self.shard_index(teacher_id, refresh=True) != shard or self._placement_version != version
+
+    def shard_for(self, teacher_id) -> DatabaseManager:
+        """The DatabaseManager holding a teacher's rows."""
+        return self.shards[self.shard_index(teacher_id)]
+
+    def _fan_out(self, name, *args, **kwargs):
+        """Call a DatabaseManager method on every shard in parallel; results in shard order."""
+        if len(self.shards) == 1:
+            return [getattr(self.shards[0], name)(*args, **kwargs)]
+        futures = [self._fan_out_pool.submit(getattr(shard, name), *args, **kwargs)
+                   for shard in self.shards]
+        return [future.result() for future in futures]
+
+    # -----------------------------
+    # Accounts
+    # -----------------------------
+    def hash_password(self, password):
+        """Hash a password using SHA-256"""
+        return self.shards[0].hash_password(password)
+
+    def verify_admin_login(self, username, password, client=None):
+        """Admins live on shard 0."""
+        return self.shards[0].verify_admin_login(username, password, client)
+
+    def verify_teacher_login(self, username, password, client=None):
+        """Check the credentials on the teacher's shard (see DatabaseManager)."""
+        with self.directory.connection() as conn:
+            row = conn.execute("SELECT shard FROM teacher_shards WHERE username = ?",
+                               (username,)).fetchone()
+        return self.shards[row[0] if row else 0].verify_teacher_login(username, password, client)
+
+    def add_teacher(self, username, password, full_name, email, subject):
+        """Allocate a teacher ID, place the teacher on the shard with the fewest
+        teachers and add them there. Returns False if the username is taken."""
+        with self.directory.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                counts = dict(conn.execute("SELECT shard, COUNT(*) FROM teacher_shards GROUP BY shard"))
+                shard = min(range(len(self.shards)), key=lambda n: (counts.get(n, 0), n))
+                teacher_id = conn.execute(
+                    "INSERT INTO teacher_shards (username, shard) VALUES (?, ?)", (username, shard)
+                ).lastrowid
+                conn.commit()
+            except sqlite3.IntegrityError:
+                conn.rollback()
+                return False
+
+        if self.shards[shard].add_teacher(username, password, full_name, email, subject,
+                                          teacher_id=teacher_id):
+            self._set_placement(teacher_id, shard)
+            return True
+        with self.directory.connection() as conn:
+            conn.execute("DELETE FROM teacher_shards WHERE teacher_id = ?", (teacher_id,))
+            conn.commit()
+        return False
+
+    def delete_teacher(self, teacher_id):
+        """Delete a teacher and all their feedback"""
+        with self._routed(teacher_id) as shard:
+            if not self.shards[shard].delete_teacher(teacher_id):
+                return False
+        with self.directory.connection() as conn:
+            conn.execute("DELETE FROM teacher_shards WHERE teacher_id = ?", (teacher_id,))
+            conn.commit()
+        self._set_placement(teacher_id, None)
+        return True
+
+    def get_all_teachers(self):
+        """Get all teachers"""
+        teachers = [row for rows in self._fan_out("get_all_teachers") for row in rows]
+        return sorted(teachers, key=lambda row: row[0])
+
+    # -----------------------------
+    # Feedback
+    # -----------------------------
+    def submit_feedback_once(self, teacher_id: int, student_id: str, feedback_text: str):
+        """DatabaseManager.submit_feedback_once on the teacher's shard. If the teacher was
+        moved by another process meanwhile (the rows were gone, or the move held the
+        shard's lock past the busy timeout), the submission is retried on the new shard."""
+        while True:
+            error = result = None
+            version = self._placement_version
+            with self._routed(teacher_id) as shard:
+                try:
+                    result = self.shards[shard].submit_feedback_once(teacher_id, student_id, feedback_text)
+                except sqlite3.OperationalError as e:
+                    error = e
+            if error is None and result is not SubmitResult.UNKNOWN_STUDENT:
+                return result
+            # Checked outside _routed: _moved_from waits for this process's moves of the teacher
+            if not self._moved_from(teacher_id, shard, version):
+                if error is not None:
+                    raise error
+                return result
+
+    def submit_feedback(self, teacher_id: int, student_id: str, feedback_text: str) -> bool:
+        """Submit feedback on the teacher's shard (see DatabaseManager.submit_feedback)."""
+        return self.submit_feedback_once(teacher_id, student_id, feedback_text) is SubmitResult.OK
+
+    def enqueue_feedback(self, teacher_id: int, student_id: str, feedback_text: str) -> Future:
+        """DatabaseManager.enqueue_feedback on the teacher's shard, retried on the new
+        shard like submit_feedback_once when a move overtakes the queued write."""
+        outcome = Future()
+
+        def attempt():
+            version = self._placement_version
+            with self._routed(teacher_id) as shard:
+                queued = self.shards[shard].enqueue_feedback(teacher_id, student_id, feedback_text)
+
+            def done(future):
+                error = future.exception()
+                result = None if error else future.result()
+                lost_race = (isinstance(error, sqlite3.OperationalError)
+                             or result is SubmitResult.UNKNOWN_STUDENT)
+                try:
+                    if lost_race and self._moved_from(teacher_id, shard, version):
+                        attempt()
+                    elif error:
+                        outcome.set_exception(error)
+                    else:
+                        outcome.set_result(result)
+                except Exception as e:
+                    outcome.set_exception(e)
+            queued.add_done_callback(done)
+
+        attempt()
+        return outcome
+
+    def submit_feedback_batch(self, entries) -> list:
+        """Submit (teacher_id, student_id, feedback_text) entries with one transaction per
+        shard. Returns one SubmitResult per entry, in order."""
+        entries = list(entries)
+        version = self._placement_version
+        shard_of = {}
+        positions = {}
+        for n, entry in enumerate(entries):
+            teacher_id = entry[0]
+            if teacher_id not in shard_of:
+                shard_of[teacher_id] = self.shard_index(teacher_id)
+            positions.setdefault(shard_of[teacher_id], []).append(n)
+        results = [None] * len(entries)
+        for shard, indexes in positions.items():
+            shard_results = self.shards[shard].submit_feedback_batch([entries[n] for n in indexes])
+            for n, result in zip(indexes, shard_results):
+                results[n] = result
+        for n, (teacher_id, student_id, feedback_text) in enumerate(entries):
+            if (results[n] is SubmitResult.UNKNOWN_STUDENT
+                    and self._moved_from(teacher_id, shard_of[teacher_id], version)):
+                results[n] = self.submit_feedback_once(teacher_id, student_id, feedback_text)
+        return results
+
+    def get_all_feedback(self):
+        """Get all feedback with teacher names, newest first"""
+        return list(heapq.merge(*self._fan_out("get_all_feedback"),
+                                key=lambda row: (row[4], row[0]), reverse=True))
+
+    def get_all_feedback_page(self, page_size=FEEDBACK_PAGE_SIZE, cursor=None,
+                              direction="next", since=None, until=None):
+        """Paginated get_all_feedback across shards. The cursor for a row is (row[4], row[0])."""
+        pages = self._fan_out("get_all_feedback_page", page_size, cursor, direction, since, until)
+        return _merge_pages(pages, page_size, direction, key=lambda row: (row[4], row[0]))
+
+    def iter_all_feedback(self, since=None, until=None, chunk_size=500):
+        """Yield all feedback with teacher names, newest first, in chunks per shard."""
+        yield from heapq.merge(
+            *(shard.iter_all_feedback(since, until, chunk_size) for shard in self.shards),
+            key=lambda row: (row[4], row[0]), reverse=True,
+        )
+
+    def iter_feedback_export(self, teacher_id=None, since=None, until=None, chunk_size=500):
+        """Yield export rows newest first (see DatabaseManager.iter_feedback_export)."""
+        if teacher_id is not None:
+            yield from self.shard_for(teacher_id).iter_feedback_export(teacher_id, since, until, chunk_size)
+            return
+        yield from heapq.merge(
+            *(shard.iter_feedback_export(None, since, until, chunk_size) for shard in self.shards),
+            key=lambda row: (row[6], row[0]), reverse=True,
+        )
+
+    def search_feedback(self, query, teacher_id=None, limit=FEEDBACK_PAGE_SIZE,
+                        highlight=("<mark>", "</mark>"), snippet_tokens=16):
+        """Full-text search (see DatabaseManager.search_feedback). Without a teacher_id
+        each shard's best matches are interleaved, since ranks are per shard."""
+        if teacher_id is not None:
+            return self.shard_for(teacher_id).search_feedback(
+                query, teacher_id, limit, highlight, snippet_tokens
+            )
+        results = self._fan_out("search_feedback", query, None, limit, highlight, snippet_tokens)
+        merged = [row for group in zip_longest(*results) for row in group if row is not None]
+        return merged[:limit]
+
+    def get_feedback_counts(self, with_latest: bool = False) -> dict:
+        """Feedback totals per teacher from every shard"""
+        counts = {}
+        for shard_counts in self._fan_out("get_feedback_counts", with_latest):
+            counts.update(shard_counts)
+        return counts
+
+    # -----------------------------
+    # Analytics
+    # -----------------------------
+    def refresh_feedback_rollups(self, chunk_size=ROLLUP_CHUNK_SIZE):
+        """Refresh every shard's rollups; returns the feedback rows folded in."""
+        return sum(self._fan_out("refresh_feedback_rollups", chunk_size))
+
+    def get_daily_feedback_stats(self, teacher_id=None, since=None, until=None):
+        """Daily rollup rows, oldest day first (see DatabaseManager.get_daily_feedback_stats)."""
+        if teacher_id is not None:
+            return self.shard_for(teacher_id).get_daily_feedback_stats(teacher_id, since, until)
+        rows = [row for shard_rows in self._fan_out("get_daily_feedback_stats", None, since, until)
+                for row in shard_rows]
+        return sorted(rows, key=lambda row: (row[0], row[1]))
+
+    def get_teacher_analytics(self) -> dict:
+        """Per-teacher totals from every shard (see DatabaseManager.get_teacher_analytics)."""
+        analytics = {}
+        for shard_analytics in self._fan_out("get_teacher_analytics"):
+            analytics.update(shard_analytics)
+        return analytics
+
+    # -----------------------------
+    # Caches, statistics and snapshots
+    # -----------------------------
+    def invalidate_read_cache(self):
+        """Drop every shard's cached teacher lists and rosters."""
+        for shard in self.shards:
+            shard.invalidate_read_cache()
+
+    def get_query_stats(self) -> dict:
+        """Call statistics shared by all shards; fanned-out calls count once per shard."""
+        if self.query_stats is None:
+            return {"methods": {}, "slow_queries": []}
+        return self.query_stats.snapshot()
+
+    def refresh_snapshot(self):
+        """Refresh every shard's read snapshot; False if none is configured."""
+        return any(self._fan_out("refresh_snapshot"))
+
+    def get_snapshot_status(self):
+        """Status of the stalest shard snapshot, or None without snapshots."""
+        statuses = [status for status in self._fan_out("get_snapshot_status") if status is not None]
+        if not statuses:
+            return None
+        return max(statuses, key=lambda status: (not status["fresh"], status["age_seconds"] or 0))
+
+    # -----------------------------
+    # Rebalancing
+    # -----------------------------
+    def _purge_copies(self, teacher_id, keep):
+        """Delete a teacher's rows from every shard except `keep` (left by an interrupted move)."""
+        for n, shard in enumerate(self.shards):
+            if n == keep:
+                continue
+            with shard.pool.connection() as conn:
+                _delete_teacher_rows(conn, teacher_id)
+                conn.commit()
+            shard.archive.delete_teacher(teacher_id)
+            shard._roster_changed(teacher_id)
+
+    def move_teacher(self, teacher_id, target) -> int:
+        """Move a teacher's account, roster and feedback to shard `target` and return
+        the number of feedback rows moved.
+
+        The source shard is write-locked while the rows are copied, then the directory
+        is switched and the source rows are deleted. Feedback gets new IDs on the target
+        shard; archived feedback moves to the target's archive with its IDs unchanged.
+        Re-running a move that was interrupted finishes it.
+
+        In this process, calls for the teacher that are already running finish first
+        and new ones wait until the move is done. Submissions from other processes
+        that lose the race are retried on the new shard by submit_feedback_once.
+        """
+        if not 0 <= target < len(self.shards):
+            raise ValueError(f"shard {target} does not exist")
+        with self._route_cond:
+            while teacher_id in self._moving:
+                self._route_cond.wait()
+            self._moving.add(teacher_id)
+            # Let calls already routed to the old shard finish; new ones wait for the move
+            while self._in_flight.get(teacher_id):
+                self._route_cond.wait()
+        try:
+            return self._move_teacher(teacher_id, target)
+        finally:
+            with self._route_cond:
+                self._moving.discard(teacher_id)
+                self._route_cond.notify_all()
+
+    def _move_teacher(self, teacher_id, target):
+        with self.directory.connection() as conn:
+            row = conn.execute("SELECT shard FROM teacher_shards WHERE teacher_id = ?",
+                               (teacher_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"teacher {teacher_id} is not registered")
+        if row[0] == target:
+            self._purge_copies(teacher_id, keep=target)
+            return 0
+
+        source, dest = self.shards[row[0]], self.shards[target]
+        moved = 0
+        with source.pool.connection() as src, dest.pool.connection() as dst:
+            src.execute("BEGIN IMMEDIATE")
+            try:
+                dst.execute("BEGIN IMMEDIATE")
+                _delete_teacher_rows(dst, teacher_id)
+                for table, column, columns in COPIED_TABLES:
+                    names = ", ".join(columns)
+                    rows = src.execute(
+                        f"SELECT {names} FROM {table} WHERE {column} = ? ORDER BY rowid", (teacher_id,)
+                    ).fetchall()
+                    dst.executemany(
+                        f"INSERT INTO {table} ({names}) VALUES ({', '.join('?' * len(columns))})", rows
+                    )
+                    if table == "feedback":
+                        moved = len(rows)
+                archived = source.archive.teacher_rows(teacher_id)
+                if archived:
+                    _fold_archived(dst, archived)
+                dst.commit()
+                if archived:
+                    dest.archive.store(archived)
+                with self.directory.connection() as conn:
+                    conn.execute("UPDATE teacher_shards SET shard = ? WHERE teacher_id = ?",
+                                 (target, teacher_id))
+                    conn.commit()
+                self._set_placement(teacher_id, target)
+                _delete_teacher_rows(src, teacher_id)
+                src.commit()
+            except Exception:
+                if dst.in_transaction:
+                    dst.rollback()
+                src.rollback()
+                raise
+        source.archive.delete_teacher(teacher_id)
+        source._roster_changed(teacher_id)
+        dest._roster_changed(teacher_id)
+        logger.info("Moved teacher %s (%d feedback rows) from shard %d to shard %d",
+                    teacher_id, moved, row[0], target)
+        return moved
+
+    def shard_loads(self, days=ANALYTICS_DAYS) -> dict:
+        """Map shard -> {teacher_id: weight}, where weight is the teacher's submissions
+        over the last `days` days plus one, so idle teachers still spread out."""
+        since = date.today() - timedelta(days=days)
+        self.refresh_feedback_rollups()
+        recent = {}
+        for _, teacher_id, submissions, _, _ in self.get_daily_feedback_stats(since=since):
+            recent[teacher_id] = recent.get(teacher_id, 0) + submissions
+        with self.directory.connection() as conn:
+            placements = conn.execute("SELECT teacher_id, shard FROM teacher_shards").fetchall()
+        loads = {n: {} for n in range(len(self.shards))}
+        for teacher_id, shard in placements:
+            loads[shard][teacher_id] = recent.get(teacher_id, 0) + 1
+        return loads
+
+    def plan_rebalance(self, days=ANALYTICS_DAYS) -> list:
+        """Greedy moves, as (teacher_id, from_shard, to_shard), that even out recent
+        write load: repeatedly move the heaviest teacher that narrows the gap between
+        the busiest and the quietest shard."""
+        loads = self.shard_loads(days)
+        totals = {n: sum(weights.values()) for n, weights in loads.items()}
+        moves = []
+        while True:
+            heavy = max(totals, key=totals.get)
+            light = min(totals, key=totals.get)
+            gap = totals[heavy] - totals[light]
+            candidates = [(weight, teacher_id) for teacher_id, weight in loads[heavy].items()
+                          if weight < gap]
+            if not candidates:
+                return moves
+            weight, teacher_id = max(candidates)
+            loads[light][teacher_id] = loads[heavy].pop(teacher_id)
+            totals[heavy] -= weight
+            totals[light] += weight
+            moves.append((teacher_id, heavy, light))
+
+    def rebalance(self, days=ANALYTICS_DAYS, dry_run=False) -> list:
+        """Plan and, unless dry_run, perform the moves; returns the plan."""
+        moves = self.plan_rebalance(days)
+        if not dry_run:
+            for teacher_id, _, target in moves:
+                self.move_teacher(teacher_id, target)
+        return moves
+
+
+def _make_routed(name):
+    def method(self, teacher_id, *args, **kwargs):
+        with self._routed(teacher_id) as shard:
+            return getattr(self.shards[shard], name)(teacher_id, *args, **kwargs)
+
+    method.__name__ = name
+    method.__qualname__ = f"ShardedDatabaseManager.{name}"
+    method.__doc__ = f"DatabaseManager.{name} on the teacher's shard."
+    return method
+
+
+for _name in TEACHER_METHODS:
+    setattr(ShardedDatabaseManager, _name, _make_routed(_name))
+del _name
+
+
+def open_database(**kwargs):
+    """The manager every entry point should use: a ShardedDatabaseManager when
+    SHARD_PATHS is configured, otherwise a DatabaseManager on the default file.
+    Keyword arguments are passed to each DatabaseManager."""
+    if SHARD_PATHS:
+        return ShardedDatabaseManager(**kwargs)
+    return DatabaseManager(**kwargs)
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Inspect and rebalance sharded feedback storage.")
+    parser.add_argument("--shards", default=",".join(SHARD_PATHS),
+                        help="Comma-separated shard database paths, in their recorded order")
+    parser.add_argument("--directory", default=SHARD_DIRECTORY_PATH, help="Shard directory database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Show teachers and recent load per shard")
+    move = commands.add_parser("move", help="Move one teacher to another shard")
+    move.add_argument("teacher_id", type=int)
+    move.add_argument("shard", type=int)
+    rebalance = commands.add_parser("rebalance", help="Even out recent write load across shards")
+    rebalance.add_argument("--days", type=int, default=ANALYTICS_DAYS,
+                           help="Days of submissions used to weigh teachers")
+    rebalance.add_argument("--dry-run", action="store_true", help="Print the plan without moving anyone")
+    args = parser.parse_args(argv)
+
+    shard_paths = [path for path in args.shards.split(",") if path.strip()]
+    if not shard_paths:
+        parser.error("no shards given (use --shards or set SHARD_PATHS in config.py)")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    db = ShardedDatabaseManager(shard_paths, args.directory)
+    try:
+        if args.command == "move":
+            moved = db.move_teacher(args.teacher_id, args.shard)
+            print(f"🚚 Teacher {args.teacher_id} is on shard {args.shard} ({moved} feedback rows moved)")
+        elif args.command == "rebalance":
+            moves = db.rebalance(args.days, dry_run=args.dry_run)
+            for teacher_id, source, target in moves:
+                print(f"🚚 Teacher {teacher_id}: shard {source} -> shard {target}")
+            if not moves:
+                print("✅ Shards are already balanced")
+        for n, weights in db.shard_loads().items():
+            print(f"  Shard {n} ({db.shard_paths[n]}): {len(weights)} teachers, "
+                  f"{sum(weights.values()) - len(weights)} submissions in the last {ANALYTICS_DAYS} days")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,18 @@ This script tests the basic functionality of the system
 
 import sqlite3
 import hashlib
-from database import DatabaseManager
+import glob
+import os
+import csv
+import io
+import json
+from database import DatabaseManager, LoginThrottled, SubmitResult, MIGRATIONS, _migrate_student_id_sequences
+
+def remove_database(path):
+    """Delete a test database along with its WAL side files"""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
 
 def test_database():
     """Test database functionality"""
@@ -44,6 +55,7 @@ def test_database():
     
     # Clean up test database
     import os
+    db.close()
     if os.path.exists("test_feedback_system.db"):
         os.remove("test_feedback_system.db")
         print("✅ Test database cleaned up")
@@ -70,6 +82,1013 @@ def test_password_hashing():
     else:
         print("❌ Password hash length is incorrect")
 
+def test_connection_pool():
+    """Test that pooled connections are reused and shared by nested borrows"""
+    print("\n🔌 Testing Connection Pool...")
+    
+    db = DatabaseManager("test_pool.db")
+    
+    with db.pool.connection() as outer:
+        with db.pool.connection() as inner:
+            assert inner is outer
+    print("✅ Nested borrows share one connection")
+    
+    with db.pool.connection() as again:
+        assert again is outer
+        mode = again.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+    print("✅ Idle connection reused in WAL mode")
+    
+    db.close()
+    remove_database("test_pool.db")
+
+def test_hot_query_plans():
+    """Test that hot queries are served from indexes, not table scans"""
+    print("\n📈 Testing Query Plans...")
+
+    db = DatabaseManager("test_plans.db")
+    db.add_teacher("planteacher", "password123", "Plan Teacher", "plan@example.com", "Physics")
+    teacher = db.verify_teacher_login("planteacher", "password123")
+    db.add_student(teacher[0], "SID001", "Plan Student")
+
+    with db.pool.connection() as conn:
+        statements = []
+        conn.set_trace_callback(statements.append)
+        db.verify_admin_login("admin", "admin123")
+        db.verify_teacher_login("planteacher", "password123")
+        db.get_student_by_student_id(teacher[0], "SID001")
+        db.get_feedback_for_teacher(teacher[0])
+        db.get_students_page(teacher[0])
+        db.has_student_submitted_today(teacher[0], "SID001")
+        conn.set_trace_callback(None)
+
+        selects = [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+        assert selects
+        for sql in selects:
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+            assert not any(step.startswith("SCAN") for step in plan), (sql, plan)
+            assert not any("TEMP B-TREE" in step for step in plan), (sql, plan)
+    print(f"✅ {len(selects)} hot queries use indexes")
+
+    db.close()
+    remove_database("test_plans.db")
+
+def test_schema_migrations():
+    """Test in-place upgrade of a pre-migration database and the cheap startup check"""
+    print("\n🧱 Testing Schema Migrations...")
+
+    conn = sqlite3.connect("test_migrations.db")
+    conn.executescript("""
+        CREATE TABLE admins (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL,
+                             password_hash TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE teachers (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL,
+                               password_hash TEXT NOT NULL, full_name TEXT NOT NULL, email TEXT,
+                               subject TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE feedback (id INTEGER PRIMARY KEY AUTOINCREMENT, teacher_id INTEGER NOT NULL,
+                               student_name TEXT NOT NULL, feedback_text TEXT NOT NULL,
+                               submission_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        INSERT INTO teachers (username, password_hash, full_name) VALUES ('oldteacher', 'x', 'Old Teacher');
+        INSERT INTO feedback (teacher_id, student_name, feedback_text) VALUES (1, 'Old Student', 'Kept across upgrades');
+    """)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+    conn.close()
+
+    db = DatabaseManager("test_migrations.db", instrument=False)
+    with db.pool.connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(feedback)")]
+        assert {"student_id", "submission_day"} <= set(columns)
+        assert conn.execute("SELECT COUNT(*) FROM students").fetchone()[0] == 0
+    assert [row[2] for row in db.get_feedback_for_teacher(1)] == ["Kept across upgrades"]
+    assert db.verify_admin_login("admin", "admin123")
+    print(f"✅ Version 0 database upgraded in place to version {len(MIGRATIONS)}")
+
+    with db.pool.connection() as conn:
+        statements = []
+        conn.set_trace_callback(statements.append)
+        db.init_database()
+        conn.set_trace_callback(None)
+    assert statements == ["PRAGMA user_version"]
+    print("✅ A current database costs one PRAGMA user_version read at startup")
+
+    db.close()
+    remove_database("test_migrations.db")
+
+def test_feedback_counts():
+    """Test that trigger-maintained feedback counters track inserts and deletes"""
+    print("\n🔢 Testing Feedback Counts...")
+
+    db = DatabaseManager("test_counts.db")
+    db.add_teacher("countteacher", "password123", "Count Teacher", "count@example.com", "History")
+    teacher = db.verify_teacher_login("countteacher", "password123")
+    db.add_student(teacher[0], "SID001", "Count Student")
+    db.add_student(teacher[0], "SID002", "Other Student")
+    db.submit_feedback(teacher[0], "SID001", "First feedback entry")
+    db.submit_feedback(teacher[0], "SID002", "Second feedback entry")
+
+    assert db.get_feedback_counts() == {teacher[0]: 2}
+    count, latest = db.get_feedback_counts(with_latest=True)[teacher[0]]
+    assert count == 2 and latest is not None
+    print("✅ Counts follow inserts")
+
+    with db.pool.connection() as conn:
+        conn.execute("DELETE FROM feedback WHERE student_id = 'SID001'")
+        conn.commit()
+    assert db.get_feedback_counts() == {teacher[0]: 1}
+    db.delete_teacher(teacher[0])
+    assert db.get_feedback_counts() == {}
+    print("✅ Counts follow deletes")
+
+    db.close()
+    remove_database("test_counts.db")
+
+def test_feedback_pagination():
+    """Test keyset pagination, date filters and chunked streaming of feedback"""
+    print("\n📄 Testing Feedback Pagination...")
+
+    db = DatabaseManager("test_pages.db")
+    db.add_teacher("pageteacher", "password123", "Page Teacher", "page@example.com", "Art")
+    teacher = db.verify_teacher_login("pageteacher", "password123")
+    with db.pool.connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO feedback (teacher_id, student_name, feedback_text, student_id, submission_time)
+            VALUES (?, 'Page Student', ?, 'SID001', ?)
+            """,
+            [(teacher[0], f"Entry {i}", f"2024-01-{i % 10 + 1:02d} 09:00:00") for i in range(25)],
+        )
+        conn.commit()
+
+    first, has_more = db.get_feedback_page(teacher[0], page_size=10)
+    assert len(first) == 10 and has_more
+    second, _ = db.get_feedback_page(teacher[0], page_size=10, cursor=(first[-1][3], first[-1][0]))
+    assert not {row[0] for row in first} & {row[0] for row in second}
+    back, has_newer = db.get_feedback_page(
+        teacher[0], page_size=10, cursor=(second[0][3], second[0][0]), direction="prev"
+    )
+    assert back == first and not has_newer
+    print("✅ Pages move forward and back without overlap")
+
+    streamed = list(db.iter_feedback_for_teacher(teacher[0], chunk_size=4))
+    assert sorted(row[0] for row in streamed) == sorted(row[0] for row in db.get_feedback_for_teacher(teacher[0]))
+    window = list(db.iter_all_feedback(since="2024-01-03", until="2024-01-05"))
+    assert len(window) == 6 and all("2024-01-03" <= row[4] < "2024-01-05" for row in window)
+    print("✅ Streaming and date filters return the expected rows")
+
+    db.close()
+    remove_database("test_pages.db")
+
+def test_roster_pagination():
+    """Test keyset windows over a teacher's roster"""
+    print("\n👥 Testing Roster Pagination...")
+
+    db = DatabaseManager("test_roster_pages.db")
+    db.add_teacher("rosterteacher", "password123", "Roster Teacher", "roster@example.com", "Music")
+    teacher = db.verify_teacher_login("rosterteacher", "password123")
+    db.add_students_bulk(teacher[0], [(i + 1, f"SID{i:03d}", f"Roster Student {i}") for i in range(23)])
+
+    pages, cursor, has_more = [], None, True
+    while has_more:
+        page, has_more = db.get_students_page(teacher[0], page_size=10, cursor=cursor)
+        pages.append(page)
+        cursor = (page[-1][4], page[-1][0])
+    assert [len(page) for page in pages] == [10, 10, 3]
+    windowed = [row for page in pages for row in page]
+    assert sorted(windowed) == sorted(db.get_students_for_teacher(teacher[0]))
+    assert windowed == sorted(windowed, key=lambda row: (row[4], row[0]), reverse=True)
+    print("✅ Windows cover the roster once, newest first")
+
+    back, has_newer = db.get_students_page(
+        teacher[0], page_size=10, cursor=(pages[1][0][4], pages[1][0][0]), direction="prev"
+    )
+    assert back == pages[0] and not has_newer
+    db.delete_student(teacher[0], pages[0][0][2])
+    first, _ = db.get_students_page(teacher[0], page_size=10)
+    assert first == pages[0][1:] + pages[1][:1]
+    print("✅ Windows page back and reflect removals")
+
+    db.close()
+    remove_database("test_roster_pages.db")
+
+def test_student_id_sequence():
+    """Test seeding from existing IDs and concurrent student ID allocation"""
+    print("\n🆔 Testing Student ID Sequence...")
+
+    db = DatabaseManager("test_sequence.db")
+    db.add_teacher("seqteacher", "password123", "Seq Teacher", "seq@example.com", "Biology")
+    teacher = db.verify_teacher_login("seqteacher", "password123")
+    db.add_student(teacher[0], "SID007", "Legacy Student")
+    db.add_student(teacher[0], "SIDA004", "Current Student")
+    with db.pool.connection() as conn:
+        # Roll the schema back to just before the sequence table existed
+        conn.execute("DROP TABLE student_id_sequences")
+        conn.execute(f"PRAGMA user_version = {MIGRATIONS.index(_migrate_student_id_sequences)}")
+        conn.commit()
+    db.close()
+
+    db = DatabaseManager("test_sequence.db")
+    assert db.generate_unique_student_id(teacher[0]) == "SIDA008"
+    db.add_student(teacher[0], "SIDA009", "Manual Student")
+    assert db.add_student_auto(teacher[0], "Next Student") == (True, "SIDA008")
+    assert db.add_student_auto(teacher[0], "After Manual") == (True, "SIDA010")
+    print("✅ Sequence seeded from legacy and current IDs")
+
+    import threading
+    results = []
+    def add_many():
+        for i in range(10):
+            results.append(db.add_student_auto(teacher[0], f"Concurrent {i}"))
+    threads = [threading.Thread(target=add_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(ok for ok, _ in results)
+    assert len({sid for _, sid in results}) == 80
+    print("✅ Concurrent adds get distinct IDs")
+
+    db.close()
+    remove_database("test_sequence.db")
+
+def test_bulk_student_import():
+    """Test CSV roster import with auto IDs, duplicates and bad rows"""
+    print("\n📥 Testing Bulk Student Import...")
+
+    import io
+    from database import iter_roster_csv
+
+    db = DatabaseManager("test_bulk.db")
+    db.add_teacher("bulkteacher", "password123", "Bulk Teacher", "bulk@example.com", "Music")
+    teacher = db.verify_teacher_login("bulkteacher", "password123")
+    db.add_student(teacher[0], "EXISTING", "Already Here")
+
+    csv_text = "student_id,student_name\n" + "".join(f",Student {i}\n" for i in range(1000))
+    csv_text += "EXISTING,Clash\nNEW1,Explicit\nNEW1,Repeat\n,\n"
+    report = db.add_students_bulk(teacher[0], iter_roster_csv(io.BytesIO(csv_text.encode())))
+
+    assert len(report["added"]) == 1001
+    assert [sid for _, sid in report["duplicates"]] == ["EXISTING", "NEW1"]
+    assert [line for line, _ in report["errors"]] == [1005]
+    assert len(db.get_students_for_teacher(teacher[0])) == 1002
+    assert db.generate_unique_student_id(teacher[0]) == "SIDA1001"
+    print(f"✅ Imported {len(report['added'])} students in one transaction")
+
+    db.close()
+    remove_database("test_bulk.db")
+
+def test_feedback_writer():
+    """Test group-committed feedback submissions through the write-behind queue"""
+    print("\n🧾 Testing Feedback Writer...")
+
+    db = DatabaseManager("test_writer.db", write_behind=True)
+    db.add_teacher("writerteacher", "password123", "Writer Teacher", "writer@example.com", "Drama")
+    teacher = db.verify_teacher_login("writerteacher", "password123")
+    for i in range(51):
+        db.add_student(teacher[0], f"SID{i:03d}", f"Writer Student {i}")
+
+    futures = [db.enqueue_feedback(teacher[0], f"SID{i:03d}", f"Queued entry {i}") for i in range(50)]
+    unknown = db.enqueue_feedback(teacher[0], "NOPE", "Should be rejected")
+    assert all(future.result(timeout=5) is SubmitResult.OK for future in futures)
+    assert unknown.result(timeout=5) is SubmitResult.UNKNOWN_STUDENT
+
+    stats = db.feedback_writer.stats()
+    assert stats["written"] == 50 and stats["flushes"] < 51
+    print(f"✅ 50 submissions committed in {stats['flushes']} flushes")
+
+    late = db.feedback_writer.submit(teacher[0], "SID050", "Written during shutdown")
+    db.close()
+    assert late.done() and late.result()
+    print("✅ Queue drained on close")
+    remove_database("test_writer.db")
+
+def test_daily_submission_limit():
+    """Test the database-enforced one-submission-per-day rule"""
+    print("\n📆 Testing Daily Submission Limit...")
+
+    db = DatabaseManager("test_daily.db")
+    db.add_teacher("dailyteacher", "password123", "Daily Teacher", "daily@example.com", "Chemistry")
+    teacher = db.verify_teacher_login("dailyteacher", "password123")
+    db.add_student(teacher[0], "SID001", "Daily Student")
+
+    assert db.submit_feedback_once(teacher[0], "SID001", "First today") is SubmitResult.OK
+    assert db.submit_feedback_once(teacher[0], " SID001 ", "Second today") is SubmitResult.ALREADY_SUBMITTED
+    assert db.submit_feedback_once(teacher[0], "SID999", "Who am I") is SubmitResult.UNKNOWN_STUDENT
+    assert db.has_student_submitted_today(teacher[0], "SID001")
+    assert len(db.get_feedback_for_teacher(teacher[0])) == 1
+    print("✅ Second same-day submission rejected")
+
+    db.close()
+    remove_database("test_daily.db")
+
+def test_read_cache():
+    """Test that teacher and roster reads are cached until a write bumps the generation"""
+    print("\n🗃️ Testing Read Cache...")
+
+    db = DatabaseManager("test_cache.db")
+    db.add_teacher("cacheteacher", "password123", "Cache Teacher", "cache@example.com", "Latin")
+    teacher = db.verify_teacher_login("cacheteacher", "password123")
+
+    with db.pool.connection() as conn:
+        statements = []
+        conn.set_trace_callback(statements.append)
+        db.get_all_teachers()
+        db.get_students_for_teacher(teacher[0])
+        first_reads = len(statements)
+        db.get_all_teachers()
+        db.get_students_for_teacher(teacher[0])
+        assert len(statements) == first_reads
+        print("✅ Repeated reads served from cache")
+
+        db.add_student(teacher[0], "SID001", "Cache Student")
+        assert [s[2] for s in db.get_students_for_teacher(teacher[0])] == ["SID001"]
+        db.delete_student(teacher[0], "SID001")
+        assert db.get_students_for_teacher(teacher[0]) == []
+        conn.set_trace_callback(None)
+    print("✅ Writes invalidate cached rosters")
+
+    db.close()
+    remove_database("test_cache.db")
+
+def test_roster_index():
+    """Test cached student ID resolution, invalidation and LRU eviction"""
+    print("\n📇 Testing Roster Index...")
+
+    db = DatabaseManager("test_roster.db")
+    teacher_ids = []
+    for i in range(3):
+        db.add_teacher(f"rosterteacher{i}", "password123", f"Roster Teacher {i}", "r@example.com", "Maths")
+        teacher_ids.append(db.verify_teacher_login(f"rosterteacher{i}", "password123")[0])
+    db.add_student(teacher_ids[0], "SID001", "Roster Student")
+
+    assert db.resolve_student_name(teacher_ids[0], "SID001") == "Roster Student"
+    with db.pool.connection() as conn:
+        statements = []
+        conn.set_trace_callback(statements.append)
+        assert db.resolve_student_name(teacher_ids[0], " SID001 ") == "Roster Student"
+        assert db.resolve_student_name(teacher_ids[0], "SID404") is None
+        conn.set_trace_callback(None)
+    assert statements == []
+    print("✅ Repeated lookups skip SQLite")
+
+    db.delete_student(teacher_ids[0], "SID001")
+    assert db.resolve_student_name(teacher_ids[0], "SID001") is None
+    ok, new_id = db.add_student_auto(teacher_ids[0], "Auto Student")
+    assert db.resolve_student_name(teacher_ids[0], new_id) == "Auto Student"
+    print("✅ Roster changes invalidate the index")
+
+    db.roster_index.max_teachers = 2
+    for teacher_id in teacher_ids:
+        db.resolve_student_name(teacher_id, "SID001")
+    stats = db.roster_index.stats()
+    assert stats["teachers"] == 2 and stats["evictions"] == 1 and stats["hits"] == 3
+    print(f"✅ LRU eviction keeps {stats['teachers']} rosters")
+
+    db.close()
+    remove_database("test_roster.db")
+
+def test_login_throttle():
+    """Test failed-login lockout per username and client"""
+    print("\n🔒 Testing Login Throttle...")
+
+    db = DatabaseManager("test_throttle.db")
+    db.login_throttle.limit = 3
+    for _ in range(3):
+        assert not db.verify_admin_login("admin", "wrong", client="10.0.0.1")
+    try:
+        db.verify_admin_login("admin", "admin123", client="10.0.0.1")
+        assert False, "locked-out login should raise"
+    except LoginThrottled as e:
+        assert 0 < e.retry_after <= db.login_throttle.window
+    print("✅ Lockout after repeated failures")
+
+    assert db.verify_admin_login("admin", "admin123", client="10.0.0.2")
+    assert db.verify_teacher_login("admin", "wrong", client="10.0.0.1") is None
+    print("✅ Other clients and login kinds unaffected")
+
+    for n in range(10):
+        assert not db.verify_admin_login("admin", "wrong", client=f"10.0.1.{n}")
+    assert db.verify_admin_login("admin", "admin123", client="10.0.2.1")
+    print("✅ Failures from other clients cannot lock the real user out")
+
+    db.login_throttle.max_keys = 2
+    for i in range(5):
+        db.login_throttle.record_failure(("teacher", f"user{i}", None))
+    assert len(db.login_throttle._failures) == 2
+    print("✅ Tracked keys stay bounded")
+
+    db.close()
+    remove_database("test_throttle.db")
+
+def test_feedback_export():
+    """Test streaming CSV/JSONL export with teacher and date filters"""
+    print("\n📤 Testing Feedback Export...")
+    from export import export_feedback, main as export_main
+
+    db = DatabaseManager("test_export.db")
+    teacher_ids = []
+    for i in range(2):
+        db.add_teacher(f"exportteacher{i}", "password123", f"Export Teacher {i}", "e@example.com", "Maths")
+        teacher_ids.append(db.verify_teacher_login(f"exportteacher{i}", "password123")[0])
+    with db.pool.connection() as conn:
+        conn.executemany(
+            "INSERT INTO feedback (teacher_id, student_id, student_name, feedback_text, submission_time) VALUES (?, ?, ?, ?, ?)",
+            [(teacher_ids[i % 2], f"S{i:03d}", f"Student {i}", f"Feedback, \"quoted\" {i}", f"2024-01-{i % 28 + 1:02d} 10:00:00")
+             for i in range(60)],
+        )
+        conn.commit()
+
+    out = io.StringIO(newline="")
+    assert export_feedback(db, out, "csv", chunk_size=7) == 60
+    lines = csv.reader(io.StringIO(out.getvalue()))
+    header, first = next(lines), next(lines)
+    assert header[0] == "id" and first[6] == "2024-01-28 10:00:00"
+    assert len(list(lines)) == 59
+    print("✅ CSV export streams every row across chunks")
+
+    out = io.StringIO()
+    count = export_feedback(db, out, "jsonl", teacher_id=teacher_ids[0],
+                            since="2024-01-05", until="2024-01-10")
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert count == len(records) > 0
+    assert all(r["teacher_id"] == teacher_ids[0] and "2024-01-05" <= r["submission_time"] < "2024-01-10"
+               for r in records)
+    print(f"✅ JSONL export filtered to {count} rows")
+
+    try:
+        export_feedback(db, io.StringIO(), "pdf")
+        assert False, "unsupported format should raise"
+    except ValueError:
+        pass
+    db.close()
+
+    export_main(["--db", "test_export.db", "--format", "jsonl", "--teacher", "exportteacher1",
+                 "--limit", "5", "--output", "test_export.jsonl"])
+    with open("test_export.jsonl", encoding="utf-8") as f:
+        assert len(f.readlines()) == 5
+    os.remove("test_export.jsonl")
+    print("✅ CLI export honours --teacher and --limit")
+
+    remove_database("test_export.db")
+
+def test_feedback_search():
+    """Test FTS5 feedback search, snippets, scoping and trigger sync"""
+    print("\n🔎 Testing Feedback Search...")
+
+    db = DatabaseManager("test_search.db")
+    teacher_ids = []
+    for i in range(2):
+        db.add_teacher(f"searchteacher{i}", "password123", f"Search Teacher {i}", "s@example.com", "Maths")
+        teacher_ids.append(db.verify_teacher_login(f"searchteacher{i}", "password123")[0])
+    db.add_student(teacher_ids[0], "SID001", "Ada Lovelace")
+    db.add_student(teacher_ids[1], "SID001", "Alan Turing")
+    assert db.submit_feedback(teacher_ids[0], "SID001", "The algebra examples were really helpful")
+    assert db.submit_feedback(teacher_ids[1], "SID001", "Algebra homework was too long, examples unclear")
+
+    results = db.search_feedback("algebra examples")
+    assert len(results) == 2
+    assert all("<mark>" in row[3] for row in results)
+    assert [row[2] for row in db.search_feedback("algebra", teacher_id=teacher_ids[1])] == ["Alan Turing"]
+    assert [row[2] for row in db.search_feedback("lovel")] == ["Ada Lovelace"]
+    assert db.search_feedback('homework" OR "x') == [] and db.search_feedback("  ") == []
+    print("✅ Ranked, scoped and prefix search with snippets")
+
+    db.delete_teacher(teacher_ids[1])
+    assert [row[2] for row in db.search_feedback("algebra")] == ["Ada Lovelace"]
+    print("✅ Index follows deletions")
+
+    db.close()
+    remove_database("test_search.db")
+
+def test_feedback_rollups():
+    """Test incremental daily rollups and teacher analytics"""
+    print("\n📊 Testing Feedback Rollups...")
+
+    db = DatabaseManager("test_rollups.db")
+    db.add_teacher("rollupteacher", "password123", "Rollup Teacher", "r@example.com", "Maths")
+    teacher_id = db.verify_teacher_login("rollupteacher", "password123")[0]
+    for i in range(4):
+        db.add_student(teacher_id, f"SID{i:03d}", f"Student {i}")
+    with db.pool.connection() as conn:
+        conn.executemany(
+            "INSERT INTO feedback (teacher_id, student_id, student_name, feedback_text, submission_time, submission_day) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (teacher_id, "SID000", "Student 0", "one two three", "2024-03-01 09:00:00", "2024-03-01"),
+                (teacher_id, "SID001", "Student 1", "one two three four five", "2024-03-01 10:00:00", "2024-03-01"),
+                (teacher_id, "SID001", "Student 1", "legacy same-day duplicate", "2024-03-01 11:00:00", None),
+                (teacher_id, "SID000", "Student 0", "one", "2024-03-02 09:00:00", "2024-03-02"),
+            ],
+        )
+        conn.commit()
+
+    assert db.refresh_feedback_rollups(chunk_size=3) == 4
+    assert db.refresh_feedback_rollups() == 0
+    stats = db.get_daily_feedback_stats(teacher_id=teacher_id)
+    assert stats == [("2024-03-01", teacher_id, 3, 2, 11), ("2024-03-02", teacher_id, 1, 1, 1)]
+    assert db.get_daily_feedback_stats(since="2024-03-02") == [("2024-03-02", teacher_id, 1, 1, 1)]
+    print("✅ Daily counts, distinct students and word totals")
+
+    assert db.submit_feedback(teacher_id, "SID002", "fresh feedback from a new student")
+    assert db.get_teacher_analytics()[teacher_id]["submissions"] == 4  # reads never write
+    assert db.refresh_feedback_rollups() == 1
+    analytics = db.get_teacher_analytics()[teacher_id]
+    assert analytics["submissions"] == 5 and analytics["roster_size"] == 4
+    assert analytics["participants"] == 3 and analytics["participation"] == 0.75
+    assert analytics["avg_words"] == 18 / 5
+    print("✅ New feedback folded in from the watermark")
+
+    db.close()
+    remove_database("test_rollups.db")
+
+def test_text_analytics():
+    """Test the incremental term-frequency and sentiment job"""
+    print("\n💡 Testing Text Analytics...")
+    from analytics import refresh_text_analytics, sentiment_score, tokenize
+
+    assert sentiment_score(tokenize("Clear and helpful lessons")) == 1.0
+    assert sentiment_score(tokenize("The homework was not helpful and boring")) == -1.0
+    assert sentiment_score(tokenize("We covered chapter four")) == 0.0
+
+    db = DatabaseManager("test_analytics.db")
+    db.add_teacher("analyticsteacher", "password123", "Analytics Teacher", "a@example.com", "Maths")
+    teacher_id = db.verify_teacher_login("analyticsteacher", "password123")[0]
+    for i in range(3):
+        db.add_student(teacher_id, f"SID{i:03d}", f"Student {i}")
+    assert db.submit_feedback(teacher_id, "SID000", "Algebra examples were clear and helpful")
+    assert db.submit_feedback(teacher_id, "SID001", "Algebra homework was boring")
+
+    assert refresh_text_analytics(db, batch_size=1) == 2
+    assert refresh_text_analytics(db) == 0
+    assert db.get_top_terms(teacher_id, limit=1) == [("algebra", 2)]
+    (day, score, entries), = db.get_sentiment_trend(teacher_id)
+    assert entries == 2 and score == 0.0
+    print("✅ Terms and sentiment computed in batches")
+
+    assert db.submit_feedback(teacher_id, "SID002", "Great algebra revision")
+    assert refresh_text_analytics(db) == 1
+    assert db.get_top_terms(teacher_id, limit=1) == [("algebra", 3)]
+    assert db.get_sentiment_trend(teacher_id)[0][2] == 3
+    print("✅ Only feedback past the watermark is processed")
+
+    db.close()
+    remove_database("test_analytics.db")
+
+def test_benchmark_harness():
+    """Smoke-test the benchmark suite on a tiny dataset"""
+    print("\n⏱️ Testing Benchmark Harness...")
+    from benchmark import compare, run_benchmarks
+
+    results = run_benchmarks([30], teachers=2, students_per_teacher=5, calls=3)
+    methods = {r["method"] for r in results}
+    assert {"verify_teacher_login", "resolve_student_name", "submit_feedback_once",
+            "has_student_submitted_today", "get_feedback_page"} <= methods
+    assert all(r["p50_ms"] <= r["p95_ms"] <= r["p99_ms"] for r in results)
+    print(f"✅ Timed {len(methods)} methods")
+
+    slower = [dict(r, p95_ms=r["p95_ms"] * 2 + 1) for r in results]
+    assert len(compare({"results": results}, slower, 1.25)) == len(results)
+    assert compare({"results": results}, results, 1.25) == []
+    print("✅ Regressions detected against a baseline")
+
+def test_query_stats():
+    """Test per-method instrumentation and the slow-query log"""
+    print("\n🩺 Testing Query Instrumentation...")
+
+    db = DatabaseManager("test_query_stats.db")
+    db.add_teacher("statsteacher", "password123", "Stats Teacher", "q@example.com", "Maths")
+    teacher_id = db.verify_teacher_login("statsteacher", "password123")[0]
+    db.add_student(teacher_id, "SID001", "Stats Student")
+    for _ in range(3):
+        db.get_feedback_page(teacher_id)
+    db.get_students_for_teacher(teacher_id)
+
+    stats = db.get_query_stats()
+    page = stats["methods"]["get_feedback_page"]
+    assert page["calls"] == 3 and page["errors"] == 0
+    assert page["p50_ms"] <= page["p95_ms"] <= page["p99_ms"] <= page["max_ms"]
+    assert sum(page["histogram"].values()) == 3
+    assert stats["methods"]["get_students_for_teacher"]["rows"] == 1
+    assert stats["methods"]["pool.acquire"]["calls"] > 0
+    assert stats["slow_queries"] == []
+    print("✅ Calls, rows and latency histograms recorded")
+
+    db.query_stats.slow_threshold_ms = 0
+    db.has_student_submitted_today(teacher_id, "SID001")
+    slow = db.get_query_stats()["slow_queries"]
+    assert len(slow) == 1 and slow[0]["method"] == "has_student_submitted_today"
+    assert any("FROM feedback" in sql for sql in slow[0]["sql"])
+    assert not any("SID001" in sql or sql == "SELECT ?" for sql in slow[0]["sql"])
+    db.verify_teacher_login("statsteacher", "password123")
+    login_sql = db.get_query_stats()["slow_queries"][-1]["sql"]
+    assert login_sql and not any("statsteacher" in sql or "'" in sql for sql in login_sql)
+    print("✅ Slow calls logged with their SQL, without parameter values")
+    db.close()
+
+    quiet = DatabaseManager("test_query_stats.db", instrument=False)
+    quiet.get_all_teachers()
+    assert quiet.get_query_stats() == {"methods": {}, "slow_queries": []}
+    quiet.close()
+    remove_database("test_query_stats.db")
+
+def test_load_harness():
+    """Smoke-test the concurrent load generator"""
+    print("\n🔥 Testing Load Harness...")
+    from loadtest import run_load_test
+
+    report = run_load_test(processes=1, threads=3, duration=0.3, write_ratio=0.5,
+                           teachers=2, students_per_teacher=5, feedback_rows=20)
+    total = report["total"]
+    assert total["operations"] > 0 and total["error"] == 0
+    assert "submit_feedback" in report["operations"]
+    assert total["ok"] + total["locked"] + total["pool_timeout"] == total["operations"]
+    print(f"✅ {total['operations']} mixed operations at {total['throughput_per_s']} ops/s")
+
+def test_async_database():
+    """Test AsyncDatabaseManager concurrency, backpressure and cancellation"""
+    print("\n⚡ Testing Async Database Manager...")
+    import asyncio
+    import threading
+    from async_database import AsyncDatabaseManager
+
+    async def scenario():
+        async with AsyncDatabaseManager("test_async.db", max_pending=8) as adb:
+            await adb.add_teacher("asyncteacher", "password123", "Async Teacher", "a@example.com", "Maths")
+            teacher_id = (await adb.verify_teacher_login("asyncteacher", "password123"))[0]
+            for i in range(40):
+                await adb.add_student(teacher_id, f"SID{i:03d}", f"Student {i}")
+
+            results = await asyncio.gather(*[
+                adb.submit_feedback(teacher_id, f"SID{i:03d}", f"Async feedback {i}") for i in range(40)
+            ], *[adb.get_feedback_page(teacher_id) for _ in range(40)])
+            assert all(results[:40])
+            assert len(await adb.get_feedback_for_teacher(teacher_id)) == 40
+            assert (await adb.get_student_by_student_id(teacher_id, "SID001"))[3] == "Student 1"
+            rows = [row async for row in adb.iter_feedback_for_teacher(teacher_id, chunk_size=7)]
+            assert len(rows) == 40
+            print("✅ Concurrent coroutines share the pool")
+
+            def endless_query():
+                with adb.db.pool.connection() as conn:
+                    conn.execute(
+                        "WITH RECURSIVE r(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM r) SELECT COUNT(*) FROM r"
+                    ).fetchone()
+
+            task = asyncio.create_task(adb.run(endless_query))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            try:
+                await task
+                assert False, "cancelled call should raise"
+            except asyncio.CancelledError:
+                pass
+            assert await asyncio.wait_for(adb.get_feedback_counts(), timeout=5) == {teacher_id: 40}
+            print("✅ Cancellation interrupts a running query")
+
+        async with AsyncDatabaseManager("test_async_snapshot.db", read_snapshot=True,
+                                        snapshot_refresh_interval=0) as adb:
+            await adb.refresh_snapshot()
+            stopped = threading.Event()
+
+            def endless_read():
+                try:
+                    with adb.db.read_connection() as conn:
+                        assert conn is not adb.db.pool.held()  # served from the snapshot
+                        conn.execute(
+                            "WITH RECURSIVE r(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM r) SELECT COUNT(*) FROM r"
+                        ).fetchone()
+                finally:
+                    stopped.set()
+
+            task = asyncio.create_task(adb.run(endless_read))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            try:
+                await task
+                assert False, "cancelled call should raise"
+            except asyncio.CancelledError:
+                pass
+            assert await asyncio.to_thread(stopped.wait, 5)
+            print("✅ Cancellation interrupts a read served from the snapshot")
+
+    asyncio.run(scenario())
+    remove_database("test_async.db")
+    remove_database("test_async_snapshot.db")
+
+def test_ingest_api():
+    """Test the HTTP ingest endpoints over one keep-alive connection"""
+    print("\n📥 Testing Ingest API...")
+    import http.client
+    import threading
+    from config import MAX_WORD_COUNT
+    from database import validate_feedback_text
+    from ingest import IngestServer
+
+    db = DatabaseManager("test_ingest.db", write_behind=True)
+    db.add_teacher("ingestteacher", "password123", "Ingest Teacher", "i@example.com", "Maths")
+    teacher_id = db.verify_teacher_login("ingestteacher", "password123")[0]
+    db.add_student(teacher_id, "SID001", "Ingest Student")
+    server = IngestServer(("127.0.0.1", 0), db, api_token="secret")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+    auth = {"Authorization": "Bearer secret", "Content-Type": "application/json"}
+
+    def request(method, path, payload=None, headers=auth):
+        conn.request(method, path, body=json.dumps(payload) if payload is not None else None, headers=headers)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+
+    assert request("GET", "/api/health", headers={})[0] == 401
+    assert request("GET", "/api/health") == (200, {"status": "ok"})
+    assert request("GET", f"/api/teachers/{teacher_id}/students/SID001") == (
+        200, {"valid": True, "student_name": "Ingest Student"})
+    assert request("GET", f"/api/teachers/{teacher_id}/students/SID404")[0] == 404
+    other_process = DatabaseManager("test_ingest.db")
+    other_process.add_student(teacher_id, "SID002", "Late Student")
+    other_process.close()
+    assert request("GET", f"/api/teachers/{teacher_id}/students/SID002") == (
+        200, {"valid": True, "student_name": "Late Student"})
+    print("✅ Auth and roster validation")
+
+    text = " ".join(["word"] * 35)
+    feedback = {"teacher_id": teacher_id, "student_id": "SID001", "feedback_text": text}
+    assert request("POST", "/api/feedback", dict(feedback, feedback_text="too short"))[0] == 422
+    assert request("POST", "/api/feedback", dict(feedback, feedback_text="word " * (MAX_WORD_COUNT + 1)))[0] == 422
+    assert request("POST", "/api/feedback", dict(feedback, student_id="SID404")) == (404, {"result": "unknown_student"})
+    assert request("POST", "/api/feedback", feedback) == (201, {"result": "ok"})
+    assert request("POST", "/api/feedback", feedback) == (409, {"result": "already_submitted"})
+    conn.request("POST", "/api/feedback", body="not json", headers=auth)
+    response = conn.getresponse()
+    assert response.status == 400 and response.read()
+    bad = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+    bad.putrequest("POST", "/api/feedback")
+    bad.putheader("Authorization", "Bearer secret")
+    bad.putheader("Content-Length", "-1")
+    bad.endheaders()
+    assert bad.getresponse().status == 400
+    bad.close()
+    assert len(db.get_feedback_for_teacher(teacher_id)) == 1
+    assert validate_feedback_text("word " * (MAX_WORD_COUNT + 1)) is None  # the form has no upper limit
+    print("✅ Submissions follow the word-count and daily rules")
+
+    conn.close()
+    server.shutdown()
+    server.server_close()
+    db.close()
+    remove_database("test_ingest.db")
+
+def test_read_snapshot():
+    """Test dashboard reads served from the refreshed read snapshot"""
+    print("\n📸 Testing Read Snapshot...")
+
+    db = DatabaseManager("test_snapshot.db", read_snapshot=True,
+                         snapshot_refresh_interval=0, snapshot_max_staleness=60)
+    db.add_teacher("snapteacher", "password123", "Snapshot Teacher", "s@example.com", "Maths")
+    teacher_id = db.verify_teacher_login("snapteacher", "password123")[0]
+    db.add_student(teacher_id, "SID001", "Snap One")
+    db.add_student(teacher_id, "SID002", "Snap Two")
+    text = " ".join(["word"] * 35)
+    assert db.submit_feedback(teacher_id, "SID001", text)
+    assert db.get_snapshot_status()["fresh"] is False
+    assert len(db.get_all_feedback()) == 1
+    print("✅ Reads go to the database until the first refresh")
+
+    assert db.refresh_snapshot()
+    status = db.get_snapshot_status()
+    assert status["fresh"] and status["refreshes"] == 1 and status["age_seconds"] < 60
+    assert db.submit_feedback(teacher_id, "SID002", text)
+    assert len(db.get_all_feedback()) == 1
+    assert db.get_feedback_counts() == {teacher_id: 1}
+    assert db.has_student_submitted_today(teacher_id, "SID002")
+    assert [row[1] for row in db.get_feedback_page(teacher_id)[0]] == ["Snap One"]
+    print("✅ Dashboard reads come from the snapshot; submission checks stay live")
+
+    db.add_student(teacher_id, "SID003", "Snap Three")
+    assert len(db.get_students_for_teacher(teacher_id)) == 3
+    db.refresh_snapshot()
+    assert len(db.get_all_feedback()) == 2
+    assert len(db.get_students_for_teacher(teacher_id)) == 3
+    print("✅ Roster changes and refreshes are visible immediately")
+
+    db.snapshot.max_staleness = 0
+    db.submit_feedback(teacher_id, "SID003", text)
+    assert len(db.get_all_feedback()) == 3
+    print("✅ Stale snapshots fall back to the database")
+
+    assert status["path"] != db.get_snapshot_status()["path"]
+    assert len(glob.glob(db.snapshot.path + "*")) == 3  # name reservation, current and retired copy
+    db.refresh_snapshot()
+    assert len(glob.glob(db.snapshot.path + "*")) == 3
+    print("✅ Each refresh writes a new file and deletes the retired one")
+
+    snapshot_path = db.snapshot.path
+    db.close()
+    assert glob.glob(snapshot_path + "*") == []
+    remove_database("test_snapshot.db")
+
+def test_sharded_storage():
+    """Test routing, fan-out merges and teacher moves across shard files"""
+    print("\n🧩 Testing Sharded Storage...")
+    from sharding import ShardedDatabaseManager, SHARD_ID_SPAN
+
+    paths = ["test_shard0.db", "test_shard1.db", "test_shards.db"]
+    db = ShardedDatabaseManager(paths[:2], paths[2])
+    teacher_ids = []
+    for n in range(4):
+        assert db.add_teacher(f"shardteacher{n}", "password123", f"Shard Teacher {n}", "s@example.com", "Maths")
+        teacher_ids.append(db.verify_teacher_login(f"shardteacher{n}", "password123")[0])
+    assert not db.add_teacher("shardteacher0", "x", "Duplicate", "d@example.com", "Maths")
+    assert sorted(db.shard_index(t) for t in teacher_ids) == [0, 0, 1, 1]
+    assert [t[0] for t in db.get_all_teachers()] == sorted(teacher_ids)
+    print("✅ Teachers get global IDs and are spread over shards")
+
+    text = " ".join(["word"] * 35)
+    for t in teacher_ids:
+        db.add_student(t, "SID001", f"Student {t}")
+        db.add_student(t, "SID002", f"Other {t}")
+        assert db.submit_feedback(t, "SID001", text)
+    assert db.submit_feedback_batch([(teacher_ids[0], "SID002", text), (teacher_ids[1], "SID002", text),
+                                     (teacher_ids[0], "SID404", text)]) == [
+        SubmitResult.OK, SubmitResult.OK, SubmitResult.UNKNOWN_STUDENT]
+    home = db.shard_for(teacher_ids[0])
+    other = db.shards[1 - db.shard_index(teacher_ids[0])]
+    assert len(home.get_feedback_for_teacher(teacher_ids[0])) == 2
+    assert other.get_feedback_for_teacher(teacher_ids[0]) == []
+    assert db.resolve_student_name(teacher_ids[0], "SID002") == f"Other {teacher_ids[0]}"
+    assert min(row[0] for row in db.shards[1].get_all_feedback()) > SHARD_ID_SPAN
+    with db.directory.connection() as conn:
+        statements = []
+        conn.set_trace_callback(statements.append)
+        for t in teacher_ids:
+            db.resolve_student_name(t, "SID001")
+            db.get_feedback_page(t)
+        conn.set_trace_callback(None)
+    assert statements == []
+    print("✅ Teacher-scoped calls touch only their shard, routed from memory")
+
+    everything = db.get_all_feedback()
+    assert len(everything) == 6
+    assert everything == sorted(everything, key=lambda row: (row[4], row[0]), reverse=True)
+    paged, cursor = [], None
+    while True:
+        rows, has_more = db.get_all_feedback_page(page_size=4, cursor=cursor)
+        paged.extend(rows)
+        if not has_more:
+            break
+        cursor = (rows[-1][4], rows[-1][0])
+    assert paged == everything == list(db.iter_all_feedback(chunk_size=2))
+    assert sum(db.get_feedback_counts().values()) == 6
+    assert len(db.search_feedback("word")) == 6
+    print("✅ Admin-wide calls fan out and merge in order")
+
+    from analytics import refresh_text_analytics
+    from export import export_feedback
+    assert refresh_text_analytics(db) == 6
+    assert all(db.get_top_terms(t) for t in teacher_ids)
+    assert export_feedback(db, io.StringIO(), "jsonl") == 6
+    far_teacher = db.shards[1].get_all_teachers()[0][0]
+    assert export_feedback(db, io.StringIO(), "jsonl", teacher_id=far_teacher) == len(
+        db.get_feedback_for_teacher(far_teacher))
+    print("✅ Text analytics and exports cover every shard")
+
+    source = db.shard_index(teacher_ids[0])
+    assert db.move_teacher(teacher_ids[0], 1 - source) == 2
+    assert db.shard_index(teacher_ids[0]) == 1 - source
+    assert db.verify_teacher_login("shardteacher0", "password123")[0] == teacher_ids[0]
+    assert len(db.get_feedback_for_teacher(teacher_ids[0])) == 2
+    assert db.shards[source].get_feedback_for_teacher(teacher_ids[0]) == []
+    assert db.get_feedback_counts()[teacher_ids[0]] == 2
+    assert db.submit_feedback_once(teacher_ids[0], "SID001", text) is SubmitResult.ALREADY_SUBMITTED
+    assert len(db.get_all_feedback()) == 6
+    db.refresh_feedback_rollups()
+    assert db.get_teacher_analytics()[teacher_ids[0]]["submissions"] == 2
+
+    moves = db.plan_rebalance()
+    assert moves and all(source_shard != target for _, source_shard, target in moves)
+    db.rebalance()
+    assert db.plan_rebalance() == []
+    print("✅ Teachers move between shards and rebalance evens out load")
+
+    import threading
+    racer = teacher_ids[2]
+    for n in range(40):
+        db.add_student(racer, f"RACE{n:03d}", f"Racer {n}")
+    before = len(db.get_feedback_for_teacher(racer))
+    mover = ShardedDatabaseManager(paths[:2], paths[2])  # stands in for another process
+    results = []
+
+    def submit_range(start):
+        for n in range(start, 40, 2):
+            results.append(db.submit_feedback_once(racer, f"RACE{n:03d}", text))
+    threads = [threading.Thread(target=submit_range, args=(start,)) for start in (0, 1)]
+    for thread in threads:
+        thread.start()
+    home = db.shard_index(racer)
+    mover.move_teacher(racer, 1 - home)
+    db.move_teacher(racer, home)
+    for thread in threads:
+        thread.join()
+    mover.close()
+    assert results == [SubmitResult.OK] * 40, set(results)
+    assert len(db.get_feedback_for_teacher(racer)) == before + 40
+    assert db.shard_index(racer) == home
+    print("✅ Submissions racing moves from this and another process all land")
+
+    import asyncio
+    from async_database import AsyncDatabaseManager
+
+    async def read_pages():
+        async with AsyncDatabaseManager(db=db) as adb:
+            return await asyncio.gather(*[adb.get_feedback_page(t) for t in teacher_ids])
+    pages = asyncio.run(read_pages())
+    assert pages == [db.get_feedback_page(t) for t in teacher_ids]
+    print("✅ The asyncio wrapper runs on sharded storage")
+    db.close()
+
+    reopened = ShardedDatabaseManager(paths[:2], paths[2])
+    assert len(reopened.get_all_teachers()) == 4
+    reopened.close()
+    try:
+        ShardedDatabaseManager(paths[1::-1], paths[2])
+        assert False, "Reordered shards should be rejected"
+    except ValueError:
+        pass
+    for path in paths:
+        remove_database(path)
+
+def test_feedback_archive():
+    """Test moving old feedback to the compressed archive and reading it back"""
+    print("\n🗄️ Testing Feedback Archive...")
+    from archive import archive_old_feedback
+
+    db = DatabaseManager("test_archive.db")
+    db.add_teacher("archteacher", "password123", "Archive Teacher", "a@example.com", "Maths")
+    teacher_id = db.verify_teacher_login("archteacher", "password123")[0]
+    for n in range(6):
+        db.add_student(teacher_id, f"SID00{n}", f"Archive Student {n}")
+    text = " ".join(["lesson"] * 35)
+    with db.pool.connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO feedback (teacher_id, student_id, student_name, feedback_text, submission_time, submission_day)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [(teacher_id, f"SID00{n}", f"Archive Student {n}", f"{text} {n}",
+              f"2020-01-0{n + 1} 10:00:00", f"2020-01-0{n + 1}") for n in range(5)],
+        )
+        conn.commit()
+    assert db.submit_feedback(teacher_id, "SID005", text)
+    before = db.get_feedback_for_teacher(teacher_id)
+
+    assert archive_old_feedback(db, older_than_days=30, batch_size=2, pause=0) == 5
+    assert [row[3] for row in db.get_feedback_for_teacher(teacher_id)] == [before[0][3]]
+    assert db.get_feedback_for_teacher(teacher_id, include_archived=True) == before
+    assert db.archive.stats()["rows"] == 5
+    assert db.archive.stats()["compressed_bytes"] < 5 * len(text)
+    print("✅ Old feedback moved in batches and read back transparently")
+
+    assert db.get_feedback_counts(with_latest=True)[teacher_id] == (6, before[0][3])
+    assert sum(row[2] for row in db.get_daily_feedback_stats(teacher_id)) == 6
+    assert db.get_teacher_analytics()[teacher_id]["participants"] == 6
+    assert archive_old_feedback(db, older_than_days=30, pause=0) == 0
+    print("✅ Counters and rollups still include archived feedback")
+
+    db.delete_teacher(teacher_id)
+    assert db.archive.stats()["rows"] == 0
+    archive_path = db.archive.path
+    db.close()
+    remove_database("test_archive.db")
+    remove_database(archive_path)
+
+    from sharding import ShardedDatabaseManager
+    sharded = ShardedDatabaseManager(["test_archive0.db", "test_archive1.db"], "test_archive_shards.db")
+    sharded.add_teacher("archteacher", "password123", "Archive Teacher", "a@example.com", "Maths")
+    teacher_id = sharded.verify_teacher_login("archteacher", "password123")[0]
+    sharded.add_student(teacher_id, "SID001", "Archive Student")
+    source = sharded.shard_for(teacher_id)
+    with source.pool.connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO feedback (teacher_id, student_id, student_name, feedback_text, submission_time, submission_day)
+            VALUES (?, 'SID001', 'Archive Student', ?, '2020-01-01 10:00:00', '2020-01-01')
+            """,
+            (teacher_id, text),
+        )
+        conn.commit()
+    assert sharded.submit_feedback(teacher_id, "SID001", text)
+    assert archive_old_feedback(source, older_than_days=30, pause=0) == 1
+    sharded.move_teacher(teacher_id, 1 - sharded.shard_index(teacher_id))
+    assert len(sharded.get_feedback_for_teacher(teacher_id, include_archived=True)) == 2
+    assert sharded.get_feedback_counts()[teacher_id] == 2
+    sharded.refresh_feedback_rollups()
+    assert sum(row[2] for row in sharded.get_daily_feedback_stats(teacher_id)) == 2
+    assert source.archive.stats()["rows"] == 0
+    print("✅ Archived feedback moves with its teacher between shards")
+    archive_paths = [shard.archive.path for shard in sharded.shards]
+    sharded.close()
+    for path in ["test_archive0.db", "test_archive1.db", "test_archive_shards.db"] + archive_paths:
+        remove_database(path)
+
 def main():
     """Main test function"""
     print("🚀 Starting Student Feedback System Tests...")
@@ -77,6 +1096,31 @@ def main():
     
     try:
         test_password_hashing()
+        test_connection_pool()
+        test_hot_query_plans()
+        test_schema_migrations()
+        test_feedback_counts()
+        test_feedback_pagination()
+        test_roster_pagination()
+        test_student_id_sequence()
+        test_bulk_student_import()
+        test_feedback_writer()
+        test_daily_submission_limit()
+        test_read_cache()
+        test_roster_index()
+        test_login_throttle()
+        test_feedback_export()
+        test_feedback_search()
+        test_feedback_rollups()
+        test_text_analytics()
+        test_benchmark_harness()
+        test_query_stats()
+        test_load_harness()
+        test_async_database()
+        test_ingest_api()
+        test_read_snapshot()
+        test_sharded_storage()
+        test_feedback_archive()
         test_database()
         print("\n✅ All tests completed successfully!")
         print("🎯 The system is ready to use!")